@@ -0,0 +1,241 @@
+"""
+Measures the per-request overhead of ReqFlow on top of raw httpx.
+
+Every scenario runs against an in-process `httpx.MockTransport`, so no sockets are involved and the numbers
+reflect the library itself: the `given` -> `when` -> `then` chain, `UnifiedResponse`, JSONPath assertions,
+the Pydantic `Validator` and the `GlobalLogger`.
+
+Usage:
+    python benchmarks/overhead.py --output overhead.json
+    python benchmarks/overhead.py --only status --iterations 2000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from pydantic import BaseModel, create_model  # noqa: E402
+
+from reqflow import Client, given  # noqa: E402
+from reqflow.assertions import equal_to  # noqa: E402
+from reqflow.utils.logger import GlobalLogger  # noqa: E402
+
+BASE_URL = "http://reqflow.test"
+SMALL_BODY = json.dumps({f"field_{index}": {"id": index, "name": f"item {index}", "tags": ["a", "b"]}
+                         for index in range(20)}).encode()
+LARGE_BODY = b"x" * (10 * 1024 * 1024)
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    tags: List[str]
+
+
+Payload = create_model("Payload", **{f"field_{index}": (Item, ...) for index in range(20)})
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/large":
+        return httpx.Response(200, content=LARGE_BODY, headers={"Content-Type": "application/octet-stream"})
+    return httpx.Response(200, content=SMALL_BODY, headers={"Content-Type": "application/json"})
+
+
+async def _async_handler(request: httpx.Request) -> httpx.Response:
+    return _handler(request)
+
+
+def _client(logging: bool = False) -> Client:
+    return Client(base_url=BASE_URL, logging=logging, transport=httpx.MockTransport(_handler),
+                  async_transport=httpx.MockTransport(_async_handler))
+
+
+def _scenarios() -> Dict[str, Callable[[], Callable[[], Any]]]:
+    """
+    Returns factories of the scenarios. Each factory prepares its clients and returns the operation to measure.
+    """
+    def raw_httpx(path):
+        def factory():
+            http_client = httpx.Client(transport=httpx.MockTransport(_handler))
+            return lambda: http_client.get(f"{BASE_URL}{path}").status_code == 200
+        return factory
+
+    def status_only(path, logging=False):
+        def factory():
+            client = _client(logging)
+
+            def operation():
+                given(client).when("GET", path).then().status_code(200)
+                if logging and len(GlobalLogger.logs) >= 1000:
+                    GlobalLogger.clear_logs()
+            return operation
+        return factory
+
+    def jsonpath_20():
+        client = _client()
+        paths = [(f"$.field_{index}.id", equal_to(index)) for index in range(20)]
+
+        def operation():
+            then = given(client).when("GET", "/small").then()
+            for path, expected in paths:
+                then.assert_body(path, expected)
+        return operation
+
+    def template_status():
+        template = given(_client()).body({"id": "{id}", "kind": "static"}).when("POST", "/items/{id}").template()
+        return lambda: template.then(id=1).status_code(200)
+
+    def fluent_status_with_body():
+        client = _client()
+        return lambda: given(client).body({"id": 1, "kind": "static"}).when("POST", "/items/1").then().status_code(200)
+
+    def pydantic_validation():
+        client = _client()
+        return lambda: given(client).when("GET", "/small").then().validate_data(Payload)
+
+    def raw_httpx_async():
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(_async_handler))
+        loop = asyncio.new_event_loop()
+
+        async def batch():
+            for _ in range(100):
+                await http_client.get(f"{BASE_URL}/small")
+        return lambda: loop.run_until_complete(batch())
+
+    def status_only_async():
+        client = _client()
+        loop = asyncio.new_event_loop()
+
+        async def batch():
+            for _ in range(100):
+                (await given(client).when("GET", "/small").then_async()).status_code(200)
+        return lambda: loop.run_until_complete(batch())
+
+    return {
+        "raw_httpx_small": raw_httpx("/small"),
+        "status_small": status_only("/small"),
+        "status_small_logging": status_only("/small", logging=True),
+        "fluent_post_small": fluent_status_with_body,
+        "template_post_small": template_status,
+        "jsonpath_20_small": jsonpath_20,
+        "pydantic_small": pydantic_validation,
+        "raw_httpx_async_small_x100": raw_httpx_async,
+        "status_async_small_x100": status_only_async,
+        "raw_httpx_10mb": raw_httpx("/large"),
+        "status_10mb": status_only("/large"),
+        "status_10mb_logging": status_only("/large", logging=True),
+    }
+
+
+BASELINES = {
+    "status_small": "raw_httpx_small",
+    "status_small_logging": "raw_httpx_small",
+    "fluent_post_small": "raw_httpx_small",
+    "template_post_small": "raw_httpx_small",
+    "jsonpath_20_small": "raw_httpx_small",
+    "pydantic_small": "raw_httpx_small",
+    "status_async_small_x100": "raw_httpx_async_small_x100",
+    "status_10mb": "raw_httpx_10mb",
+    "status_10mb_logging": "raw_httpx_10mb",
+}
+
+
+def measure(operation: Callable[[], Any], iterations: int, warmup: int, memory_iterations: int) -> Dict[str, Any]:
+    """
+    Measures the throughput of an operation, then its allocations in a separate traced pass.
+    """
+    for _ in range(warmup):
+        operation()
+
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        operation()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        for _ in range(memory_iterations):
+            operation()
+        _, peak = tracemalloc.get_traced_memory()
+        live_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / elapsed,
+        "mean_us": elapsed / iterations * 1e6,
+        "peak_bytes": peak - baseline,
+        "live_blocks": live_blocks,
+    }
+
+
+def run(only: Optional[str] = None, iterations: int = 1000, warmup: int = 50) -> Dict[str, Any]:
+    """
+    Runs the scenarios whose name contains `only` and returns the machine readable results.
+    """
+    scenarios = _scenarios()
+    selected = {name for name in scenarios if not only or only in name}
+    selected |= {BASELINES[name] for name in selected if name in BASELINES}
+
+    results = {}
+    for name, factory in scenarios.items():
+        if name not in selected:
+            continue
+        large = "10mb" in name
+        scenario_iterations = max(1, iterations // (50 if large else 100 if "x100" in name else 1))
+        GlobalLogger.clear_logs()
+        results[name] = measure(factory(), scenario_iterations, warmup=min(warmup, scenario_iterations),
+                                memory_iterations=max(1, min(scenario_iterations, 20 if large else 200)))
+        GlobalLogger.clear_logs()
+        print(f"{name:32} {results[name]['ops_per_sec']:12.1f} ops/s {results[name]['mean_us']:12.1f} us/op "
+              f"{results[name]['peak_bytes'] / 1024:12.1f} KiB peak", file=sys.stderr)
+
+    for name, baseline in BASELINES.items():
+        if name in results and baseline in results:
+            results[name]["overhead_us"] = results[name]["mean_us"] - results[baseline]["mean_us"]
+            results[name]["relative_to_httpx"] = results[name]["mean_us"] / results[baseline]["mean_us"]
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "httpx": httpx.__version__,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=1000, help="Iterations of the small body scenarios.")
+    parser.add_argument("--warmup", type=int, default=50, help="Warmup iterations per scenario.")
+    parser.add_argument("--only", help="Only run the scenarios whose name contains this string.")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+
+    results = run(args.only, args.iterations, args.warmup)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compares the latency and throughput of ReqFlow requests over loopback TCP and a Unix domain socket.
+
+Both runs target the same `reqflow.mock` route, served by a separate `python -m reqflow.mock` process once on TCP
+and once on a Unix socket, and use `When.benchmark` on pooled connections.
+
+Usage:
+    python benchmarks/uds_vs_tcp.py --iterations 5000 --concurrency 8 --output uds_vs_tcp.json
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from reqflow import Client, given  # noqa: E402
+
+ROUTES = {"routes": [{"method": "GET", "path": "/items", "payload": {"type": "json_items", "count": 10}}]}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def _server_process(config_path: str, *args: str) -> Iterator[None]:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.Popen([sys.executable, "-m", "reqflow.mock", config_path, *args], env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        process.stdout.readline()  # "Serving ..." once the server accepts connections
+        yield
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run(iterations: int = 2000, warmup: int = 100, concurrency: int = 1) -> Dict[str, Any]:
+    """
+    Benchmarks the same route over TCP and a Unix domain socket and returns the summaries.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = os.path.join(directory, "mock.json")
+        with open(config_path, "w") as file:
+            json.dump(ROUTES, file)
+        socket_path = os.path.join(directory, "mock.sock")
+        port = _free_port()
+        targets = {
+            "tcp": (("--port", str(port)), lambda: Client(base_url=f"http://127.0.0.1:{port}")),
+            "uds": (("--uds", socket_path), lambda: Client(base_url="http://localhost", uds=socket_path)),
+        }
+        for name, (args, make_client) in targets.items():
+            with _server_process(config_path, *args), make_client() as client:
+                result = given(client).when("GET", "/items").benchmark(iterations=iterations, warmup=warmup,
+                                                                       concurrency=concurrency)
+            result.assert_no_errors()
+            results[name] = result.summary()
+            print(f"{name}: {result.throughput:10.1f} req/s  mean {result.mean * 1e6:8.1f} us  "
+                  f"p99 {result.p99 * 1e6:8.1f} us", file=sys.stderr)
+
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "iterations": iterations, "concurrency": concurrency},
+        "results": results,
+        "uds_speedup": results["tcp"]["mean"] / results["uds"]["mean"],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+
+    results = run(args.iterations, args.warmup, args.concurrency)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,11 @@
-from flask import Flask
 import time
 
-app = Flask(__name__)
+from reqflow.mock import MockServer, profiles
 
-@app.route('/delay/<int:delay_time>', methods=['GET', 'POST'])
-def delay_response(delay_time):
-    time.sleep(delay_time)
-    return 'Delayed response', 200
+server = MockServer(port=5000)
+server.add_route("*", "/delay/{delay_time}", latency=profiles.from_path("delay_time"), payload="Delayed response")
 
 if __name__ == '__main__':
-    app.run(port=5000)
\ No newline at end of file
+    with server:
+        while True:
+            time.sleep(3600)
@@ -1,2 +1,24 @@
-from .client import Client
-from .fluent_api import given
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .fluent_api import given
+
+__all__ = ["Client", "given"]
+
+# Imported on first access, so that `import reqflow` (e.g. by the `reqflow` command or `python -m reqflow.mock`)
+# does not load httpx, jsonpath-ng and pydantic until they are needed.
+_LAZY = {"Client": ".client", "given": ".fluent_api"}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
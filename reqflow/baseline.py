@@ -0,0 +1,327 @@
+import json
+import random
+from html import escape
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from reqflow.benchmark import BenchmarkResult
+from reqflow.utils.logger import GlobalLogger
+from reqflow.utils.stats import mann_whitney_u, percentile
+from reqflow.utils.url import url_template
+
+REGRESSED = "regressed"
+IMPROVED = "improved"
+UNCHANGED = "unchanged"
+INSUFFICIENT = "insufficient data"
+NEW = "new"
+MISSING = "missing"
+
+
+class Baseline:
+    """
+    Per-endpoint latency samples and throughput of a run, saved to compare later runs against.
+
+    Endpoints are keyed by method and endpoint template, e.g. "GET /users/{id}". At most `max_samples`
+    response times are kept per endpoint, using reservoir sampling beyond that.
+
+    Examples:
+        >>> from reqflow.baseline import Baseline
+        >>>
+        >>> Baseline.from_logs().save("baseline.json")
+        >>> ...
+        >>> comparison = Baseline.load("baseline.json").compare(Baseline.from_logs(), threshold=0.2)
+        >>> comparison.assert_no_regressions()
+    """
+
+    def __init__(self, max_samples: int = 2000, seed: int = 0):
+        """
+        Args:
+            max_samples (int): The maximum number of response times kept per endpoint.
+            seed (int): The seed of the reservoir sampling.
+        """
+        self.max_samples = max_samples
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        self._random = random.Random(seed)
+
+    def add(self, endpoint: str, samples: Iterable[float], errors: int = 0,
+            throughput: Optional[float] = None) -> 'Baseline':
+        """
+        Adds response times of an endpoint.
+
+        Args:
+            endpoint (str): The method and endpoint template, e.g. "GET /users/{id}".
+            samples (Iterable[float]): The response times in seconds.
+            errors (int): The number of failed requests.
+            throughput (float): The requests per second, e.g. measured by a benchmark.
+
+        Returns:
+            Baseline: The instance of the Baseline class.
+        """
+        data = self.endpoints.get(endpoint)
+        if data is None:
+            data = self.endpoints[endpoint] = {"count": 0, "errors": 0, "throughput": None, "samples": []}
+        kept = data["samples"]
+        for value in samples:
+            data["count"] += 1
+            if len(kept) < self.max_samples:
+                kept.append(value)
+            else:
+                index = self._random.randrange(data["count"])
+                if index < self.max_samples:
+                    kept[index] = value
+        data["errors"] += errors
+        if throughput is not None:
+            data["throughput"] = throughput
+        return self
+
+    @classmethod
+    def from_logs(cls, entries: Optional[Iterable[Dict[str, Any]]] = None, max_samples: int = 2000) -> 'Baseline':
+        """
+        Builds a baseline from log entries.
+
+        Args:
+            entries (Iterable[Dict[str, Any]]): The log entries. Defaults to the logs of the GlobalLogger.
+            max_samples (int): The maximum number of response times kept per endpoint.
+
+        Note:
+            Requests without a response and responses with a status code >= 400 are counted as errors
+            and their response times are left out.
+
+        Returns:
+            Baseline: The baseline of the logged requests.
+        """
+        baseline = cls(max_samples=max_samples)
+        for log in GlobalLogger._iter_entries() if entries is None else entries:
+            request, response = log.get("request") or {}, log.get("response") or {}
+            endpoint = f"{(request.get('method') or '').upper()} {url_template(request.get('url') or '')}"
+            status_code, response_time = response.get("status_code"), response.get("time")
+            if status_code is None or status_code >= 400 or response_time is None:
+                baseline.add(endpoint, (), errors=1)
+            else:
+                baseline.add(endpoint, (response_time,))
+        return baseline
+
+    @classmethod
+    def from_benchmarks(cls, results: Iterable[BenchmarkResult], max_samples: int = 2000) -> 'Baseline':
+        """
+        Builds a baseline from benchmark results.
+
+        Args:
+            results (Iterable[BenchmarkResult]): The results of `When.benchmark`.
+            max_samples (int): The maximum number of response times kept per endpoint.
+
+        Returns:
+            Baseline: The baseline of the benchmarks.
+        """
+        baseline = cls(max_samples=max_samples)
+        for result in results:
+            baseline.add(result.endpoint, result.samples, errors=result.errors, throughput=result.throughput)
+        return baseline
+
+    def save(self, file_path: str) -> None:
+        """
+        Saves the baseline as JSON.
+
+        Args:
+            file_path (str): The path of the file.
+        """
+        with open(file_path, "w") as file:
+            json.dump({"max_samples": self.max_samples, "endpoints": self.endpoints}, file)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'Baseline':
+        """
+        Loads a baseline saved with `save`.
+        """
+        with open(file_path, "r") as file:
+            data = json.load(file)
+        baseline = cls(max_samples=data.get("max_samples", 2000))
+        baseline.endpoints = data["endpoints"]
+        return baseline
+
+    def compare(self, current: 'Baseline', threshold: float = 0.2, alpha: float = 0.05, quantile: float = 50,
+                min_samples: int = 8) -> 'BaselineComparison':
+        """
+        Compares a later run against this baseline.
+
+        An endpoint regresses when its response times are significantly larger according to a one-sided
+        Mann-Whitney U test (p-value below `alpha`) and the `quantile` response time grew by more than
+        `threshold`, or when its throughput dropped by more than `threshold`.
+
+        Args:
+            current (Baseline): The baseline of the later run.
+            threshold (float): The relative change that counts as a regression, e.g. 0.2 for 20%.
+            alpha (float): The significance level of the test.
+            quantile (float): The percentile (0 to 100) compared against the threshold. Defaults to the median.
+            min_samples (int): Endpoints with fewer response times on either side are not tested.
+
+        Returns:
+            BaselineComparison: The comparison of every endpoint.
+        """
+        comparisons = []
+        for endpoint in sorted(set(self.endpoints) | set(current.endpoints)):
+            comparisons.append(EndpointComparison.compare(endpoint, self.endpoints.get(endpoint),
+                                                          current.endpoints.get(endpoint), threshold, alpha,
+                                                          quantile, min_samples))
+        return BaselineComparison(comparisons, threshold=threshold, alpha=alpha)
+
+
+def _relative_change(baseline: Optional[float], current: Optional[float]) -> Optional[float]:
+    if baseline is None or current is None or baseline == 0:
+        return None
+    return (current - baseline) / baseline
+
+
+class EndpointComparison:
+    """
+    The comparison of one endpoint between a baseline and a later run.
+
+    Attributes:
+        endpoint (str): The method and endpoint template.
+        status (str): One of "regressed", "improved", "unchanged", "insufficient data", "new" or "missing".
+        percentiles (Dict[str, tuple]): The baseline value, current value and relative change of p50, p95 and p99.
+        throughput (tuple): The baseline throughput, current throughput and relative change.
+        p_value (float): The p-value of the Mann-Whitney U test, None if the endpoint was not tested.
+    """
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, endpoint: str, status: str, baseline_count: int = 0, current_count: int = 0,
+                 percentiles: Optional[Dict[str, tuple]] = None, throughput: Optional[tuple] = None,
+                 p_value: Optional[float] = None):
+        self.endpoint = endpoint
+        self.status = status
+        self.baseline_count = baseline_count
+        self.current_count = current_count
+        self.percentiles = percentiles or {}
+        self.throughput = throughput
+        self.p_value = p_value
+
+    @classmethod
+    def compare(cls, endpoint: str, baseline: Optional[Dict[str, Any]], current: Optional[Dict[str, Any]],
+                threshold: float, alpha: float, quantile: float, min_samples: int) -> 'EndpointComparison':
+        if baseline is None:
+            return cls(endpoint, NEW, current_count=current["count"])
+        if current is None:
+            return cls(endpoint, MISSING, baseline_count=baseline["count"])
+
+        baseline_samples, current_samples = sorted(baseline["samples"]), sorted(current["samples"])
+
+        def stat(samples: Sequence[float], q: float) -> Optional[float]:
+            return percentile(samples, q) if samples else None
+
+        percentiles = {}
+        for q in sorted(set(cls.PERCENTILES) | {quantile}):
+            before, after = stat(baseline_samples, q), stat(current_samples, q)
+            percentiles[f"p{q:g}"] = (before, after, _relative_change(before, after))
+
+        throughput = None
+        if baseline.get("throughput") is not None and current.get("throughput") is not None:
+            throughput = (baseline["throughput"], current["throughput"],
+                          _relative_change(baseline["throughput"], current["throughput"]))
+        throughput_change = throughput[2] if throughput is not None else None
+
+        status, p_value = INSUFFICIENT, None
+        if len(baseline_samples) >= min_samples and len(current_samples) >= min_samples:
+            change = percentiles[f"p{quantile:g}"][2] or 0.0
+            _, p_value = mann_whitney_u(baseline_samples, current_samples)
+            _, p_value_faster = mann_whitney_u(current_samples, baseline_samples)
+            if p_value < alpha and change > threshold:
+                status = REGRESSED
+            elif p_value_faster < alpha and change < -threshold:
+                status = IMPROVED
+            else:
+                status = UNCHANGED
+        if throughput_change is not None and throughput_change < -threshold:
+            status = REGRESSED
+        elif status == INSUFFICIENT and throughput_change is not None:
+            status = IMPROVED if throughput_change > threshold else UNCHANGED
+
+        return cls(endpoint, status, baseline["count"], current["count"], percentiles, throughput, p_value)
+
+    @property
+    def regressed(self) -> bool:
+        return self.status == REGRESSED
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "status": self.status,
+            "baseline_count": self.baseline_count,
+            "current_count": self.current_count,
+            "percentiles": {name: list(values) for name, values in self.percentiles.items()},
+            "throughput": list(self.throughput) if self.throughput is not None else None,
+            "p_value": self.p_value,
+        }
+
+
+class BaselineComparison:
+    """
+    The result of `Baseline.compare`.
+    """
+
+    def __init__(self, endpoints: List[EndpointComparison], threshold: float, alpha: float):
+        self.endpoints = endpoints
+        self.threshold = threshold
+        self.alpha = alpha
+
+    @property
+    def regressions(self) -> List[EndpointComparison]:
+        """
+        The endpoints that regressed.
+        """
+        return [endpoint for endpoint in self.endpoints if endpoint.regressed]
+
+    def assert_no_regressions(self) -> 'BaselineComparison':
+        """
+        Asserts that no endpoint regressed.
+
+        Raises:
+            AssertionError: If at least one endpoint regressed.
+
+        Returns:
+            BaselineComparison: The instance of the BaselineComparison class.
+        """
+        assert not self.regressions, "Performance regressions:\n" + self.format(self.regressions)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"threshold": self.threshold, "alpha": self.alpha,
+                "endpoints": [endpoint.to_dict() for endpoint in self.endpoints]}
+
+    def format(self, endpoints: Optional[List[EndpointComparison]] = None) -> str:
+        """
+        Renders the comparison as plain text lines, e.g. for the terminal.
+        """
+        lines = []
+        for endpoint in self.endpoints if endpoints is None else endpoints:
+            changes = ", ".join(f"{name} {_format_change(values)}" for name, values in endpoint.percentiles.items())
+            if endpoint.throughput is not None:
+                changes += f", throughput {_format_change(endpoint.throughput, unit=' req/s')}"
+            p_value = f", p={endpoint.p_value:.4f}" if endpoint.p_value is not None else ""
+            lines.append(f"{endpoint.endpoint}: {endpoint.status}" + (f" ({changes}{p_value})" if changes else ""))
+        return "\n".join(lines)
+
+    def to_html(self) -> str:
+        """
+        Renders the comparison as the rows of the baseline table of the HTML report.
+        """
+        classes = {REGRESSED: "status-failure", IMPROVED: "status-success", INSUFFICIENT: "status-warning"}
+        rows = []
+        for endpoint in self.endpoints:
+            cells = "".join(f"<td>{escape(_format_change(endpoint.percentiles.get(f'p{q}')))}</td>"
+                            for q in EndpointComparison.PERCENTILES)
+            throughput = _format_change(endpoint.throughput, unit=" req/s")
+            p_value = "-" if endpoint.p_value is None else f"{endpoint.p_value:.4f}"
+            rows.append(f"<tr><td>{escape(endpoint.endpoint)}</td>"
+                        f"<td class=\"{classes.get(endpoint.status, '')}\">{escape(endpoint.status)}</td>"
+                        f"<td>{endpoint.baseline_count} / {endpoint.current_count}</td>{cells}"
+                        f"<td>{escape(throughput)}</td><td>{p_value}</td></tr>")
+        return "\n".join(rows)
+
+
+def _format_change(values: Optional[tuple], unit: str = "s") -> str:
+    if not values or values[0] is None or values[1] is None:
+        return "-"
+    before, after, change = values
+    relative = f" ({change:+.1%})" if change is not None else ""
+    return f"{before:.4f}{unit} -> {after:.4f}{unit}{relative}"
@@ -0,0 +1,333 @@
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from reqflow.utils.stats import percentile
+from reqflow.utils.url import url_template
+
+
+class BenchmarkResult:
+    """
+    The latency statistics of a request repeated with `When.benchmark`.
+
+    Response times are in seconds and only include successful requests, i.e. requests that received a response.
+    Requests that failed with a transport error are counted in `errors`.
+
+    Examples:
+        >>> from reqflow import given, Client
+        >>> client = Client(base_url="https://httpbin.org")
+        >>> result = given(client).when("GET", "/get").benchmark(iterations=200, warmup=10, concurrency=4)
+        >>> result.assert_p99_below(0.5).assert_mean_below(0.2)
+        >>> result.save("get_benchmark.json")
+    """
+
+    def __init__(self, method: str, url: str, samples: List[float], errors: int = 0,
+                 status_codes: Optional[Dict[int, int]] = None, concurrency: int = 1, wall_time: float = 0.0):
+        """
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The full URL of the request.
+            samples (List[float]): The response times of the successful requests in the order they completed.
+            errors (int): The number of requests that failed with a transport error.
+            status_codes (Dict[int, int]): The number of responses per status code.
+            concurrency (int): The number of requests that were in flight at the same time.
+            wall_time (float): The duration of the measured iterations in seconds.
+        """
+        self.method = method.upper()
+        self.url = url
+        self.samples = list(samples)
+        self.errors = errors
+        self.status_codes = dict(status_codes or {})
+        self.concurrency = concurrency
+        self.wall_time = wall_time
+        self._sorted = sorted(self.samples)
+
+    @property
+    def endpoint(self) -> str:
+        """
+        The method and the endpoint template of the request, e.g. "GET /users/{id}".
+        """
+        return f"{self.method} {url_template(self.url)}"
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._sorted[0] if self._sorted else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._sorted[-1] if self._sorted else None
+
+    @property
+    def mean(self) -> Optional[float]:
+        return statistics.fmean(self._sorted) if self._sorted else None
+
+    @property
+    def stdev(self) -> Optional[float]:
+        return statistics.stdev(self._sorted) if len(self._sorted) > 1 else 0.0 if self._sorted else None
+
+    @property
+    def median(self) -> Optional[float]:
+        return self.percentile(50)
+
+    @property
+    def p90(self) -> Optional[float]:
+        return self.percentile(90)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> Optional[float]:
+        return self.percentile(99)
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """
+        The number of completed requests per second, including failed ones.
+        """
+        return (self.count + self.errors) / self.wall_time if self.wall_time else None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Returns the q-th percentile of the response times.
+
+        Args:
+            q (float): The percentile between 0 and 100.
+
+        Returns:
+            float: The percentile in seconds, or None if no request succeeded.
+        """
+        return percentile(self._sorted, q) if self._sorted else None
+
+    def outliers(self) -> Dict[str, int]:
+        """
+        Counts the outliers using Tukey's fences: samples further than 1.5 (mild) or
+        3 (severe) interquartile ranges below the first or above the third quartile.
+
+        Returns:
+            Dict[str, int]: The counts with the keys `low_mild`, `low_severe`, `high_mild` and `high_severe`.
+        """
+        counts = {"low_mild": 0, "low_severe": 0, "high_mild": 0, "high_severe": 0}
+        if len(self._sorted) < 4:
+            return counts
+
+        q1, q3 = percentile(self._sorted, 25), percentile(self._sorted, 75)
+        iqr = q3 - q1
+        for value in self._sorted:
+            if value < q1 - 3 * iqr:
+                counts["low_severe"] += 1
+            elif value < q1 - 1.5 * iqr:
+                counts["low_mild"] += 1
+            elif value > q3 + 3 * iqr:
+                counts["high_severe"] += 1
+            elif value > q3 + 1.5 * iqr:
+                counts["high_mild"] += 1
+        return counts
+
+    def _assert_below(self, name: str, value: Optional[float], max_time: float) -> 'BenchmarkResult':
+        assert value is not None, f"No successful requests to compute the {name} of {self.endpoint}"
+        assert value <= max_time, f"The {name} response time {value} of {self.endpoint} exceeds {max_time}"
+        return self
+
+    def assert_percentile_below(self, q: float, max_time: float) -> 'BenchmarkResult':
+        """
+        Asserts that the q-th percentile of the response times is less than or equal to the maximum time.
+
+        Args:
+            q (float): The percentile between 0 and 100.
+            max_time (float): The maximum expected response time in seconds.
+
+        Raises:
+            AssertionError: If the percentile exceeds the maximum time or no request succeeded.
+
+        Returns:
+            BenchmarkResult: The instance of the BenchmarkResult class for fluent chaining.
+        """
+        return self._assert_below(f"p{q:g}", self.percentile(q), max_time)
+
+    def assert_p99_below(self, max_time: float) -> 'BenchmarkResult':
+        """
+        Asserts that the 99th percentile of the response times is less than or equal to the maximum time.
+
+        Args:
+            max_time (float): The maximum expected response time in seconds.
+
+        Examples:
+            >>> given(client).when("GET", "/get").benchmark(iterations=500).assert_p99_below(0.2)
+
+        Raises:
+            AssertionError: If the 99th percentile exceeds the maximum time or no request succeeded.
+
+        Returns:
+            BenchmarkResult: The instance of the BenchmarkResult class for fluent chaining.
+        """
+        return self._assert_below("p99", self.p99, max_time)
+
+    def assert_mean_below(self, max_time: float) -> 'BenchmarkResult':
+        """
+        Asserts that the mean response time is less than or equal to the maximum time.
+
+        Args:
+            max_time (float): The maximum expected response time in seconds.
+
+        Raises:
+            AssertionError: If the mean exceeds the maximum time or no request succeeded.
+
+        Returns:
+            BenchmarkResult: The instance of the BenchmarkResult class for fluent chaining.
+        """
+        return self._assert_below("mean", self.mean, max_time)
+
+    def assert_no_errors(self) -> 'BenchmarkResult':
+        """
+        Asserts that every request received a response.
+
+        Raises:
+            AssertionError: If some requests failed with a transport error.
+
+        Returns:
+            BenchmarkResult: The instance of the BenchmarkResult class for fluent chaining.
+        """
+        assert not self.errors, f"{self.errors} of {self.count + self.errors} requests to {self.endpoint} failed"
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Returns the statistics without the samples.
+
+        Returns:
+            Dict[str, Any]: The endpoint, counts, throughput and latency statistics in seconds.
+        """
+        return {
+            "endpoint": self.endpoint,
+            "count": self.count,
+            "errors": self.errors,
+            "concurrency": self.concurrency,
+            "throughput": self.throughput,
+            "min": self.min,
+            "mean": self.mean,
+            "stdev": self.stdev,
+            "p50": self.median,
+            "p90": self.p90,
+            "p95": self.p95,
+            "p99": self.p99,
+            "max": self.max,
+            "outliers": self.outliers(),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the result as a JSON serializable dictionary, see `from_dict`.
+        """
+        return {
+            "method": self.method,
+            "url": self.url,
+            "samples": self.samples,
+            "errors": self.errors,
+            "status_codes": {str(code): count for code, count in self.status_codes.items()},
+            "concurrency": self.concurrency,
+            "wall_time": self.wall_time,
+            "summary": self.summary(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BenchmarkResult':
+        """
+        Rebuilds a result saved with `to_dict`.
+        """
+        return cls(data["method"], data["url"], data["samples"], errors=data.get("errors", 0),
+                   status_codes={int(code): count for code, count in data.get("status_codes", {}).items()},
+                   concurrency=data.get("concurrency", 1), wall_time=data.get("wall_time", 0.0))
+
+    def save(self, file_path: str) -> None:
+        """
+        Saves the result, including the samples, as JSON for later comparison.
+
+        Args:
+            file_path (str): The path of the file.
+        """
+        with open(file_path, "w") as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'BenchmarkResult':
+        """
+        Loads a result saved with `save`.
+        """
+        with open(file_path, "r") as file:
+            return cls.from_dict(json.load(file))
+
+    def __repr__(self):
+        return (f"BenchmarkResult({self.endpoint}, count={self.count}, errors={self.errors}, "
+                f"mean={self.mean}, p99={self.p99})")
+
+
+def run_benchmark(send: Callable[[], Any], method: str, url: str, iterations: int = 100, warmup: int = 0,
+                  concurrency: int = 1) -> BenchmarkResult:
+    """
+    Runs a request repeatedly and collects its response times.
+
+    Args:
+        send (Callable[[], UnifiedResponse]): Sends the request once and returns the response.
+        method (str): The HTTP method of the request.
+        url (str): The full URL of the request.
+        iterations (int): The number of measured requests.
+        warmup (int): The number of requests sent before measuring, e.g. to open the pooled connections.
+        concurrency (int): The number of requests in flight at the same time.
+
+    Returns:
+        BenchmarkResult: The statistics of the measured requests.
+    """
+    if iterations < 1 or warmup < 0 or concurrency < 1:
+        raise ValueError("The `iterations` and `concurrency` must be positive and `warmup` must not be negative.")
+
+    samples: List[float] = []
+    status_codes: Dict[int, int] = {}
+    errors = 0
+    lock = threading.Lock()
+
+    def measure():
+        nonlocal errors
+        try:
+            response = send()
+        except httpx.HTTPError:
+            with lock:
+                errors += 1
+            return
+        with lock:
+            samples.append(response.response_time)
+            status_codes[response.status_code] = status_codes.get(response.status_code, 0) + 1
+
+    if concurrency == 1:
+        for _ in range(warmup):
+            _send_ignoring_errors(send)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            measure()
+        wall_time = time.perf_counter() - start
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="reqflow-benchmark") as executor:
+            list(executor.map(lambda _: _send_ignoring_errors(send), range(warmup)))
+            start = time.perf_counter()
+            list(executor.map(lambda _: measure(), range(iterations)))
+            wall_time = time.perf_counter() - start
+
+    return BenchmarkResult(method, url, samples, errors=errors, status_codes=status_codes,
+                           concurrency=concurrency, wall_time=wall_time)
+
+
+def _send_ignoring_errors(send: Callable[[], Any]) -> None:
+    try:
+        send()
+    except httpx.HTTPError:
+        pass
@@ -0,0 +1,130 @@
+"""
+The `reqflow` command: runs declarative JSON/YAML suites without a pytest session.
+
+Usage:
+    reqflow suites/ smoke.yaml --var BASE_URL=https://staging.example.com --workers 4 --junit report.xml
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Only the standard library is imported at module level so that `reqflow --help` and argument errors are instant,
+# the HTTP stack is imported once there is something to run.
+
+SUITE_EXTENSIONS = (".yaml", ".yml", ".json")
+
+
+def _collect(paths: List[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(file for file in glob.glob(os.path.join(path, "**", "*"), recursive=True)
+                                if file.endswith(SUITE_EXTENSIONS)))
+        else:
+            files.append(path)
+    return files
+
+
+def _parse_variables(items: List[str]) -> Dict[str, str]:
+    variables = {}
+    for item in items:
+        name, separator, value = item.partition("=")
+        if not separator or not name:
+            raise argparse.ArgumentTypeError(f"Invalid variable {item!r}, expected NAME=VALUE")
+        variables[name] = value
+    return variables
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="reqflow", description="Runs declarative ReqFlow suites (JSON or YAML).")
+    parser.add_argument("paths", nargs="+", help="Suite files, or directories searched for *.yaml/*.yml/*.json.")
+    parser.add_argument("--var", action="append", default=[], metavar="NAME=VALUE",
+                        help="Sets a variable, overriding the variables of the suites. Can be repeated.")
+    parser.add_argument("--base-url", help="Overrides the base URL of the suites.")
+    parser.add_argument("--concurrency", type=int, help="Overrides the number of tests of a suite run at once.")
+    parser.add_argument("--retries", type=int, help="Overrides the number of retries of failed tests.")
+    parser.add_argument("--workers", type=int,
+                        help="The number of processes running suites in parallel. Defaults to one per CPU core.")
+    parser.add_argument("--html", metavar="FILE", help="Writes the HTML report of the requests.")
+    parser.add_argument("--json", metavar="FILE", help="Writes the JSON report of the requests.")
+    parser.add_argument("--junit", metavar="FILE", help="Writes a JUnit XML report of the tests.")
+    parser.add_argument("--report-title", default="ReqFlow Suites", help="The title of the HTML report.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only prints the failed tests and the summary.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the `reqflow` command.
+
+    Returns:
+        int: The exit status: 0 if every test passed, 1 if a test failed, 2 for usage or suite errors.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        variables = _parse_variables(args.var)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    files = _collect(args.paths)
+    missing = [file for file in files if not os.path.isfile(file)]
+    if missing or not files:
+        parser.error(f"No such suite file: {', '.join(missing)}" if missing else "No suite files found")
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    from reqflow.exceptions import InvalidArgumentError
+    from reqflow.suite import run_suite
+    from reqflow.utils.logger import GlobalLogger
+
+    want_logs = bool(args.html or args.json)
+    options = {"variables": variables, "base_url": args.base_url, "concurrency": args.concurrency,
+               "retries": args.retries}
+    workers = min(len(files), args.workers or os.cpu_count() or 1)
+    start = time.perf_counter()
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(run_suite, file, return_logs=want_logs, **options) for file in files]
+                results = [future.result() for future in futures]
+            for result in results:
+                for entry in result.logs or ():
+                    GlobalLogger.log_request(entry)
+        else:
+            results = [run_suite(file, logging=want_logs, **options) for file in files]
+    except (InvalidArgumentError, OSError, ValueError) as e:
+        print(f"reqflow: error: {e}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+
+    passed = failed = 0
+    for result in results:
+        for case in result.cases:
+            if case.passed:
+                passed += 1
+            else:
+                failed += 1
+            if case.passed and args.quiet:
+                continue
+            attempts = f", {case.attempts} attempts" if case.attempts > 1 else ""
+            print(f"{'PASS' if case.passed else 'FAIL'} {result.name} :: {case.name} ({case.time:.3f}s{attempts})")
+            if not case.passed:
+                for line in [case.error] if case.error else case.failures:
+                    print(f"     {line}")
+    print(f"{passed} passed, {failed} failed in {elapsed:.2f}s")
+
+    if args.junit:
+        from reqflow.utils.junit import write_junit_xml
+        write_junit_xml(results, args.junit)
+    if args.html:
+        GlobalLogger.generate_html_report(file_path=args.html, report_title=args.report_title)
+    if args.json:
+        GlobalLogger.generate_json_report(file_path=args.json)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
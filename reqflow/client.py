@@ -1,10 +1,67 @@
-from typing import Any, Dict, Optional, Union
+import asyncio
+import json as jsonlib
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional, Tuple, Union
 
 import httpx
-import time
+import sys
+from time import perf_counter_ns
+from reqflow.exceptions import InvalidArgumentError, ResponseTooLargeError
 from reqflow.response.response import UnifiedResponse
+from reqflow.utils.context import caller_context, get_caller_context
+from reqflow.utils.deadline import Deadline, current_deadline
+from reqflow.utils.limits import SIZE_LIMIT_EXTENSION, aread_limited, read_limited
 from reqflow.utils.logger import GlobalLogger
-import inspect
+from reqflow.utils.loop import track_client
+from reqflow.utils.metrics import MetricsRegistry
+from reqflow.utils.retention import CANDIDATE, KEEP
+from reqflow.utils.timing import NS_PER_SECOND, PhaseTracer, RequestTimings
+from reqflow.utils.transports import APP_BASE_URL, app_transports
+from reqflow.utils.url import url_template
+
+if TYPE_CHECKING:
+    from reqflow.faults import FaultInjection
+    from reqflow.hedging import HedgingPolicy
+
+
+class _ResponseSnapshot:
+    """
+    The status, headers and body of an httpx response, to log a dropped request later without keeping the response.
+    """
+    __slots__ = ("status_code", "raw_headers", "content")
+
+    def __init__(self, response: httpx.Response):
+        self.status_code = response.status_code
+        self.raw_headers = response.headers.raw
+        self.content = response.content
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return httpx.Headers(self.raw_headers)
+
+
+class _EncodedJson:
+    """
+    A pre-encoded JSON request body, e.g. rendered by a `RequestTemplate`, decoded only if its log entry is built.
+    """
+    __slots__ = ("content",)
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+
+def _logged_body(json: Any, data: Any, content: Optional[bytes], headers: Optional[Dict[str, Any]]) -> Tuple[Any, Any]:
+    """
+    Returns the JSON body and the data logged for a request. Pre-encoded content is logged as JSON if the request
+    declares a JSON content type, otherwise as data.
+    """
+    if content is None:
+        return json, data
+    for name, value in (headers or {}).items():
+        if name.lower() == "content-type" and "json" in str(value):
+            return _EncodedJson(content), None
+    return None, content
+
 
 class Client:
     """
@@ -14,19 +71,131 @@ class Client:
         >>> from reqflow import Client
         >>>
         >>> client = Client(base_url="https://some_url.com")
+        >>>
+        >>> # In-process, without a server
+        >>> from my_service import app
+        >>> client = Client(app=app)
+        >>>
+        >>> # Over a Unix domain socket
+        >>> client = Client(base_url="http://localhost", uds="/run/service.sock")
 
     """
 
-    def __init__(self, base_url: Optional[str] = "", logging: Optional[bool] = False):
+    def __init__(self, base_url: Optional[str] = "", logging: Optional[bool] = False,
+                 trace_caller: Optional[bool] = False, metrics: Union[bool, MetricsRegistry] = False,
+                 transport: Optional[httpx.BaseTransport] = None,
+                 async_transport: Optional[httpx.AsyncBaseTransport] = None, app: Optional[Callable] = None,
+                 uds: Union[None, str, Dict[str, str]] = None, hedging: Optional['HedgingPolicy'] = None,
+                 faults: Optional['FaultInjection'] = None, max_response_bytes: Optional[int] = None,
+                 truncate_responses: bool = False):
         """
         Args:
             base_url (str): The base URL for all requests sent by this client. The URL parameter is optional and can be overridden by the URL parameter in when() method.
             logging (bool): If True, logs will be stored for each request sent by this client.
+            trace_caller (bool): If True, requests sent outside a test or `context()` scope are attributed
+                to the first calling function outside of ReqFlow by walking the stack. Defaults to False.
+            metrics (Union[bool, MetricsRegistry]): If True, latency histograms are kept in a new `MetricsRegistry`
+                available as `client.metrics`. A registry can be passed to share it between clients.
+            transport (httpx.BaseTransport): Optional httpx transport of the sync client, e.g. `httpx.MockTransport`
+                to send requests in-process without sockets.
+            async_transport (httpx.AsyncBaseTransport): Optional httpx transport of the async client.
+            app (Callable): An ASGI (e.g. FastAPI) or WSGI (e.g. Flask) application. Requests are sent to the
+                application in-process instead of over the network. The base URL defaults to "http://testserver".
+            uds (Union[str, Dict[str, str]]): The path of a Unix domain socket to send all requests to, or a
+                dictionary mapping URL prefixes (e.g. "http://sidecar") to socket paths. The host of the URL is
+                only used in the Host header. Requests to other URLs use TCP.
+            hedging (HedgingPolicy): Sends a duplicate of the idempotent async requests that are slower than the
+                hedge delay of the policy and keeps the first response, see `reqflow.hedging.HedgingPolicy`.
+            faults (FaultInjection): Injects latency, connection resets, timeouts, error responses, truncated bodies
+                and bandwidth limits into the requests, see `reqflow.faults.FaultInjection`.
+            max_response_bytes (int): The maximum size of the (decoded) response bodies. Larger bodies are streamed
+                up to the limit, then the connection is closed and a `ResponseTooLargeError` is raised.
+            truncate_responses (bool): Returns the first `max_response_bytes` of larger bodies instead of raising,
+                with `response.truncated` set.
         """
+        if sum(option is not None for option in (app, uds, transport or async_transport)) > 1:
+            raise InvalidArgumentError("Only one of `app`, `uds` and a transport can be provided.")
+        mounts = async_mounts = None
+        if app is not None:
+            transport, async_transport = app_transports(app)
+            base_url = base_url or APP_BASE_URL
+        elif isinstance(uds, str):
+            transport, async_transport = httpx.HTTPTransport(uds=uds), httpx.AsyncHTTPTransport(uds=uds)
+        elif uds is not None:
+            mounts = {url: httpx.HTTPTransport(uds=path) for url, path in uds.items()}
+            async_mounts = {url: httpx.AsyncHTTPTransport(uds=path) for url, path in uds.items()}
+        if faults is not None:
+            transport = faults.transport(transport or httpx.HTTPTransport())
+            async_transport = faults.async_transport(async_transport or httpx.AsyncHTTPTransport())
+            mounts = mounts and {url: faults.transport(mount) for url, mount in mounts.items()}
+            async_mounts = async_mounts and {url: faults.async_transport(mount) for url, mount in async_mounts.items()}
+
         self.base_url = base_url
         self.logging = logging
-        self.http_client = httpx.Client()
-        self.async_http_client = httpx.AsyncClient()
+        self.trace_caller = trace_caller
+        self.metrics = MetricsRegistry() if metrics is True else (metrics or None)
+        self.hedging = hedging
+        self.max_response_bytes = max_response_bytes
+        self.truncate_responses = truncate_responses
+        self.http_client = httpx.Client(transport=transport, mounts=mounts)
+        self.async_http_client = httpx.AsyncClient(transport=async_transport, mounts=async_mounts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the sync httpx client and its connections.
+        """
+        self.http_client.close()
+
+    def pool_stats(self, sync: bool = False) -> Dict[str, int]:
+        """
+        Returns the state of the connection pools of the async (or sync) httpx client.
+
+        Transports without a connection pool, e.g. `httpx.MockTransport` or in-process applications, are not counted.
+
+        Args:
+            sync (bool): Returns the stats of the sync client instead of the async client.
+
+        Examples:
+            >>> client.pool_stats()
+            >>> {'connections': 10, 'active': 8, 'idle': 2, 'queued': 0}
+
+        Returns:
+            Dict[str, int]: The number of open connections, of connections with a request in flight, of idle
+            connections and of requests waiting for a connection.
+        """
+        http_client = self.http_client if sync else self.async_http_client
+        stats = {"connections": 0, "active": 0, "idle": 0, "queued": 0}
+        transports = [getattr(http_client, "_transport", None)]
+        transports.extend(getattr(http_client, "_mounts", {}).values())
+        for transport in transports:
+            # Wrapping transports, e.g. fault injection, keep the wrapped transport in `_transport`
+            while hasattr(transport, "_transport"):
+                transport = transport._transport
+            pool = getattr(transport, "_pool", None)
+            if pool is None:
+                continue
+            for connection in pool.connections:
+                stats["connections"] += 1
+                stats["idle" if connection.is_idle() else "active"] += 1
+            stats["queued"] += sum(1 for request in getattr(pool, "_requests", ()) if request.is_queued())
+        return stats
+
+    async def close_async_connections(self) -> None:
+        """
+        Closes the open connections of the async httpx client, which stays usable and opens new connections on the
+        next request, e.g. on another event loop.
+        """
+        transports = [getattr(self.async_http_client, "_transport", None)]
+        transports.extend(getattr(self.async_http_client, "_mounts", {}).values())
+        for transport in transports:
+            if transport is not None:
+                await transport.aclose()
 
     async def __aenter__(self):
         return self
@@ -35,11 +204,60 @@ class Client:
         await self.async_http_client.aclose()
         self.http_client.close()
 
+    @contextmanager
+    def context(self, name: str) -> Iterator[None]:
+        """
+        Attributes the requests logged inside the block to `name`.
+
+        Args:
+            name (str): The name stored in the `function` field of the log entries.
+
+        Examples:
+            >>> client = Client(base_url="https://some_url.com", logging=True)
+            >>> with client.context("checkout_flow"):
+            >>>     given(client).when("GET", "/cart").then().status_code(200)
+        """
+        with caller_context(name):
+            yield
+
+    def deadline(self, seconds: float, name: Optional[str] = None) -> Deadline:
+        """
+        Returns a time budget for all the requests sent inside the `with` or `async with` block.
+
+        The timeout of each request is trimmed to the remaining budget, and async requests in flight are cancelled
+        when it runs out. Requests sent after that raise a `DeadlineExceededError` reporting where the time went.
+
+        Args:
+            seconds (float): The budget in seconds.
+            name (str): Optional name shown in the report.
+
+        Examples:
+            >>> with client.deadline(10, name="checkout"):
+            >>>     given(client).when("POST", "/cart").then().status_code(201)
+            >>>     given(client).when("POST", "/orders").then().status_code(201)
+            >>>
+            >>> async with client.deadline(2):
+            >>>     await given(client).when("GET", "/items").then_async()
+
+        Returns:
+            Deadline: The deadline, also a sync and async context manager.
+        """
+        return Deadline(seconds, name)
+
     @staticmethod
-    def _log_request(called_function, method, url, params, headers, cookies, json, data,
-                    redirect, files, timeout, response, response_time):
+    def _build_log_entry(called_function, test_id, method, url, params, headers, cookies, json, data,
+                         redirect, files, timeout, response, response_time, error=None,
+                         timings: Optional[RequestTimings] = None,
+                         hedge: Optional[Dict[str, Any]] = None,
+                         size_limit: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if isinstance(json, _EncodedJson):
+            try:
+                json = jsonlib.loads(json.content)
+            except ValueError:
+                json, data = None, json.content
         log_entry = {
             'function': called_function,
+            'test_id': test_id,
             'request': {
                 'method': method,
                 'url': url,
@@ -53,28 +271,83 @@ class Client:
                 'timeout': timeout
             },
             'response': {
-                'status_code': response.status_code,
-                'headers': dict(response.headers),
-                'content': response.content,
-                'time': response_time
+                'status_code': response.status_code if response is not None else None,
+                'headers': dict(response.headers) if response is not None else {},
+                'content': response.content if response is not None else None,
+                'time': response_time,
+                'timings': timings.to_dict() if timings is not None else None
             }
         }
+        if error is not None:
+            log_entry['response']['error'] = repr(error)
+        if hedge is not None:
+            log_entry['response']['hedge'] = hedge
+        if size_limit is not None:
+            log_entry['response']['size_limit'] = size_limit
 
-        GlobalLogger.log_request(log_entry)
+        return log_entry
+
+    @classmethod
+    def _log_request(cls, called_function, test_id, method, url, params, headers, cookies, json, data,
+                     redirect, files, timeout, response, response_time, error=None, timings=None, hedge=None,
+                     size_limit=None):
+        GlobalLogger.log_request(cls._build_log_entry(called_function, test_id, method, url, params, headers,
+                                                      cookies, json, data, redirect, files, timeout, response,
+                                                      response_time, error, timings, hedge, size_limit))
 
     @staticmethod
     def _get_caller() -> Union[str, None]:
-        try:
-            current_frame = inspect.currentframe()
-            return inspect.getouterframes(current_frame)[4].__getattribute__('function')
-        except IndexError:
-            return None
+        frame = sys._getframe(1)
+        while frame is not None:
+            module = frame.f_globals.get('__name__', '')
+            if not module.startswith(('reqflow.', 'asyncio', 'contextlib')):
+                return frame.f_code.co_name
+            frame = frame.f_back
+        return None
 
     def _add_to_log(self, method, url, params, headers, cookies, json, data,
-                    redirect, files, timeout, response, response_time) -> None:
-        called_function = self._get_caller()
-        self._log_request(called_function, method, url, params, headers, cookies, json,
-                             data, redirect, files, timeout, response, response_time)
+                    redirect, files, timeout, response, response_time, error=None,
+                    timings=None, hedge=None, size_limit=None) -> Optional[Callable[[], None]]:
+        """
+        Logs the request according to the retention policy of the GlobalLogger.
+
+        Returns:
+            A callable that keeps the request in the logs if the policy did not keep it, otherwise None.
+        """
+        context = get_caller_context()
+        if context is not None:
+            called_function, test_id = context
+        else:
+            called_function, test_id = (self._get_caller() if self.trace_caller else None), None
+        log_args = (called_function, test_id, method, url, params, headers, cookies, json,
+                    data, redirect, files, timeout, response, response_time, error, timings, hedge, size_limit)
+
+        policy = GlobalLogger.retention_policy
+        decision = KEEP if policy is None else \
+            policy.admit(method, url, response.status_code if response is not None else None, response_time)
+        if decision == KEEP:
+            self._log_request(*log_args)
+            return None
+
+        if decision == CANDIDATE:
+            candidate = policy.add_candidate(method, url, response_time, self._build_log_entry(*log_args))
+
+            def retain():
+                if not candidate.logged:
+                    candidate.logged = True
+                    policy.record_kept(method, url)
+                    GlobalLogger.log_request(candidate.entry)
+            return retain
+
+        # Dropped requests only keep the parts of the response needed to log them later, not the httpx response
+        dropped_args = (called_function, test_id, method, url, params, headers, cookies, json, data, redirect, files,
+                        timeout, _ResponseSnapshot(response) if response is not None else None, response_time, error,
+                        timings, hedge, size_limit)
+
+        def retain():
+            policy.record_kept(method, url)
+            self._log_request(*dropped_args)
+        return retain
 
     def send(
         self,
@@ -88,25 +361,132 @@ class Client:
         redirect: Optional[bool] = False,
         files: Optional[Dict[str, Any]] = None,
         timeout: Optional[float] = 5.0,
-        force_json: Optional[bool] = False
+        force_json: Optional[bool] = False,
+        content: Optional[bytes] = None,
+        max_response_bytes: Optional[int] = None,
+        truncate_response: Optional[bool] = None
     ) -> UnifiedResponse:
 
-        start_time = time.time()
         full_url = f"{self.base_url}{url}"
+        logged_json, logged_data = _logged_body(json, data, content, headers)
+        deadline = current_deadline()
+        if deadline is not None:
+            timeout = deadline.timeout_for(method, full_url, timeout)
+        tracer = PhaseTracer()
+        limit = self.max_response_bytes if max_response_bytes is None else max_response_bytes
+        truncate = self.truncate_responses if truncate_response is None else truncate_response
 
-        http_response = self.http_client.request(
-            method, full_url, params=params, headers=headers, json=json, data=data,cookies=cookies,
-            follow_redirects=redirect, files=files, timeout=timeout
-        )
+        try:
+            if limit is None:
+                http_response = self.http_client.request(
+                    method, full_url, params=params, headers=headers, json=json, data=data, content=content,
+                    cookies=cookies, follow_redirects=redirect, files=files, timeout=timeout,
+                    extensions={"trace": tracer}
+                )
+            else:
+                request = self.http_client.build_request(
+                    method, full_url, params=params, headers=headers, json=json, data=data, content=content,
+                    cookies=cookies, files=files, timeout=timeout, extensions={"trace": tracer}
+                )
+                http_response = read_limited(self.http_client.send(request, follow_redirects=redirect, stream=True),
+                                             limit, truncate)
+        except (httpx.HTTPError, ResponseTooLargeError) as e:
+            timings = tracer.finish()
+            if self.metrics is not None:
+                self.metrics.observe(method, full_url, None, timings.total)
+            if self.logging:
+                self._add_to_log(method, full_url, params, headers, cookies, logged_json,
+                                 logged_data, redirect, files, timeout, None, timings.total, error=e, timings=timings,
+                                 size_limit=self._size_limit_info(e))
+            if deadline is not None:
+                deadline.record(method, full_url, None, timings.total, e)
+                if deadline.expired and isinstance(e, httpx.TimeoutException):
+                    raise deadline.exceeded(method, full_url) from e
+            raise
 
-        response_time = time.time() - start_time
+        timings = tracer.finish()
+        response_time = timings.total
+        if deadline is not None:
+            deadline.record(method, full_url, http_response.status_code, response_time)
+        if self.metrics is not None:
+            self.metrics.observe(method, full_url, http_response.status_code, response_time)
 
+        size_limit = http_response.extensions.get(SIZE_LIMIT_EXTENSION)
+        retain_log = None
         if self.logging:
-            self._add_to_log(method, full_url, params, headers, cookies, json,
-                             data, redirect, files, timeout, http_response, response_time)
+            retain_log = self._add_to_log(method, full_url, params, headers, cookies, logged_json,
+                                          logged_data, redirect, files, timeout, http_response, response_time,
+                                          timings=timings, size_limit=size_limit)
+
+        return UnifiedResponse(http_response, response_time, response_type='REST', force_json=force_json,
+                               retain_log=retain_log, timings=timings, truncated=size_limit is not None)
+
+    @staticmethod
+    def _size_limit_info(error: Exception) -> Optional[Dict[str, Any]]:
+        if not isinstance(error, ResponseTooLargeError):
+            return None
+        return {"limit": error.limit, "size": error.size, "status_code": error.status_code, "truncated": False}
+
+    async def _request_async(self, method: str, url: str, tracer: PhaseTracer, request_kwargs: Dict[str, Any],
+                             limit: Optional[int], truncate: bool) -> httpx.Response:
+        """
+        Sends the request with the async client, streaming the body up to `limit` bytes if there is a limit.
+        """
+        track_client(self)
+        if limit is None:
+            return await self.async_http_client.request(method, url, extensions={"trace": tracer.trace_async},
+                                                        **request_kwargs)
+        options = dict(request_kwargs)
+        follow_redirects = options.pop("follow_redirects")
+        request = self.async_http_client.build_request(method, url, extensions={"trace": tracer.trace_async},
+                                                       **options)
+        response = await self.async_http_client.send(request, follow_redirects=follow_redirects, stream=True)
+        return await aread_limited(response, limit, truncate)
 
+    async def _request_hedged(self, policy: 'HedgingPolicy', method: str, url: str, tracer: PhaseTracer,
+                              request_kwargs: Dict[str, Any], limit: Optional[int], truncate: bool
+                              ) -> Tuple[httpx.Response, PhaseTracer, Dict[str, Any]]:
+        """
+        Sends the request, and a duplicate each time the hedge delay passes without a response, up to the
+        `max_hedges` of the policy. Returns the first response, the tracer of the winning request and the hedge info.
+        The other requests are cancelled. A failed request only fails the call if no other request is in flight, it is
+        then recorded in the policy without a response time.
+        """
+        endpoint = f"{method.upper()} {url_template(url)}"
+        delay = policy.delay_for(endpoint)
+        tracers, tasks = [], []
+
+        def launch(request_tracer: PhaseTracer) -> asyncio.Task:
+            tracers.append(request_tracer)
+            tasks.append(asyncio.ensure_future(self._request_async(method, url, request_tracer, request_kwargs,
+                                                                   limit, truncate)))
+            return tasks[-1]
+
+        pending = {launch(tracer)}
+        winner = None
+        try:
+            while winner is None:
+                can_hedge = len(tasks) <= policy.max_hedges
+                done, pending = await asyncio.wait(pending, timeout=delay if can_hedge else None,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    pending.add(launch(PhaseTracer()))
+                    continue
+                succeeded = [task for task in tasks if task in done and task.exception() is None]
+                if succeeded:
+                    winner = succeeded[0]
+                elif not pending:
+                    raise next(task.exception() for task in reversed(tasks) if task in done)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            if winner is None:
+                policy.record(endpoint, None, len(tasks) - 1)
 
-        return UnifiedResponse(http_response, response_time, response_type='REST', force_json=force_json)
+        index = tasks.index(winner)
+        return winner.result(), tracers[index], {"sent": len(tasks) - 1, "winner": index, "delay": delay}
 
     async def send_async(
         self,
@@ -120,21 +500,87 @@ class Client:
         redirect: Optional[bool] = False,
         files: Optional[Dict[str, Any]] = None,
         timeout: Optional[float] = 5.0,
-        force_json: Optional[bool] = False
+        force_json: Optional[bool] = False,
+        content: Optional[bytes] = None,
+        max_response_bytes: Optional[int] = None,
+        truncate_response: Optional[bool] = None
     ) -> UnifiedResponse:
+        return await self._send_async(self.hedging, method, url, params, headers, cookies, json, data, redirect, files,
+                                      timeout, force_json, content, max_response_bytes, truncate_response)
 
-        start_time = time.time()
+    async def _send_async(self, hedging: Optional['HedgingPolicy'], method: str, url: str = "",
+                          params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, Any]] = None,
+                          cookies: Optional[Dict[str, Any]] = None, json: Optional[Any] = None,
+                          data: Optional[Any] = None, redirect: Optional[bool] = False,
+                          files: Optional[Dict[str, Any]] = None, timeout: Optional[float] = 5.0,
+                          force_json: Optional[bool] = False, content: Optional[bytes] = None,
+                          max_response_bytes: Optional[int] = None, truncate_response: Optional[bool] = None
+                          ) -> UnifiedResponse:
+        """
+        `send_async` with the hedging policy passed explicitly instead of read from the client, so that a caller
+        can send with another policy, or none, without changing the client shared with other coroutines.
+        """
         full_url = f"{self.base_url}{url}"
+        logged_json, logged_data = _logged_body(json, data, content, headers)
+        deadline = current_deadline()
+        if deadline is not None:
+            timeout = deadline.timeout_for(method, full_url, timeout)
+        tracer = PhaseTracer()
 
-        http_response = await self.async_http_client.request(
-            method, full_url, params=params, headers=headers, json=json, data=data,cookies=cookies,
-            follow_redirects=redirect, files=files, timeout=timeout
-        )
+        request_kwargs = dict(params=params, headers=headers, json=json, data=data, content=content, cookies=cookies,
+                              follow_redirects=redirect, files=files, timeout=timeout)
+        limit = self.max_response_bytes if max_response_bytes is None else max_response_bytes
+        truncate = self.truncate_responses if truncate_response is None else truncate_response
+        hedge = None
 
-        response_time = time.time() - start_time
+        try:
+            hedged = hedging is not None and not files and hedging.applies_to(method)
+            if hedged:
+                sending = self._request_hedged(hedging, method, full_url, tracer, request_kwargs, limit, truncate)
+            else:
+                sending = self._request_async(method, full_url, tracer, request_kwargs, limit, truncate)
+            # The timeouts of httpx apply to each read, a total timeout needs cancelling the request
+            result = await (sending if deadline is None else deadline.wait_for(sending))
+            if hedged:
+                http_response, winner, hedge = result
+            else:
+                http_response = result
+        except (httpx.HTTPError, ResponseTooLargeError) as e:
+            timings = tracer.finish()
+            if self.metrics is not None:
+                self.metrics.observe(method, full_url, None, timings.total)
+            if self.logging:
+                self._add_to_log(method, full_url, params, headers, cookies, logged_json,
+                                 logged_data, redirect, files, timeout, None, timings.total, error=e, timings=timings,
+                                 size_limit=self._size_limit_info(e))
+            if deadline is not None:
+                deadline.record(method, full_url, None, timings.total, e)
+                if deadline.expired and isinstance(e, httpx.TimeoutException):
+                    raise deadline.exceeded(method, full_url) from e
+            raise
 
-        if self.logging:
-            self._add_to_log(method, full_url, params, headers, cookies, json,
-                             data, redirect, files, timeout, http_response, response_time)
+        if hedge is None:
+            timings = tracer.finish()
+            response_time = timings.total
+        else:
+            # The timings are those of the winning request, the response time includes the hedge delay
+            end_ns = perf_counter_ns()
+            timings = winner.finish(end_ns)
+            response_time = (end_ns - tracer.start_ns) / NS_PER_SECOND
+            hedging.record(f"{method.upper()} {url_template(full_url)}", response_time, hedge["sent"],
+                           hedge["winner"] > 0)
+        if deadline is not None:
+            deadline.record(method, full_url, http_response.status_code, response_time)
+        if self.metrics is not None:
+            self.metrics.observe(method, full_url, http_response.status_code, response_time)
+            if hedge is not None and hedge["sent"]:
+                self.metrics.observe_hedge(method, full_url, hedge["sent"], hedge["winner"] > 0)
 
-        return UnifiedResponse(http_response, response_time, response_type='REST', force_json=force_json)
+        size_limit = http_response.extensions.get(SIZE_LIMIT_EXTENSION)
+        retain_log = None
+        if self.logging:
+            retain_log = self._add_to_log(method, full_url, params, headers, cookies, logged_json,
+                                          logged_data, redirect, files, timeout, http_response, response_time,
+                                          timings=timings, hedge=hedge, size_limit=size_limit)
+        return UnifiedResponse(http_response, response_time, response_type='REST', force_json=force_json,
+                               retain_log=retain_log, timings=timings, truncated=size_limit is not None)
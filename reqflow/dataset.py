@@ -0,0 +1,355 @@
+import asyncio
+import csv
+import io
+import json as jsonlib
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from jsonpath_ng import parse
+
+from reqflow import assertions
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.response.response import UnifiedResponse
+from reqflow.utils.loop import run_sync
+from reqflow.utils.sinks import JsonlSink, _open
+
+if TYPE_CHECKING:
+    from reqflow.client import Client
+    from reqflow.template import RequestTemplate
+
+FORMATS = ("jsonl", "csv")
+_REQUEST_FIELDS = ("method", "url", "params", "headers", "cookies", "json", "data")
+_MATCHERS = {name: getattr(assertions, name) for name in (
+    "equal_to", "not_equal_to", "contains_string", "greater_than", "less_than", "list_contains", "matches_regex")}
+_NO_ARGUMENT_MATCHERS = {"is_none": assertions.is_none, "is_not_none": assertions.is_not_none}
+
+
+def _detect(file_path: str) -> tuple:
+    """
+    Returns the (format, compression) of a case file from its extension, e.g. "cases.jsonl.gz".
+    """
+    name, compression = file_path.lower(), None
+    for extension, value in ((".gz", "gzip"), (".zst", "zstd")):
+        if name.endswith(extension):
+            name, compression = name[:-len(extension)], value
+    if name.endswith(".csv"):
+        return "csv", compression
+    return "jsonl", compression
+
+
+def _cell(value: str) -> Any:
+    """
+    Decodes a CSV cell holding a JSON value (a number, true/false, null, a list or an object), otherwise keeps the text.
+    """
+    try:
+        return jsonlib.loads(value)
+    except ValueError:
+        return value
+
+
+def _from_csv_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Turns a CSV row into a case. Columns like `headers.X-Id`, `params.page`, `expect.status` and
+    `expect.body.<json path>` are nested, empty cells are skipped.
+    """
+    case: Dict[str, Any] = {}
+    for column, value in row.items():
+        if column is None or value is None or value == "":
+            continue
+        prefix, _, rest = column.partition(".")
+        if prefix == "expect" and rest:
+            kind, _, key = rest.partition(".")
+            expect = case.setdefault("expect", {})
+            if key:
+                expect.setdefault(kind, {})[key] = _cell(value)
+            else:
+                expect[kind] = _cell(value)
+        elif prefix in ("params", "headers") and rest:
+            case.setdefault(prefix, {})[rest] = value
+        else:
+            case[column] = _cell(value)
+    return case
+
+
+def iter_cases(file_path: str, format: Optional[str] = None, compression: Optional[str] = None
+               ) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the cases of a JSON Lines or CSV file one row at a time.
+
+    Args:
+        file_path (str): The path of the file, optionally compressed with gzip (".gz") or zstd (".zst").
+        format (str): "jsonl" or "csv". Detected from the file extension by default.
+        compression (str): None, "gzip" or "zstd". Detected from the file extension by default.
+
+    Returns:
+        Iterator[Dict[str, Any]]: The cases.
+    """
+    detected_format, detected_compression = _detect(file_path)
+    format = format or detected_format
+    compression = compression or detected_compression
+    if format not in FORMATS:
+        raise InvalidArgumentError(f"Invalid format: {format}. Must be one of {list(FORMATS)}.")
+
+    with _open(file_path, "rb", compression) as raw:
+        text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        if format == "csv":
+            for row in csv.DictReader(text):
+                yield _from_csv_row(row)
+        else:
+            for line in text:
+                if line.strip():
+                    yield jsonlib.loads(line)
+
+
+@lru_cache(maxsize=1024)
+def _json_path(expression: str):
+    return parse(expression)
+
+
+def _mismatch(actual: Any, expected: Any) -> Optional[str]:
+    """
+    Compares a value with an expected value or a matcher like `{"greater_than": 5}`, named after the functions of
+    `reqflow.assertions`. Returns why they do not match, or None.
+    """
+    if isinstance(expected, dict) and len(expected) == 1:
+        name, argument = next(iter(expected.items()))
+        if name in _MATCHERS or name in _NO_ARGUMENT_MATCHERS:
+            assertion = _MATCHERS[name](argument) if name in _MATCHERS else _NO_ARGUMENT_MATCHERS[name]()
+            try:
+                assertion(actual)
+            except (AssertionError, TypeError) as e:
+                return str(e) or f"Expected {actual!r} to satisfy {name}({argument!r})"
+            return None
+    if actual != expected:
+        return f"Expected {expected!r}, got {actual!r}"
+    return None
+
+
+def check_response(response: UnifiedResponse, expect: Dict[str, Any]) -> List[str]:
+    """
+    Compares a response with an expected-response spec.
+
+    The expected header and body values are compared for equality, or can be matchers named after the functions of
+    `reqflow.assertions`, e.g. `{"contains_string": "json"}`, `{"greater_than": 0}` or `{"is_not_none": null}`.
+
+    Args:
+        response (UnifiedResponse): The response.
+        expect (Dict[str, Any]): The spec, with the optional keys `status` (a status code or a list of them),
+            `headers` (header name to value), `body` (JSONPath expression to value) and `max_time` (seconds).
+
+    Returns:
+        List[str]: The failed expectations, empty if the response matches the spec.
+    """
+    failures = []
+    status = expect.get("status")
+    if status is not None:
+        allowed = status if isinstance(status, (list, tuple)) else [status]
+        if response.status_code not in [int(code) for code in allowed]:
+            failures.append(f"Expected status {status}, got {response.status_code}")
+
+    max_time = expect.get("max_time")
+    if max_time is not None and response.response_time > float(max_time):
+        failures.append(f"Expected a response within {max_time}s, took {response.response_time:.3f}s")
+
+    for name, expected in (expect.get("headers") or {}).items():
+        if not isinstance(expected, dict):
+            expected = str(expected)
+        mismatch = _mismatch(response.headers.get(name), expected)
+        if mismatch:
+            failures.append(f"Header {name}: {mismatch}")
+
+    body_expectations = expect.get("body") or {}
+    if body_expectations:
+        if not isinstance(response.body, (dict, list)):
+            failures.append("Response body is not valid JSON")
+            return failures
+        for path, expected in body_expectations.items():
+            matches = _json_path(path).find(response.body)
+            if not matches:
+                failures.append(f"JSONPath {path} does not match any elements in the JSON response")
+                continue
+            mismatch = _mismatch(matches[0].value, expected)
+            if mismatch:
+                failures.append(f"{path}: {mismatch}")
+    return failures
+
+
+class DatasetResult:
+    """
+    The outcome of running a set of cases with `run_cases`.
+
+    Only counters and the first `max_failures` failed cases are kept in memory, every case is written to the result
+    file when one is given.
+    """
+
+    def __init__(self, max_failures: int = 100):
+        self.total = 0
+        self.passed = 0
+        self.failed = 0
+        self.errors = 0
+        self.status_codes: Dict[int, int] = {}
+        self.failures: List[Dict[str, Any]] = []
+        self.wall_time = 0.0
+        self._max_failures = max_failures
+
+    def _add(self, record: Dict[str, Any]) -> None:
+        self.total += 1
+        status_code = record["status_code"]
+        if status_code is not None:
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+        if record["passed"]:
+            self.passed += 1
+            return
+        if record["error"] is not None:
+            self.errors += 1
+        else:
+            self.failed += 1
+        if len(self.failures) < self._max_failures:
+            self.failures.append(record)
+
+    @property
+    def throughput(self) -> float:
+        """
+        The number of cases run per second.
+        """
+        return self.total / self.wall_time if self.wall_time else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {"total": self.total, "passed": self.passed, "failed": self.failed, "errors": self.errors,
+                "status_codes": self.status_codes, "wall_time": self.wall_time, "throughput": self.throughput}
+
+    def assert_all_passed(self) -> 'DatasetResult':
+        """
+        Asserts that every case got a response matching its expected-response spec.
+
+        Raises:
+            AssertionError: If a case failed or could not be sent.
+        """
+        if self.passed != self.total:
+            details = "\n".join(f"  case {failure['case']}: {failure['error'] or '; '.join(failure['failures'])}"
+                                for failure in self.failures[:10])
+            raise AssertionError(f"{self.total - self.passed} of {self.total} cases failed "
+                                 f"({self.failed} failed, {self.errors} errors):\n{details}")
+        return self
+
+    def __repr__(self):
+        return f"DatasetResult(total={self.total}, passed={self.passed}, failed={self.failed}, errors={self.errors})"
+
+
+async def _run_case(client: 'Client', template: Optional['RequestTemplate'], expect: Optional[Dict[str, Any]],
+                    index: int, case: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    case_expect = case.get("expect")
+    if expect and case_expect:
+        case_expect = {**expect, **case_expect}
+    case_expect = case_expect or expect or {}
+
+    record = {"case": index, "id": case.get("id"), "method": None, "url": None, "status_code": None,
+              "response_time": None, "passed": False, "failures": [], "error": None}
+    try:
+        if template is not None:
+            request = template.render(**case)
+        else:
+            request = {field: case[field] for field in _REQUEST_FIELDS if field in case}
+            request.setdefault("method", "GET")
+            request.setdefault("url", "")
+            request["timeout"] = timeout
+        record["method"], record["url"] = request["method"], request["url"]
+        response = await client.send_async(**request)
+        record["status_code"] = response.status_code
+        record["response_time"] = response.response_time
+        record["failures"] = check_response(response, case_expect)
+    except Exception as e:
+        # Any broken case (invalid URL, bad JSONPath in `expect`...) is recorded, it must not stop the run
+        record["error"] = f"{type(e).__name__}: {e}"
+        return record
+
+    record["passed"] = not record["failures"]
+    return record
+
+
+async def run_cases_async(client: 'Client', cases: Union[str, Iterable[Dict[str, Any]]],
+                          template: Optional['RequestTemplate'] = None, expect: Optional[Dict[str, Any]] = None,
+                          concurrency: int = 32, output: Optional[str] = None, compression: Optional[str] = None,
+                          timeout: float = 5.0, max_failures: int = 100) -> DatasetResult:
+    """
+    Runs request cases concurrently on the async client of `client`, streaming them from a file or an iterable.
+
+    The cases are read lazily and at most `concurrency` requests are in flight, so memory stays flat whatever the
+    number of cases, and the requests reuse the pooled connections of the client.
+
+    Without a `template`, each case describes a request with the keys `method`, `url`, `params`, `headers`,
+    `cookies`, `json` and `data`. With a `template`, each case holds the values of its placeholders.
+    Either way, an optional `expect` key holds the expected-response spec of the case (see `check_response`),
+    merged over the `expect` argument.
+
+    Args:
+        client (Client): The client used to send the requests.
+        cases (Union[str, Iterable[Dict[str, Any]]]): A JSON Lines/CSV file (see `iter_cases`) or the cases.
+        template (RequestTemplate): The template rendered with each case.
+        expect (Dict[str, Any]): The expected-response spec applied to every case.
+        concurrency (int): The maximum number of requests in flight.
+        output (str): A JSON Lines file the result of each case is written to as soon as it completes.
+        compression (str): The compression of the output file: None, "gzip" or "zstd".
+        timeout (float): The timeout of each request in seconds, when not using a template.
+        max_failures (int): The number of failed cases kept in `DatasetResult.failures`.
+
+    Examples:
+        >>> from reqflow import given, Client
+        >>> from reqflow.dataset import run_cases_async
+        >>>
+        >>> client = Client(base_url="https://api.example.com")
+        >>> template = given(client).body({"name": "{name}"}).when("POST", "/users").template()
+        >>> result = await run_cases_async(client, "users.csv", template=template, expect={"status": 201},
+        >>>                                concurrency=64, output="results.jsonl")
+        >>> result.assert_all_passed()
+
+    Returns:
+        DatasetResult: The counters and the first failed cases.
+    """
+    if concurrency < 1:
+        raise InvalidArgumentError("The `concurrency` must be positive.")
+
+    rows = iter_cases(cases) if isinstance(cases, str) else iter(cases)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    sink = JsonlSink(output, compression=compression) if output else None
+    result = DatasetResult(max_failures=max_failures)
+
+    async def produce():
+        for index, case in enumerate(rows):
+            await queue.put((index, case))
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def work():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            record = await _run_case(client, template, expect, item[0], item[1], timeout)
+            result._add(record)
+            if sink is not None:
+                sink.write(record)
+
+    start = time.perf_counter()
+    tasks = [asyncio.ensure_future(produce())] + [asyncio.ensure_future(work()) for _ in range(concurrency)]
+    try:
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # If the producer or a worker fails, the others must not stay blocked on the bounded queue
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        result.wall_time = time.perf_counter() - start
+        if sink is not None:
+            sink.close()
+    return result
+
+
+def run_cases(client: 'Client', cases: Union[str, Iterable[Dict[str, Any]]], **kwargs: Any) -> DatasetResult:
+    """
+    Sync version of `run_cases_async`, running the cases on a new event loop.
+    """
+    return run_sync(run_cases_async(client, cases, **kwargs))
@@ -14,4 +14,25 @@ class InvalidCredentialsError(Exception):
 
 class ValidationError(Exception):
     """Raised when the data does not match the expected format"""
-    pass
\ No newline at end of file
+    pass
+
+class FlowError(Exception):
+    """Raised when a step of a flow fails, the result of the flow is available in `result`."""
+    def __init__(self, message, result):
+        super().__init__(message)
+        self.result = result
+
+class DeadlineExceededError(Exception):
+    """Raised when a request runs out of the time budget of a deadline, the deadline is available in `deadline`."""
+    def __init__(self, message, deadline):
+        super().__init__(message)
+        self.deadline = deadline
+
+class ResponseTooLargeError(Exception):
+    """Raised when a response body exceeds `max_response_bytes`, the download is aborted after `size` bytes."""
+    def __init__(self, message, url, status_code, limit, size):
+        super().__init__(message)
+        self.url = url
+        self.status_code = status_code
+        self.limit = limit
+        self.size = size
@@ -0,0 +1,313 @@
+import asyncio
+import fnmatch
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import httpx
+
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.mock.profiles import Latency, latency_from_config
+from reqflow.mock.server import Route
+
+FAULT_HEADER = "X-ReqFlow-Fault"
+RESET = "reset"
+TIMEOUT = "timeout"
+ERROR = "error"
+TRUNCATE = "truncate"
+THROTTLE_CHUNK_BYTES = 16 * 1024
+
+
+class Fault:
+    """
+    The faults injected into the requests matching a host and route pattern.
+
+    At most one of a connection reset, a timeout, an error response or a truncated body is injected per request, so
+    the rates must sum up to 1 at most. The latency and the bandwidth limit apply to every matching request.
+
+    Args:
+        host (str): The host pattern, e.g. "api.example.com" or "*.internal". Defaults to any host.
+        path (str): The path pattern as for mock routes, e.g. "/users/{id}" or "/items*". Defaults to any path.
+        method (str): The HTTP method, or "*" for any method.
+        latency (Latency): The delay added before the request, see `reqflow.mock.profiles`. A number is a fixed delay.
+        reset_rate (float): The fraction of requests failing with a connection reset (`httpx.ReadError`).
+        timeout_rate (float): The fraction of requests hanging for their read timeout, then raising
+            `httpx.ReadTimeout`.
+        error_rate (float): The fraction of requests answered with an error status instead of being sent.
+        error_statuses (Sequence[int]): The error statuses, drawn uniformly.
+        truncate_rate (float): The fraction of responses whose body is cut at a random point, reading it raises
+            `httpx.RemoteProtocolError` like a peer closing the connection early.
+        bandwidth (float): The download bandwidth in bytes per second the response bodies are throttled to.
+    """
+
+    def __init__(self, host: Optional[str] = None, path: Optional[str] = None, method: str = "*",
+                 latency: Union[None, float, Latency] = None, reset_rate: float = 0.0, timeout_rate: float = 0.0,
+                 error_rate: float = 0.0, error_statuses: Sequence[int] = (500, 502, 503, 504),
+                 truncate_rate: float = 0.0, bandwidth: Optional[float] = None):
+        rates = (reset_rate, timeout_rate, error_rate, truncate_rate)
+        if any(rate < 0 for rate in rates) or sum(rates) > 1:
+            raise InvalidArgumentError("The fault rates must be positive and sum up to 1 at most.")
+        if bandwidth is not None and bandwidth <= 0:
+            raise InvalidArgumentError("The bandwidth must be positive.")
+        self.host = host
+        self.path = path
+        self.method = method.upper()
+        self.latency = latency_from_config(latency)
+        self.rates = [(RESET, reset_rate), (TIMEOUT, timeout_rate), (ERROR, error_rate), (TRUNCATE, truncate_rate)]
+        self.error_statuses = list(error_statuses)
+        self.bandwidth = bandwidth
+        self._route = Route(self.method, path or "*")
+
+    def match(self, request: httpx.Request) -> Optional[Dict[str, str]]:
+        """
+        Returns the path parameters if the fault applies to the request, otherwise None.
+        """
+        if self.host is not None and not fnmatch.fnmatchcase(request.url.host, self.host):
+            return None
+        return self._route.match(request.method, request.url.path)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'Fault':
+        """
+        Builds a fault from a dictionary with the keys of the constructor, e.g.
+        `{"path": "/items*", "latency": {"type": "long_tail", "median": 0.05}, "error_rate": 0.05}`.
+        """
+        return cls(**config)
+
+
+class _Plan:
+    __slots__ = ("delay", "kind", "status", "fraction", "bandwidth")
+
+    def __init__(self, delay: float, kind: Optional[str], status: int, fraction: float, bandwidth: Optional[float]):
+        self.delay = delay
+        self.kind = kind
+        self.status = status
+        self.fraction = fraction
+        self.bandwidth = bandwidth
+
+
+class FaultInjection:
+    """
+    Injects faults into the requests of a client: added latency, connection resets, timeouts, error responses,
+    truncated bodies and bandwidth throttling, per host and route pattern.
+
+    The faults are drawn from a random generator seeded with `seed`, so a sequence of requests sees the same faults on
+    every run. The first fault matching a request applies. Pass the injection to `Client(faults=...)`, which wraps its
+    sync and async transports (the network, an in-process application or a mock transport).
+
+    Examples:
+        >>> from reqflow import Client, given
+        >>> from reqflow.faults import Fault, FaultInjection
+        >>> from reqflow.mock import profiles
+        >>>
+        >>> faults = FaultInjection([
+        >>>     Fault(path="/items*", latency=profiles.long_tail(0.05), error_rate=0.05, reset_rate=0.01),
+        >>>     Fault(host="cdn.example.com", bandwidth=256 * 1024, truncate_rate=0.02),
+        >>> ], seed=1)
+        >>> client = Client(base_url="https://api.example.com", faults=faults)
+        >>> given(client).when("GET", "/items").then()
+        >>> faults.counters()
+        >>> {'requests': 1, 'latency': 1, 'reset': 0, 'timeout': 0, 'error': 0, 'truncate': 0, 'throttle': 0}
+    """
+
+    def __init__(self, faults: Iterable[Union[Fault, Dict[str, Any]]], seed: Optional[int] = None):
+        """
+        Args:
+            faults (Iterable[Fault]): The faults, or their configurations, see `Fault.from_config`.
+            seed (int): Optional seed of the random generator.
+        """
+        self.faults: List[Fault] = [fault if isinstance(fault, Fault) else Fault.from_config(fault)
+                                    for fault in faults]
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(("requests", "latency", RESET, TIMEOUT, ERROR, TRUNCATE, "throttle"), 0)
+
+    def counters(self) -> Dict[str, int]:
+        """
+        Returns the number of requests seen and of injected faults by kind.
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def _plan(self, request: httpx.Request) -> Optional[_Plan]:
+        for fault in self.faults:
+            params = fault.match(request)
+            if params is not None:
+                break
+        else:
+            return None
+
+        # Always draw the same values in the same order so the faults only depend on the seed and the requests
+        with self._lock:
+            delay = fault.latency.sample(self.rng, params) if fault.latency is not None else 0.0
+            draw, fraction = self.rng.random(), self.rng.random()
+            status = self.rng.choice(fault.error_statuses) if fault.error_statuses else 500
+            kind = None
+            for name, rate in fault.rates:
+                if draw < rate:
+                    kind = name
+                    break
+                draw -= rate
+
+            self._counters["requests"] += 1
+            self._counters["latency"] += delay > 0
+            if kind is not None:
+                self._counters[kind] += 1
+            self._counters["throttle"] += fault.bandwidth is not None and kind in (None, TRUNCATE)
+        return _Plan(delay, kind, status, fraction, fault.bandwidth)
+
+    @staticmethod
+    def _read_timeout(request: httpx.Request) -> float:
+        return request.extensions.get("timeout", {}).get("read") or 0.0
+
+    @staticmethod
+    def _error_response(request: httpx.Request, plan: _Plan) -> httpx.Response:
+        return httpx.Response(plan.status, headers={FAULT_HEADER: ERROR}, text="Injected fault", request=request)
+
+    def transport(self, transport: httpx.BaseTransport) -> httpx.BaseTransport:
+        """
+        Wraps a sync transport.
+        """
+        return FaultTransport(transport, self)
+
+    def async_transport(self, transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+        """
+        Wraps an async transport.
+        """
+        return AsyncFaultTransport(transport, self)
+
+
+def _cut(plan: _Plan, body: bytes) -> bytes:
+    return body[:int(len(body) * plan.fraction)]
+
+
+def _truncated_error(request: httpx.Request) -> httpx.RemoteProtocolError:
+    return httpx.RemoteProtocolError("peer closed connection without sending complete message body (injected fault)",
+                                     request=request)
+
+
+class _FaultStream(httpx.SyncByteStream):
+    def __init__(self, request: httpx.Request, stream: httpx.SyncByteStream, plan: _Plan):
+        self._request = request
+        self._stream = stream
+        self._plan = plan
+
+    def __iter__(self) -> Iterator[bytes]:
+        chunks: Iterable[bytes] = self._stream
+        if self._plan.kind == TRUNCATE:
+            chunks = [_cut(self._plan, b"".join(self._stream))]
+        for chunk in chunks:
+            if self._plan.bandwidth is None:
+                yield chunk
+                continue
+            for start in range(0, len(chunk), THROTTLE_CHUNK_BYTES):
+                piece = chunk[start:start + THROTTLE_CHUNK_BYTES]
+                time.sleep(len(piece) / self._plan.bandwidth)
+                yield piece
+        if self._plan.kind == TRUNCATE:
+            raise _truncated_error(self._request)
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class _AsyncFaultStream(httpx.AsyncByteStream):
+    def __init__(self, request: httpx.Request, stream: httpx.AsyncByteStream, plan: _Plan):
+        self._request = request
+        self._stream = stream
+        self._plan = plan
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        if self._plan.kind == TRUNCATE:
+            yield _cut(self._plan, b"".join([chunk async for chunk in self._stream]))
+        else:
+            async for chunk in self._stream:
+                yield chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._chunks():
+            if self._plan.bandwidth is None:
+                yield chunk
+                continue
+            for start in range(0, len(chunk), THROTTLE_CHUNK_BYTES):
+                piece = chunk[start:start + THROTTLE_CHUNK_BYTES]
+                await asyncio.sleep(len(piece) / self._plan.bandwidth)
+                yield piece
+        if self._plan.kind == TRUNCATE:
+            raise _truncated_error(self._request)
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class FaultTransport(httpx.BaseTransport):
+    """
+    A sync transport injecting the faults of a `FaultInjection` into the requests sent by the wrapped transport.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, faults: FaultInjection):
+        self._transport = transport
+        self.faults = faults
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        plan = self.faults._plan(request)
+        if plan is None:
+            return self._transport.handle_request(request)
+        if plan.delay:
+            time.sleep(plan.delay)
+        if plan.kind == RESET:
+            raise httpx.ReadError("Connection reset by peer (injected fault)", request=request)
+        if plan.kind == TIMEOUT:
+            time.sleep(FaultInjection._read_timeout(request))
+            raise httpx.ReadTimeout("Read timed out (injected fault)", request=request)
+        if plan.kind == ERROR:
+            return FaultInjection._error_response(request, plan)
+
+        response = self._transport.handle_request(request)
+        if plan.kind is None and plan.bandwidth is None:
+            return response
+        return httpx.Response(response.status_code, headers=response.headers,
+                              stream=_FaultStream(request, response.stream, plan), extensions=response.extensions)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncFaultTransport(httpx.AsyncBaseTransport):
+    """
+    An async transport injecting the faults of a `FaultInjection` into the requests sent by the wrapped transport.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, faults: FaultInjection):
+        self._transport = transport
+        self.faults = faults
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        plan = self.faults._plan(request)
+        if plan is None:
+            return await self._transport.handle_async_request(request)
+        if plan.delay:
+            await asyncio.sleep(plan.delay)
+        if plan.kind == RESET:
+            raise httpx.ReadError("Connection reset by peer (injected fault)", request=request)
+        if plan.kind == TIMEOUT:
+            await asyncio.sleep(FaultInjection._read_timeout(request))
+            raise httpx.ReadTimeout("Read timed out (injected fault)", request=request)
+        if plan.kind == ERROR:
+            return FaultInjection._error_response(request, plan)
+
+        response = await self._transport.handle_async_request(request)
+        if plan.kind is None and plan.bandwidth is None:
+            return response
+        return httpx.Response(response.status_code, headers=response.headers,
+                              stream=_AsyncFaultStream(request, response.stream, plan),
+                              extensions=response.extensions)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,309 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from reqflow.exceptions import FlowError, InvalidArgumentError
+from reqflow.fluent_api import Then, When
+from reqflow.response.response import ResponseSummary
+from reqflow.utils.loop import run_sync
+
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class _Step:
+    def __init__(self, name: str, function: Callable[[Dict[str, Any]], Any], needs: Iterable[str],
+                 extract: Optional[Dict[str, str]], follow_redirects: bool, timeout: float):
+        self.name = name
+        self.function = function
+        self.needs = list(needs)
+        self.extract = dict(extract or {})
+        self.follow_redirects = follow_redirects
+        self.timeout = timeout
+
+
+class StepResult:
+    """
+    The outcome of a step of a flow. Times are in seconds from the start of the flow.
+    """
+
+    def __init__(self, name: str, needs: List[str]):
+        self.name = name
+        self.needs = needs
+        self.status = SKIPPED
+        self.start: Optional[float] = None
+        self.end: Optional[float] = None
+        self.error: Optional[BaseException] = None
+        self.then: Optional[Then] = None
+        self.summary: Optional[ResponseSummary] = None
+        self.extracted: Dict[str, Any] = {}
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.start is None or self.end is None else self.end - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "needs": self.needs, "status": self.status, "start": self.start,
+                "end": self.end, "duration": self.duration, "error": None if self.error is None else repr(self.error),
+                "response": None if self.summary is None else self.summary.to_dict()}
+
+
+class FlowResult:
+    """
+    The outcome of a flow: the result of every step, the values in the context and the critical path, i.e. the
+    chain of dependent steps that determined the duration of the flow.
+    """
+
+    def __init__(self, name: str, steps: Dict[str, StepResult], context: Dict[str, Any], wall_time: float):
+        self.name = name
+        self.steps = steps
+        self.context = context
+        self.wall_time = wall_time
+        self.critical_path = self._critical_path()
+
+    def _critical_path(self) -> List[str]:
+        finished = [step for step in self.steps.values() if step.end is not None]
+        if not finished:
+            return []
+        step = max(finished, key=lambda item: item.end)
+        path = [step.name]
+        while True:
+            needs = [self.steps[name] for name in step.needs if self.steps[name].end is not None]
+            if not needs:
+                break
+            step = max(needs, key=lambda item: item.end)
+            path.append(step.name)
+        return path[::-1]
+
+    @property
+    def passed(self) -> bool:
+        return all(step.status == PASSED for step in self.steps.values())
+
+    @property
+    def failed(self) -> List[StepResult]:
+        return [step for step in self.steps.values() if step.status == FAILED]
+
+    @property
+    def critical_path_time(self) -> float:
+        """
+        The sum of the durations of the steps on the critical path.
+        """
+        return sum(self.steps[name].duration or 0.0 for name in self.critical_path)
+
+    @property
+    def sequential_time(self) -> float:
+        """
+        The sum of the durations of all the steps, i.e. roughly the duration of the flow if run sequentially.
+        """
+        return sum(step.duration or 0.0 for step in self.steps.values())
+
+    def format(self) -> str:
+        """
+        Returns the timing report of the flow as text, the steps on the critical path are marked with `*`.
+        """
+        width = max([len(name) for name in self.steps] + [4])
+        lines = [f"Flow {self.name}: {len(self.steps)} steps in {self.wall_time:.3f}s "
+                 f"(critical path {self.critical_path_time:.3f}s, sequential {self.sequential_time:.3f}s)",
+                 f"  {'step':<{width}}  {'start':>8}  {'duration':>8}  status"]
+        critical = set(self.critical_path)
+        for step in sorted(self.steps.values(), key=lambda item: (item.start is None, item.start or 0.0)):
+            start = "-" if step.start is None else f"{step.start:.3f}s"
+            duration = "-" if step.duration is None else f"{step.duration:.3f}s"
+            marker = "*" if step.name in critical else " "
+            lines.append(f"{marker} {step.name:<{width}}  {start:>8}  {duration:>8}  {step.status}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "wall_time": self.wall_time, "critical_path": self.critical_path,
+                "critical_path_time": self.critical_path_time, "sequential_time": self.sequential_time,
+                "steps": [step.to_dict() for step in self.steps.values()]}
+
+
+class Flow:
+    """
+    Chained requests declared as steps with data dependencies, independent steps run concurrently.
+
+    A step is a function of the flow context (a dict of the initial values and the values extracted by the
+    previous steps) returning a `When` stage, which the flow sends with `then_async`, or a `Then` stage, or an
+    awaitable of one of them. Values extracted with `Then.extract` or the `extract` argument of the step are added
+    to the context. A step starts as soon as the steps it `needs` are done, and is skipped if one of them failed.
+    Steps run on the event loop, so they should send their requests with `then_async` (or return a `When`).
+
+    Examples:
+        >>> from reqflow import given, Client
+        >>> from reqflow.flow import Flow
+        >>>
+        >>> client = Client(base_url="https://api.example.com")
+        >>> flow = Flow("checkout", context={"password": "secret"})
+        >>> flow.step("create_user", lambda ctx: given(client).body({"password": ctx["password"]})
+        >>>           .when("POST", "/users"), extract={"user_id": "id"})
+        >>> flow.step("login", lambda ctx: given(client).body({"user": ctx["user_id"]}).when("POST", "/login"),
+        >>>           needs=["user_id"], extract={"token": "token"})
+        >>> flow.step("catalog", lambda ctx: given(client).when("GET", "/products"), extract={"product": "[0].id"})
+        >>>
+        >>> @flow.step("order", needs=["login", "catalog"])
+        >>> async def create_order(ctx):
+        >>>     then = await given(client).body({"product": ctx["product"]}).when("POST", "/orders") \\
+        >>>         .with_oauth2(ctx["token"]).then_async()
+        >>>     return then.status_code(201).extract("order_id", "id")
+        >>>
+        >>> result = flow.run()
+        >>> print(result.format())
+    """
+
+    def __init__(self, name: str = "flow", context: Optional[Dict[str, Any]] = None, keep_responses: bool = True):
+        """
+        Args:
+            name (str): The name of the flow, used in the report.
+            context (Dict[str, Any]): The initial values of the context.
+            keep_responses (bool): Keeps the `Then` stage of every step in its result. If False, only the
+                `ResponseSummary` (status, timings, size and digest of the body) is kept, e.g. when running many flows.
+        """
+        self.name = name
+        self.context = dict(context or {})
+        self.keep_responses = keep_responses
+        self._steps: Dict[str, _Step] = {}
+
+    def step(self, name: str, function: Optional[Callable[[Dict[str, Any]], Any]] = None, needs: Iterable[str] = (),
+             extract: Optional[Dict[str, str]] = None, follow_redirects: bool = False, timeout: float = 5.0):
+        """
+        Adds a step to the flow. Without `function`, returns a decorator.
+
+        Args:
+            name (str): The unique name of the step.
+            function (Callable): The function of the context returning a `When` or a `Then` (or an awaitable).
+            needs (Iterable[str]): The steps this step depends on, by name or by a value they `extract`.
+            extract (Dict[str, str]): The values extracted from the response body, name to JSONPath expression.
+            follow_redirects (bool): Whether the flow follows redirects when sending a returned `When`.
+            timeout (float): The timeout in seconds when sending a returned `When`.
+
+        Returns:
+            Flow: The flow, or a decorator adding the function as the step.
+        """
+        if function is None:
+            def decorator(function):
+                self.step(name, function, needs, extract, follow_redirects, timeout)
+                return function
+            return decorator
+
+        if name in self._steps:
+            raise InvalidArgumentError(f"Duplicate step: {name}")
+        self._steps[name] = _Step(name, function, needs, extract, follow_redirects, timeout)
+        return self
+
+    def _dependencies(self) -> Dict[str, List[str]]:
+        """
+        Resolves the `needs` of every step to step names and checks that the steps form a directed acyclic graph.
+        """
+        producers = {}
+        for step in self._steps.values():
+            for value in step.extract:
+                producers.setdefault(value, step.name)
+
+        dependencies = {}
+        for step in self._steps.values():
+            resolved = []
+            for need in step.needs:
+                name = need if need in self._steps else producers.get(need)
+                if name is None:
+                    raise InvalidArgumentError(f"Step {step.name} needs {need!r}, which is neither a step nor a "
+                                               f"value extracted by a step")
+                if name not in resolved:
+                    resolved.append(name)
+            dependencies[step.name] = resolved
+
+        visiting, done = set(), set()
+
+        def visit(name, path):
+            if name in done:
+                return
+            if name in visiting:
+                raise InvalidArgumentError(f"The steps form a cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dependency in dependencies[name]:
+                visit(dependency, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in dependencies:
+            visit(name, [])
+        return dependencies
+
+    async def _run_step(self, step: _Step, result: StepResult, dependencies: List['asyncio.Task'],
+                        context: Dict[str, Any], origin: float) -> None:
+        if dependencies:
+            await asyncio.gather(*dependencies)
+        # Each task stores its outcome in its StepResult instead of raising, so the gather above never fails
+        if any(dependency.result() != PASSED for dependency in dependencies):
+            return
+
+        result.start = time.perf_counter() - origin
+        try:
+            value = step.function(context)
+            if inspect.isawaitable(value):
+                value = await value
+            if isinstance(value, When):
+                value = await value.then_async(follow_redirects=step.follow_redirects, timeout=step.timeout)
+            if isinstance(value, Then):
+                for name, json_path in step.extract.items():
+                    value.extract(name, json_path)
+                result.summary = value.response.summary()
+                if self.keep_responses:
+                    result.then = value
+                result.extracted = dict(value.extracted)
+            elif step.extract:
+                raise InvalidArgumentError(f"Step {step.name} must return a When or a Then stage to extract values")
+            context.update(result.extracted)
+            result.status = PASSED
+        except Exception as e:
+            result.status, result.error = FAILED, e
+        finally:
+            result.end = time.perf_counter() - origin
+
+    async def run_async(self, raise_on_failure: bool = True) -> FlowResult:
+        """
+        Runs the steps, each one as soon as its dependencies are done.
+
+        Args:
+            raise_on_failure (bool): Raises a `FlowError` once all the steps are done if a step failed.
+
+        Raises:
+            InvalidArgumentError: If a step needs an unknown step or value, or the steps form a cycle.
+            FlowError: If a step failed and `raise_on_failure` is True. The error of the first failed step is
+                chained as the cause.
+
+        Returns:
+            FlowResult: The results of the steps and the critical path.
+        """
+        dependencies = self._dependencies()
+        context = dict(self.context)
+        results = {name: StepResult(name, dependencies[name]) for name in self._steps}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run(name):
+            await self._run_step(self._steps[name], results[name], [tasks[dependency] for dependency in
+                                                                    dependencies[name]], context, origin)
+            return results[name].status
+
+        origin = time.perf_counter()
+        for name in self._steps:
+            tasks[name] = asyncio.ensure_future(run(name))
+        await asyncio.gather(*tasks.values())
+        flow_result = FlowResult(self.name, results, context, time.perf_counter() - origin)
+
+        if raise_on_failure and flow_result.failed:
+            first = flow_result.failed[0]
+            skipped = [step.name for step in results.values() if step.status == SKIPPED]
+            message = f"Step {first.name} of flow {self.name} failed: {first.error!r}"
+            if skipped:
+                message += f" (skipped: {', '.join(skipped)})"
+            raise FlowError(message, flow_result) from first.error
+        return flow_result
+
+    def run(self, raise_on_failure: bool = True) -> FlowResult:
+        """
+        Sync version of `run_async`, running the flow on a new event loop.
+        """
+        return run_sync(self.run_async(raise_on_failure=raise_on_failure))
@@ -1,26 +1,33 @@
-from typing import Any, Dict, Optional, Union, Type
+from typing import Any, Callable, Dict, MutableMapping, Optional, Union, Type
 
 from .client import Client
+from reqflow.benchmark import BenchmarkResult, run_benchmark
+from reqflow.template import RequestTemplate
 from reqflow.response.response import UnifiedResponse
 from reqflow.validator.validator import Validator
 from reqflow.exceptions import GivenInitializationError, InvalidArgumentError, InvalidCredentialsError
 from reqflow.utils.constants import HttpMethods, HTTPStatusCodes
+from reqflow.utils.timing import RequestTimings
 from pydantic import BaseModel
 from pydantic import ValidationError
 import base64
+import functools
 
 import os
 
-def given(client: Optional[Client] = None, url: Optional[str] = None, logging: Optional[bool] = False) -> 'Given':
+def given(client: Optional[Client] = None, url: Optional[str] = None, logging: Optional[bool] = False,
+          app: Optional[Callable] = None) -> 'Given':
     """
-    Initializes the Given stage with a client instance or a URL. If
-    the client is not provided, the URL can be provided directly.
+    Initializes the Given stage with a client instance, a URL or an application. If
+    the client is not provided, the URL or the application can be provided directly.
 
     Args:
         client (Client): The client instance to use for making the request.
         url: If the client is not provided, the URL can be provided directly.
             The client will be initialized with the URL as base_url.
         logging (bool): If True, logs will be stored in GlobalLogger class.
+        app (Callable): If the client is not provided, an ASGI or WSGI application to send the requests to
+            in-process, see `Client`.
 
     Examples:
         >>> from reqflow import given, Client
@@ -30,21 +37,25 @@ def given(client: Optional[Client] = None, url: Optional[str] = None, logging: O
         >>> given(url="https://url.com").when("GET", "/path").then().status_code(200)
         >>> # OR
         >>> given(url="https://url.com", logging=True).when("GET", "/path").then().status_code(200)
+        >>> # OR
+        >>> given(app=my_fastapi_app).when("GET", "/path").then().status_code(200)
 
     Returns:
         Given (class): An instance of the Given class initialized with the provided client.
     """
 
     if client:
-        if url or logging:
-            raise GivenInitializationError("If client is provided, url and logging parameters are not accepted",
-                                           {'client': client, 'url': url, 'logging': logging})
+        if url or logging or app is not None:
+            raise GivenInitializationError("If client is provided, url, logging and app parameters are not accepted",
+                                           {'client': client, 'url': url, 'logging': logging, 'app': app})
         return Given(client)
+    elif app is not None:
+        return Given(Client(base_url=url, logging=logging, app=app))
     elif url:
         return Given(Client(base_url=url, logging=logging))
     else:
-        raise GivenInitializationError("Client or URL must be provided",
-                                       {'client': client, 'url': url, 'logging': logging})
+        raise GivenInitializationError("Client, URL or app must be provided",
+                                       {'client': client, 'url': url, 'logging': logging, 'app': app})
 
 class Given:
     """
@@ -340,7 +351,8 @@ class When:
         self.headers[key] = value
         return self
 
-    def then(self, follow_redirects: bool = False, timeout: float = 5.0, force_json_decoding: bool = False) -> 'Then':
+    def then(self, follow_redirects: bool = False, timeout: float = 5.0, force_json_decoding: bool = False,
+             max_response_bytes: Optional[int] = None, truncate_response: Optional[bool] = None) -> 'Then':
         """
         Transitions from the When stage to the Then stage, where the response is handled.
 
@@ -348,6 +360,10 @@ class When:
             follow_redirects (bool): httpx parameter to follow redirects or not. Defaults to False.
             timeout: The timeout for the request in seconds. Defaults to 5.0.
             force_json_decoding: If True, forces JSON decoding of the response despite response headers. Defaults to False. The default behavior is to decode JSON only if the response content type is 'application/json'.
+            max_response_bytes: The maximum size of the response body in bytes, overriding the limit of the client.
+                A larger body is aborted with a `ResponseTooLargeError`.
+            truncate_response: If True, a larger body is cut at `max_response_bytes` instead, with
+                `response.truncated` set. Defaults to the `truncate_responses` option of the client.
         Note:
             The actual request is made when this method is called.
 
@@ -356,10 +372,12 @@ class When:
         """
         response = self.client.send(self.method, self.url, params=self.params, headers=self.headers,
                                     json=self.json, data=self.data, cookies=self.cookies, redirect=follow_redirects,
-                                    files=self.files, timeout=timeout, force_json=force_json_decoding)
+                                    files=self.files, timeout=timeout, force_json=force_json_decoding,
+                                    max_response_bytes=max_response_bytes, truncate_response=truncate_response)
         return Then(response, self.client)
 
-    async def then_async(self, follow_redirects: bool = False, timeout: float = 5.0, force_json_decoding: bool = False) -> 'Then':
+    async def then_async(self, follow_redirects: bool = False, timeout: float = 5.0, force_json_decoding: bool = False,
+                         max_response_bytes: Optional[int] = None, truncate_response: Optional[bool] = None) -> 'Then':
         """
         Async version of the `then` method awaiting the response.
 
@@ -367,15 +385,94 @@ class When:
             follow_redirects (bool): httpx parameter to follow redirects or not. Defaults to False.
             timeout: The timeout for the request in seconds. Defaults to 5.0.
             force_json_decoding: If True, forces JSON decoding of the response despite response headers. Defaults to False. The default behavior is to decode JSON only if the response content type is 'application/json'.
+            max_response_bytes: The maximum size of the response body in bytes, overriding the limit of the client.
+                A larger body is aborted with a `ResponseTooLargeError`.
+            truncate_response: If True, a larger body is cut at `max_response_bytes` instead, with
+                `response.truncated` set. Defaults to the `truncate_responses` option of the client.
 
         Returns:
             Then: The instance of the Then class with the response from the request
         """
         response = await self.client.send_async(self.method, self.url, params=self.params, headers=self.headers,
                                                 json=self.json, data=self.data, cookies=self.cookies, redirect=follow_redirects,
-                                                files=self.files, timeout=timeout, force_json=force_json_decoding)
+                                                files=self.files, timeout=timeout, force_json=force_json_decoding,
+                                                max_response_bytes=max_response_bytes,
+                                                truncate_response=truncate_response)
         return Then(response, self.client)
 
+    def template(self, follow_redirects: bool = False, timeout: float = 5.0,
+                 force_json_decoding: bool = False) -> RequestTemplate:
+        """
+        Precompiles the request into an immutable template that can be sent many times without the builder overhead.
+
+        Values that are exactly `{name}` in the query parameters, headers and JSON body, and `{name}` anywhere in
+        the URL, are placeholders filled in on every send.
+
+        Args:
+            follow_redirects (bool): httpx parameter to follow redirects or not. Defaults to False.
+            timeout: The timeout for each request in seconds. Defaults to 5.0.
+            force_json_decoding: If True, forces JSON decoding of the responses. Defaults to False.
+
+        Examples:
+            >>> from reqflow import given, Client
+            >>> client = Client(base_url="https://httpbin.org")
+            >>> template = given(client).body({"id": "{id}"}).when("POST", "/anything/{id}").template()
+            >>> for index in range(1000):
+            >>>     template.then(id=index).status_code(200)
+
+        Returns:
+            RequestTemplate: The precompiled request.
+        """
+        return RequestTemplate.from_when(self, timeout=timeout, follow_redirects=follow_redirects,
+                                         force_json=force_json_decoding)
+
+    def benchmark(self, iterations: int = 100, warmup: int = 5, concurrency: int = 1,
+                  follow_redirects: bool = False, timeout: float = 5.0) -> BenchmarkResult:
+        """
+        Sends the request repeatedly on the pooled connections of the client and collects latency statistics.
+
+        Args:
+            iterations (int): The number of measured requests. Defaults to 100.
+            warmup (int): The number of requests sent before measuring, e.g. to open connections. Defaults to 5.
+            concurrency (int): The number of requests in flight at the same time. Defaults to 1.
+            follow_redirects (bool): httpx parameter to follow redirects or not. Defaults to False.
+            timeout: The timeout for each request in seconds. Defaults to 5.0.
+
+        Examples:
+            >>> from reqflow import given, Client
+            >>> client = Client(base_url="https://httpbin.org")
+            >>> result = given(client).when("GET", "/get").benchmark(iterations=200, warmup=10, concurrency=4)
+            >>> result.assert_p99_below(0.5).assert_mean_below(0.2)
+            >>> result.summary()
+            >>> {'endpoint': 'GET /get', 'count': 200, 'errors': 0, 'mean': 0.093, 'p99': 0.151, ...}
+
+        Note:
+            The requests are logged and recorded in the client metrics like any other request.
+
+        Returns:
+            BenchmarkResult: The statistics of the measured requests.
+        """
+        def send():
+            return self.client.send(self.method, self.url, params=self.params, headers=self.headers,
+                                    json=self.json, data=self.data, cookies=self.cookies, redirect=follow_redirects,
+                                    files=self.files, timeout=timeout)
+
+        return run_benchmark(send, self.method, f"{self.client.base_url}{self.url}", iterations=iterations,
+                             warmup=warmup, concurrency=concurrency)
+
+
+def _retain_log_on_failure(assertion):
+    """
+    Keeps the request in the logs when the assertion fails, even if the retention policy dropped it.
+    """
+    @functools.wraps(assertion)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return assertion(self, *args, **kwargs)
+        except AssertionError:
+            self.response.retain_log()
+            raise
+    return wrapper
 
 
 class Then:
@@ -393,6 +490,7 @@ class Then:
         """
         self.response = response
         self.client = client
+        self.extracted: Dict[str, Any] = {}
 
     def get_response(self) -> UnifiedResponse:
         """
@@ -410,6 +508,7 @@ class Then:
         """
         return self.response
 
+    @_retain_log_on_failure
     def validate_data(self, expected_model: Type[BaseModel]) -> 'Then':
         """
         Validates the response data against the expected Pydantic model.
@@ -445,6 +544,7 @@ class Then:
             raise AssertionError(f"The response data does not match the expected model: {str(e)}")
         return self
 
+    @_retain_log_on_failure
     def status_code(self, expected_status_code: Union[int, HTTPStatusCodes]) -> 'Then':
         """
         Asserts that the response status code matches the expected status code.
@@ -467,6 +567,7 @@ class Then:
             f"Status code {self.response.status_code} is not {expected_status_code}"
         return self
 
+    @_retain_log_on_failure
     def status_code_is_between(self, min_status_code: int, max_status_code: int) -> 'Then':
         """
         Asserts that the response status code is within the specified range.
@@ -490,6 +591,7 @@ class Then:
             f"Status code {self.response.status_code} is not between {min_status_code} and {max_status_code}"
         return self
 
+    @_retain_log_on_failure
     def assert_body(self, json_path: str, expected_value: Any) -> 'Then':
         """
         Asserts that a specific part of the response body matches the expected value.
@@ -520,6 +622,7 @@ class Then:
         self.response._assert_json(json_path, expected_value)
         return self
 
+    @_retain_log_on_failure
     def assert_body_text(self, expected_value: str) -> 'Then':
         """
         Asserts that the response body matches the expected value.
@@ -540,6 +643,38 @@ class Then:
                                                       f"does not match the expected value: {expected_value}")
         return self
 
+    def extract(self, name: str, json_path: str, into: Optional[MutableMapping[str, Any]] = None) -> 'Then':
+        """
+        Extracts a value of the response body to use it in a following request, e.g. an id or a token.
+
+        The value is stored in `extracted` and, if given, in the `into` mapping. In a `Flow`, the extracted values
+        are added to the context of the flow and passed to the steps depending on this one.
+
+        Args:
+            name (str): The name of the extracted value.
+            json_path (str): The JSONPath expression locating the value in the response body.
+            into (MutableMapping[str, Any]): An optional mapping the value is also stored in.
+
+        Raises:
+            ValueError: If the JSONPath does not match any elements in the JSON response.
+
+        Examples:
+            >>> from reqflow import given, Client
+            >>> client = Client(base_url="https://api.example.com")
+            >>> context = {}
+            >>> given(client).body({"name": "Alice"}).when("POST", "/users").then().status_code(201) \
+            >>>     .extract("user_id", "id", into=context)
+            >>> given(client).when("GET", f"/users/{context['user_id']}").then().status_code(200)
+
+        Returns:
+            Then: The instance of the Then class.
+        """
+        value = self.response._find_json(json_path)
+        self.extracted[name] = value
+        if into is not None:
+            into[name] = value
+        return self
+
     def get_content(self) -> Any:
         """
         Retrieves the content of the response body.
@@ -609,6 +744,7 @@ class Then:
         """
         return self.response.encoding
 
+    @_retain_log_on_failure
     def assert_header(self, header_name: str, expected_value: Any) -> 'Then':
         """
         Asserts that a specific header matches the expected value.
@@ -629,6 +765,7 @@ class Then:
         self.response._assert_header(header_name, expected_value)
         return self
 
+    @_retain_log_on_failure
     def assert_header_exists(self, header_name: str) -> 'Then':
         """
         Asserts that a specific header exists in the response.
@@ -647,6 +784,7 @@ class Then:
         assert header_name in self.response.headers, f"Header {header_name} does not exist in the response"
         return self
 
+    @_retain_log_on_failure
     def assert_response_time(self, max_time: float) -> 'Then':
         """
         Asserts that the response time is less than or equal to the specified maximum time.
@@ -669,6 +807,82 @@ class Then:
             f"Response time {self.response.response_time} exceeds the maximum expected time {max_time}"
         return self
 
+    @_retain_log_on_failure
+    def assert_ttfb(self, max_time: float) -> 'Then':
+        """
+        Asserts that the time to first byte (from sending the request until the response headers
+        were received) is less than or equal to the specified maximum time.
+
+        Args:
+            max_time (float): The maximum expected time to first byte in seconds.
+
+        Examples:
+            >>> from reqflow import given, Client
+            >>> client = Client(base_url="https://httpbin.org")
+            >>> given(client).when("GET", "/get").then().assert_ttfb(0.5)
+
+        Note:
+            Transports that don't emit trace events (e.g. in-process apps) fall back to the total response time.
+
+        Returns:
+            Then: The instance of the Then class for fluent chaining.
+
+        Raises:
+            AssertionError: If the time to first byte exceeds the maximum expected time.
+        """
+        timings = self.response.timings
+        ttfb = timings.ttfb if timings is not None and timings.ttfb is not None else self.response.response_time
+        assert ttfb <= max_time, f"Time to first byte {ttfb} exceeds the maximum expected time {max_time}"
+        return self
+
+    @_retain_log_on_failure
+    def assert_phase_time(self, phase: str, max_time: float) -> 'Then':
+        """
+        Asserts that a phase of the request took less than or equal to the specified maximum time.
+
+        Args:
+            phase (str): One of `pool`, `connect`, `tls`, `request_write`, `wait`, `download`, `ttfb` or `total`.
+            max_time (float): The maximum expected duration of the phase in seconds.
+
+        Examples:
+            >>> from reqflow import given, Client
+            >>> client = Client(base_url="https://httpbin.org")
+            >>> given(client).when("GET", "/get").then().assert_phase_time("connect", 0.1)
+
+        Note:
+            Phases that did not happen, like `connect` on a reused connection, pass the assertion.
+
+        Returns:
+            Then: The instance of the Then class for fluent chaining.
+
+        Raises:
+            AssertionError: If the phase exceeds the maximum expected time.
+        """
+        if phase not in RequestTimings.PHASES:
+            raise InvalidArgumentError(f"Invalid phase: {phase}. Must be one of {list(RequestTimings.PHASES)}.")
+
+        duration = getattr(self.response.timings, phase, None)
+        assert duration is None or duration <= max_time, \
+            f"Phase {phase} took {duration} which exceeds the maximum expected time {max_time}"
+        return self
+
+    def get_timings(self) -> Optional[RequestTimings]:
+        """
+        Retrieves the phase breakdown of the request.
+
+        Examples:
+            >>> from reqflow import given, Client
+            >>> client = Client(base_url="https://httpbin.org")
+            >>> timings = given(client).when("GET", "/get").then().get_timings()
+            >>> timings.ttfb
+            >>> 0.0913
+
+        Returns:
+            RequestTimings: The timings of the request.
+        """
+        return self.response.timings
+
+    @_retain_log_on_failure
     def assert_cookie(self, cookie_name: str, expected_value: Any) -> 'Then':
         """
         Asserts that a specific cookie matches the expected value.
@@ -705,7 +919,7 @@ class Then:
 
     def save_response_to_file(self, file_path: str) -> 'Then':
         """
-        Saves the response content to a specified file. Useful for downloading files.
+        Saves the raw response body to a specified file, as received. Useful for downloading files.
 
         Args:
             file_path (str): The path where the response content should be saved.
@@ -718,17 +932,12 @@ class Then:
         Returns:
             Then: The instance of the Then class.
         """
-        content_type = self.response.headers.get('Content-Type', '')
-
         try:
-            if 'text' in content_type or 'application/json' in content_type:
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(self.response.json)
-            else:
-                with open(file_path, 'wb') as file:
-                    file.write(
-                        self.response.body if isinstance(self.response.body, bytes)
-                        else self.response.json.encode('utf-8'))
+            # The raw bytes are written as received, without a decode/encode round trip or a copy of the body
+            with open(file_path, 'wb', buffering=0) as file:
+                view = self.response.raw_bytes
+                while view:
+                    view = view[file.write(view):]
         except IOError as e:
             raise Exception(f"Error saving file: {e}")
 
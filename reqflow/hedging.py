@@ -0,0 +1,203 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, Optional
+
+import httpx
+
+from reqflow.benchmark import BenchmarkResult
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.template import RequestTemplate
+from reqflow.utils.stats import percentile
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+
+class HedgingPolicy:
+    """
+    Sends a duplicate of a slow idempotent request and keeps the first response, to cut tail latency.
+
+    When no response arrived after the hedge delay, `Client.send_async` sends the same request again (up to
+    `max_hedges` times), returns the first response and cancels the other requests. The delay is either fixed or
+    the `percentile` of the recent response times of the endpoint, so by default only the slowest 5% of the
+    requests are hedged. Requests uploading `files` are never hedged as their content cannot be sent twice.
+
+    Examples:
+        >>> from reqflow import Client, given
+        >>> from reqflow.hedging import HedgingPolicy
+        >>>
+        >>> policy = HedgingPolicy(percentile=95, max_hedges=1)
+        >>> client = Client(base_url="https://api.example.com", hedging=policy)
+        >>> then = await given(client).when("GET", "/items/1").then_async()
+        >>> policy.stats()
+        >>> {'requests': 1000, 'hedged': 52, 'duplicates': 52, 'wins': 31, 'hedge_rate': 0.052, 'win_rate': 0.596}
+    """
+
+    def __init__(self, delay: Optional[float] = None, percentile: float = 95.0, initial_delay: float = 0.1,
+                 min_delay: float = 0.001, max_hedges: int = 1, min_samples: int = 20, window: int = 1000,
+                 methods: Iterable[str] = IDEMPOTENT_METHODS):
+        """
+        Args:
+            delay (float): A fixed hedge delay in seconds. Defaults to the `percentile` of the recent response times.
+            percentile (float): The percentile of the recent response times of the endpoint used as the delay.
+            initial_delay (float): The delay used until `min_samples` responses of the endpoint were seen.
+            min_delay (float): The lower bound of the percentile-derived delay, in seconds.
+            max_hedges (int): The maximum number of duplicates sent for one request.
+            min_samples (int): The number of responses needed before using the percentile-derived delay.
+            window (int): The number of recent response times kept per endpoint.
+            methods (Iterable[str]): The methods that are hedged, the idempotent methods by default.
+        """
+        if max_hedges < 1 or not 0 < percentile < 100:
+            raise InvalidArgumentError("The `max_hedges` must be positive and `percentile` between 0 and 100.")
+        self.delay = delay
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_hedges = max_hedges
+        self.min_samples = min_samples
+        self.window = window
+        self.methods = frozenset(method.upper() for method in methods)
+        self.requests = 0
+        self.hedged = 0
+        self.duplicates = 0
+        self.wins = 0
+        self._latencies: Dict[str, deque] = {}
+        self._delays: Dict[str, float] = {}
+
+    def applies_to(self, method: str) -> bool:
+        return method.upper() in self.methods
+
+    def delay_for(self, endpoint: str) -> float:
+        """
+        Returns the hedge delay of an endpoint, e.g. "GET /items/{id}", in seconds.
+        """
+        if self.delay is not None:
+            return self.delay
+        return self._delays.get(endpoint, self.initial_delay)
+
+    def record(self, endpoint: str, response_time: Optional[float], hedges: int = 0, won: bool = False) -> None:
+        """
+        Records the response time of a request and whether it was hedged and a duplicate answered first. A failed
+        request has no response time, it is counted but does not change the hedge delay.
+        """
+        self.requests += 1
+        if hedges:
+            self.hedged += 1
+            self.duplicates += hedges
+            self.wins += won
+        if self.delay is not None or response_time is None:
+            return
+        latencies = self._latencies.get(endpoint)
+        if latencies is None:
+            latencies = self._latencies[endpoint] = deque(maxlen=self.window)
+        latencies.append(response_time)
+        # Sorting the window on every request would cost more than the hedging saves, refresh the delay periodically
+        if len(latencies) == self.min_samples or (len(latencies) > self.min_samples and self.requests % 16 == 0):
+            self._delays[endpoint] = max(self.min_delay, percentile(sorted(latencies), self.percentile))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the number of requests, of hedged requests, of duplicates sent and of hedged requests answered first
+        by a duplicate.
+        """
+        return {"requests": self.requests, "hedged": self.hedged, "duplicates": self.duplicates, "wins": self.wins,
+                "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+                "win_rate": self.wins / self.hedged if self.hedged else 0.0}
+
+    def reset(self) -> None:
+        self.requests = self.hedged = self.duplicates = self.wins = 0
+        self._latencies.clear()
+        self._delays.clear()
+
+
+class HedgingExperiment:
+    """
+    The latencies of the same load sent without and with hedging, see `hedging_experiment`.
+    """
+
+    def __init__(self, baseline: BenchmarkResult, hedged: BenchmarkResult, stats: Dict[str, Any]):
+        self.baseline = baseline
+        self.hedged = hedged
+        self.stats = stats
+
+    @property
+    def p99_reduction(self) -> float:
+        """
+        The relative reduction of the p99 latency with hedging, e.g. 0.4 for 40% lower.
+        """
+        return 1 - self.hedged.p99 / self.baseline.p99 if self.baseline.p99 else 0.0
+
+    @property
+    def extra_load(self) -> float:
+        """
+        The share of additional requests sent to the service because of the hedges.
+        """
+        return self.stats["duplicates"] / self.stats["requests"] if self.stats["requests"] else 0.0
+
+    def format(self) -> str:
+        def row(name, result):
+            return (f"{name:<9} mean {result.mean * 1000:8.2f} ms  p50 {result.median * 1000:8.2f} ms  "
+                    f"p99 {result.p99 * 1000:8.2f} ms  max {result.max * 1000:8.2f} ms  errors {result.errors}")
+        return "\n".join([row("baseline", self.baseline), row("hedged", self.hedged),
+                          f"p99 {self.p99_reduction:.1%} lower, {self.extra_load:.1%} extra requests, "
+                          f"duplicates won {self.stats['win_rate']:.1%} of the hedged requests"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"baseline": self.baseline.summary(), "hedged": self.hedged.summary(), "stats": self.stats,
+                "p99_reduction": self.p99_reduction, "extra_load": self.extra_load}
+
+
+async def hedging_experiment(target: Any, policy: HedgingPolicy, requests: int = 1000, concurrency: int = 8,
+                             values: Optional[Dict[str, Any]] = None) -> HedgingExperiment:
+    """
+    Measures the effect of hedging on a service: sends the same requests without and then with the policy.
+
+    Args:
+        target (Union[RequestTemplate, When]): The request, its client is used for both runs.
+        policy (HedgingPolicy): The hedging policy to evaluate.
+        requests (int): The number of requests of each run.
+        concurrency (int): The number of requests in flight.
+        values (Dict[str, Any]): The values of the placeholders of a request template.
+
+    Examples:
+        >>> template = given(client).when("GET", "/items/{id}").template()
+        >>> experiment = await hedging_experiment(template, HedgingPolicy(percentile=90), values={"id": 1})
+        >>> print(experiment.format())
+
+    Returns:
+        HedgingExperiment: The latencies of both runs and the hedge statistics.
+    """
+    from reqflow.fluent_api import When
+
+    if isinstance(target, When):
+        target = target.template()
+    if not isinstance(target, RequestTemplate):
+        raise InvalidArgumentError("The target must be a RequestTemplate or a When stage.")
+    client, request = target.client, target.render(**(values or {}))
+    method, url = target.method, f"{client.base_url}{target.url}"
+
+    async def run(hedging: Optional[HedgingPolicy]) -> BenchmarkResult:
+        samples, status_codes, errors, remaining = [], {}, 0, requests
+
+        async def worker():
+            nonlocal errors, remaining
+            while remaining > 0:
+                remaining -= 1
+                try:
+                    # The policy is passed explicitly, the client may be shared with other coroutines
+                    response = await client._send_async(hedging, **request)
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                samples.append(response.response_time)
+                status_codes[response.status_code] = status_codes.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return BenchmarkResult(method, url, samples, errors=errors, status_codes=status_codes,
+                               concurrency=concurrency, wall_time=time.perf_counter() - start)
+
+    baseline = await run(None)
+    policy.reset()
+    hedged = await run(policy)
+    return HedgingExperiment(baseline, hedged, policy.stats())
@@ -0,0 +1,253 @@
+import asyncio
+import json
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.response.response import UnifiedResponse
+from reqflow.template import RequestTemplate
+from reqflow.utils.loop import run_sync
+from reqflow.utils.stats import percentile
+
+if TYPE_CHECKING:
+    from reqflow.client import Client
+    from reqflow.fluent_api import When
+
+Target = Union[RequestTemplate, 'When', Callable[[], Awaitable[UnifiedResponse]]]
+
+
+def _async_sender(target: Target, values: Optional[Dict[str, Any]] = None
+                  ) -> Tuple[Callable[[], Awaitable[UnifiedResponse]], Optional['Client']]:
+    """
+    Returns a function sending the request of a template, a When stage or an async function once, and its client.
+    """
+    from reqflow.fluent_api import When
+
+    if isinstance(target, RequestTemplate):
+        request = target.render(**(values or {}))
+        send_async = target.client.send_async
+        return lambda: send_async(**request), target.client
+    if isinstance(target, When):
+        template = target.template()
+        return _async_sender(template, values)
+    if callable(target):
+        return target, None
+    raise InvalidArgumentError("The target must be a RequestTemplate, a When stage or an async function.")
+
+
+class LoadStep:
+    """
+    The latency and throughput measured at one concurrency level.
+    """
+
+    def __init__(self, concurrency: int, samples: List[float], errors: int, duration: float,
+                 pool: Optional[Dict[str, int]] = None):
+        self.concurrency = concurrency
+        self.requests = len(samples) + errors
+        self.errors = errors
+        self.duration = duration
+        self.pool = pool
+        ordered = sorted(samples)
+        self.p50 = percentile(ordered, 50) if ordered else None
+        self.p95 = percentile(ordered, 95) if ordered else None
+        self.p99 = percentile(ordered, 99) if ordered else None
+        self.within_slo = False
+
+    @property
+    def rps(self) -> float:
+        """
+        The completed requests (including errors) per second.
+        """
+        return self.requests / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"concurrency": self.concurrency, "requests": self.requests, "errors": self.errors,
+                "error_rate": self.error_rate, "rps": self.rps, "p50": self.p50, "p95": self.p95, "p99": self.p99,
+                "within_slo": self.within_slo, "pool": self.pool}
+
+
+class CapacityResult:
+    """
+    The outcome of `find_capacity`: the latency-vs-load curve and the sustainable concurrency and throughput.
+
+    The sustainable point (the knee of the curve) is the step with the highest throughput among the steps that met
+    the SLO.
+    """
+
+    def __init__(self, steps: List[LoadStep], p99_slo: float, max_error_rate: float):
+        self.steps = steps
+        self.p99_slo = p99_slo
+        self.max_error_rate = max_error_rate
+        within = [step for step in steps if step.within_slo]
+        self.knee: Optional[LoadStep] = max(within, key=lambda step: step.rps) if within else None
+
+    @property
+    def sustainable_concurrency(self) -> int:
+        return self.knee.concurrency if self.knee else 0
+
+    @property
+    def sustainable_rps(self) -> float:
+        return self.knee.rps if self.knee else 0.0
+
+    def curve(self) -> List[Dict[str, Any]]:
+        """
+        Returns the steps grouped by concurrency level, i.e. the latency-vs-load curve, ordered by concurrency.
+        """
+        levels: Dict[int, List[LoadStep]] = {}
+        for step in self.steps:
+            levels.setdefault(step.concurrency, []).append(step)
+        curve = []
+        for concurrency in sorted(levels):
+            steps = levels[concurrency]
+            p99s = [step.p99 for step in steps if step.p99 is not None]
+            curve.append({"concurrency": concurrency, "rps": sum(step.rps for step in steps) / len(steps),
+                          "p99": max(p99s) if p99s else None,
+                          "error_rate": max(step.error_rate for step in steps)})
+        return curve
+
+    def assert_sustains(self, rps: float) -> 'CapacityResult':
+        """
+        Asserts that the sustainable throughput is at least `rps` requests per second.
+        """
+        assert self.sustainable_rps >= rps, \
+            f"Sustainable throughput {self.sustainable_rps:.1f} req/s is below {rps} req/s " \
+            f"(p99 SLO {self.p99_slo}s, max error rate {self.max_error_rate:.1%})"
+        return self
+
+    def format(self) -> str:
+        """
+        Returns the steps of the search and the sustainable point as text.
+        """
+        lines = [f"{'step':>4}  {'concurrency':>11}  {'req/s':>9}  {'p99 (ms)':>9}  {'errors':>7}  SLO"]
+        for index, step in enumerate(self.steps):
+            p99 = "-" if step.p99 is None else f"{step.p99 * 1000:.1f}"
+            lines.append(f"{index:>4}  {step.concurrency:>11}  {step.rps:>9.1f}  {p99:>9}  {step.error_rate:>7.1%}  "
+                         f"{'ok' if step.within_slo else 'violated'}")
+        lines.append(f"Sustainable: concurrency {self.sustainable_concurrency}, {self.sustainable_rps:.1f} req/s "
+                     f"(p99 SLO {self.p99_slo * 1000:.0f} ms, max error rate {self.max_error_rate:.1%})")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"p99_slo": self.p99_slo, "max_error_rate": self.max_error_rate,
+                "sustainable_concurrency": self.sustainable_concurrency, "sustainable_rps": self.sustainable_rps,
+                "curve": self.curve(), "steps": [step.to_dict() for step in self.steps]}
+
+    def save(self, file_path: str) -> None:
+        with open(file_path, "w") as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+
+async def _run_step(send: Callable[[], Awaitable[UnifiedResponse]], concurrency: int, duration: float,
+                    client: Optional['Client']) -> LoadStep:
+    samples: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    pool = None
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            try:
+                response = await send()
+            except Exception:  # Transport errors, or any error raised by a scenario
+                errors += 1
+                continue
+            if response.status_code >= 500:
+                errors += 1
+            else:
+                samples.append(response.response_time)
+
+    async def sample_pool():
+        nonlocal pool
+        await asyncio.sleep(duration / 2)
+        pool = client.pool_stats()
+
+    start = time.perf_counter()
+    tasks = [worker() for _ in range(concurrency)]
+    if client is not None:
+        tasks.append(sample_pool())
+    await asyncio.gather(*tasks)
+    return LoadStep(concurrency, samples, errors, time.perf_counter() - start, pool)
+
+
+async def find_capacity_async(target: Target, p99_slo: float = 0.5, max_error_rate: float = 0.01,
+                              initial_concurrency: int = 1, max_concurrency: int = 1024, additive_increase: int = 0,
+                              decrease_factor: float = 0.5, step_duration: float = 2.0, max_steps: int = 30,
+                              max_backoffs: int = 3, values: Optional[Dict[str, Any]] = None) -> CapacityResult:
+    """
+    Searches the maximum concurrency and throughput a service sustains within a latency SLO, with an AIMD controller.
+
+    The target runs for `step_duration` seconds at a time with a fixed number of requests in flight. While the p99
+    latency and the error rate (exceptions and 5xx responses) stay within the SLO, the concurrency doubles
+    until the first violation (slow start) and then grows by `additive_increase`. On a violation, it is multiplied
+    by `decrease_factor`. The search ends after `max_backoffs` violations, after `max_steps` steps, or when the SLO
+    holds at `max_concurrency`.
+
+    Args:
+        target (Union[RequestTemplate, When, Callable]): A request template, a When stage or an async function
+            sending a request (or a scenario) and returning its response.
+        p99_slo (float): The p99 latency SLO in seconds.
+        max_error_rate (float): The maximum share of failed requests.
+        initial_concurrency (int): The concurrency of the first step.
+        max_concurrency (int): The highest concurrency tried.
+        additive_increase (int): The concurrency added after each step within the SLO once a violation occurred.
+            Defaults to a tenth of the concurrency at the first violation.
+        decrease_factor (float): The factor applied to the concurrency after a violation.
+        step_duration (float): The duration of each step in seconds.
+        max_steps (int): The maximum number of steps.
+        max_backoffs (int): The number of violations after which the search stops.
+        values (Dict[str, Any]): The values of the placeholders of a request template.
+
+    Examples:
+        >>> from reqflow import given, Client
+        >>> from reqflow.load import find_capacity_async
+        >>>
+        >>> client = Client(base_url="http://localhost:8080")
+        >>> template = given(client).when("GET", "/items/{id}").template()
+        >>> result = await find_capacity_async(template, p99_slo=0.2, values={"id": 1})
+        >>> print(result.format())
+        >>> result.assert_sustains(rps=500)
+
+    Returns:
+        CapacityResult: The steps of the search and the sustainable point.
+    """
+    if initial_concurrency < 1 or max_concurrency < initial_concurrency or not 0 < decrease_factor < 1:
+        raise InvalidArgumentError("The concurrency range must be positive and `decrease_factor` between 0 and 1.")
+
+    send, client = _async_sender(target, values)
+    steps: List[LoadStep] = []
+    concurrency, backoffs, slow_start, increase = initial_concurrency, 0, True, additive_increase
+
+    while len(steps) < max_steps:
+        step = await _run_step(send, concurrency, step_duration, client)
+        step.within_slo = step.p99 is not None and step.p99 <= p99_slo and step.error_rate <= max_error_rate
+        steps.append(step)
+
+        if step.within_slo:
+            if concurrency >= max_concurrency:
+                break
+            if slow_start:
+                concurrency = min(concurrency * 2, max_concurrency)
+            else:
+                concurrency = min(concurrency + increase, max_concurrency)
+        else:
+            backoffs += 1
+            if backoffs >= max_backoffs:
+                break
+            if slow_start:
+                slow_start = False
+                increase = increase or max(1, concurrency // 10)
+            concurrency = max(1, int(concurrency * decrease_factor))
+
+    return CapacityResult(steps, p99_slo, max_error_rate)
+
+
+def find_capacity(target: Target, **kwargs: Any) -> CapacityResult:
+    """
+    Sync version of `find_capacity_async`, running the search on a new event loop.
+    """
+    return run_sync(find_capacity_async(target, **kwargs))
@@ -0,0 +1,2 @@
+from reqflow.mock import profiles
+from reqflow.mock.server import MockServer, Route
@@ -0,0 +1,31 @@
+import argparse
+import time
+
+from reqflow.mock.server import MockServer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m reqflow.mock", description="Runs a ReqFlow mock server.")
+    parser.add_argument("config", help="A JSON or YAML file with the routes of the server.")
+    parser.add_argument("--host", help="The interface to listen on.")
+    parser.add_argument("--port", type=int, help="The port to listen on.")
+    parser.add_argument("--uds", help="Listen on this Unix domain socket instead of TCP.")
+    args = parser.parse_args()
+
+    server = MockServer.from_file(args.config)
+    server.raise_fd_limit = True
+    for option in ("host", "port", "uds"):
+        if getattr(args, option) is not None:
+            setattr(server, option, getattr(args, option))
+
+    with server:
+        print(f"Serving {len(server.routes)} routes on {server.uds or server.url}", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+import asyncio
+import json
+import math
+import random
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+from reqflow.exceptions import InvalidArgumentError
+
+
+class Latency(ABC):
+    """
+    The base class of the latency distributions of mock routes.
+    """
+
+    @abstractmethod
+    def sample(self, rng: random.Random, params: Dict[str, str]) -> float:
+        """
+        Draws the delay of one response in seconds.
+
+        Args:
+            rng (random.Random): The random generator of the server.
+            params (Dict[str, str]): The path parameters of the request.
+        """
+
+
+class Fixed(Latency):
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def sample(self, rng, params):
+        return self.seconds
+
+
+class Normal(Latency):
+    def __init__(self, mean: float, stdev: float):
+        self.mean = mean
+        self.stdev = stdev
+
+    def sample(self, rng, params):
+        return max(0.0, rng.gauss(self.mean, self.stdev))
+
+
+class Uniform(Latency):
+    def __init__(self, low: float, high: float):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng, params):
+        return rng.uniform(self.low, self.high)
+
+
+class LongTail(Latency):
+    """
+    A log-normal distribution: most responses are close to the median with a long tail of slow ones.
+    """
+
+    def __init__(self, median: float, sigma: float = 1.0, maximum: Optional[float] = None):
+        self.median = median
+        self.sigma = sigma
+        self.maximum = maximum
+
+    def sample(self, rng, params):
+        value = rng.lognormvariate(math.log(self.median), self.sigma)
+        return value if self.maximum is None else min(value, self.maximum)
+
+
+class FromPath(Latency):
+    """
+    Takes the delay from a path parameter, e.g. `/delay/{seconds}`.
+    """
+
+    def __init__(self, name: str, scale: float = 1.0):
+        self.name = name
+        self.scale = scale
+
+    def sample(self, rng, params):
+        try:
+            return float(params[self.name]) * self.scale
+        except (KeyError, ValueError):
+            return 0.0
+
+
+def fixed(seconds: float) -> Latency:
+    """
+    Every response is delayed by `seconds`.
+    """
+    return Fixed(seconds)
+
+
+def normal(mean: float, stdev: float) -> Latency:
+    """
+    Normally distributed delays, clipped at 0.
+    """
+    return Normal(mean, stdev)
+
+
+def uniform(low: float, high: float) -> Latency:
+    """
+    Uniformly distributed delays between `low` and `high` seconds.
+    """
+    return Uniform(low, high)
+
+
+def long_tail(median: float, sigma: float = 1.0, maximum: Optional[float] = None) -> Latency:
+    """
+    Log-normally distributed delays with the given median, optionally capped at `maximum` seconds.
+    """
+    return LongTail(median, sigma, maximum)
+
+
+def from_path(name: str, scale: float = 1.0) -> Latency:
+    """
+    Delays by the value of the path parameter `name` multiplied by `scale`.
+    """
+    return FromPath(name, scale)
+
+
+class Payload(ABC):
+    """
+    The base class of the response bodies of mock routes.
+
+    Static payloads are encoded once and served with a Content-Length. Streaming payloads are sent with
+    chunked transfer encoding.
+    """
+
+    content_type = "application/octet-stream"
+    streaming = False
+
+    @abstractmethod
+    def body(self) -> bytes:
+        """
+        Returns the encoded body of a static payload, or the whole body of a streaming payload.
+        """
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """
+        Yields the chunks of a streaming payload.
+        """
+        yield self.body()
+
+
+class Text(Payload):
+    def __init__(self, text: Union[str, bytes], content_type: str = "text/plain; charset=utf-8"):
+        self._body = text.encode("utf-8") if isinstance(text, str) else text
+        self.content_type = content_type
+
+    def body(self):
+        return self._body
+
+
+class Json(Payload):
+    content_type = "application/json"
+
+    def __init__(self, value: Any):
+        self._body = json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+    def body(self):
+        return self._body
+
+
+def _item(index: int) -> Dict[str, Any]:
+    return {"id": index, "name": f"item {index}", "price": round(index * 1.25, 2), "tags": ["mock", "reqflow"]}
+
+
+class JsonItems(Json):
+    def __init__(self, count: int):
+        super().__init__([_item(index) for index in range(count)])
+
+
+class Binary(Payload):
+    def __init__(self, size: int):
+        pattern = bytes(range(256))
+        self._body = (pattern * (size // 256 + 1))[:size]
+
+    def body(self):
+        return self._body
+
+
+class _Streaming(Payload):
+    streaming = True
+
+    def __init__(self, interval: float = 0.0):
+        self.interval = interval
+
+    @abstractmethod
+    def _parts(self):
+        """
+        Yields the chunks of the body.
+        """
+
+    def body(self):
+        return b"".join(self._parts())
+
+    async def chunks(self):
+        for index, part in enumerate(self._parts()):
+            if index and self.interval:
+                await asyncio.sleep(self.interval)
+            yield part
+
+
+class Chunked(_Streaming):
+    def __init__(self, size: int, chunk_size: int = 64 * 1024, interval: float = 0.0):
+        super().__init__(interval)
+        self.size = size
+        self.chunk = Binary(chunk_size).body()
+
+    def _parts(self):
+        remaining = self.size
+        while remaining > 0:
+            yield self.chunk[:remaining]
+            remaining -= len(self.chunk)
+
+
+class NDJson(_Streaming):
+    content_type = "application/x-ndjson"
+
+    def __init__(self, count: int, interval: float = 0.0):
+        super().__init__(interval)
+        self.count = count
+
+    def _parts(self):
+        for index in range(self.count):
+            yield json.dumps(_item(index), separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class SSE(_Streaming):
+    content_type = "text/event-stream"
+
+    def __init__(self, count: int, interval: float = 0.0, event: str = "message"):
+        super().__init__(interval)
+        self.count = count
+        self.event = event
+
+    def _parts(self):
+        for index in range(self.count):
+            data = json.dumps(_item(index), separators=(",", ":"))
+            yield f"id: {index}\nevent: {self.event}\ndata: {data}\n\n".encode("utf-8")
+
+
+def text(body: Union[str, bytes], content_type: str = "text/plain; charset=utf-8") -> Payload:
+    """
+    A static text body.
+    """
+    return Text(body, content_type)
+
+
+def json_value(value: Any) -> Payload:
+    """
+    A static JSON body.
+    """
+    return Json(value)
+
+
+def json_items(count: int) -> Payload:
+    """
+    A JSON array of `count` generated items.
+    """
+    return JsonItems(count)
+
+
+def binary(size: int = 0, megabytes: float = 0) -> Payload:
+    """
+    A binary body of `size` bytes or `megabytes` MiB.
+    """
+    return Binary(size or int(megabytes * 1024 * 1024))
+
+
+def chunked(size: int, chunk_size: int = 64 * 1024, interval: float = 0.0) -> Payload:
+    """
+    A binary body of `size` bytes streamed in chunks of `chunk_size` bytes, `interval` seconds apart.
+    """
+    return Chunked(size, chunk_size, interval)
+
+
+def ndjson(count: int, interval: float = 0.0) -> Payload:
+    """
+    `count` newline delimited JSON items streamed `interval` seconds apart.
+    """
+    return NDJson(count, interval)
+
+
+def sse(count: int, interval: float = 0.0, event: str = "message") -> Payload:
+    """
+    `count` server-sent events streamed `interval` seconds apart.
+    """
+    return SSE(count, interval, event)
+
+
+LATENCIES = {"fixed": fixed, "normal": normal, "uniform": uniform, "long_tail": long_tail, "from_path": from_path}
+PAYLOADS = {"text": text, "json": json_value, "json_items": json_items, "binary": binary, "chunked": chunked,
+            "ndjson": ndjson, "sse": sse}
+
+
+def latency_from_config(config: Union[None, float, Dict[str, Any], Latency]) -> Optional[Latency]:
+    """
+    Builds a latency from a number of seconds or a dictionary like `{"type": "normal", "mean": 0.05, "stdev": 0.01}`.
+    """
+    if config is None or isinstance(config, Latency):
+        return config
+    if isinstance(config, (int, float)):
+        return fixed(config)
+    options = dict(config)
+    kind = options.pop("type", "fixed")
+    if kind not in LATENCIES:
+        raise InvalidArgumentError(f"Invalid latency type: {kind}. Must be one of {list(LATENCIES)}.")
+    return LATENCIES[kind](**options)
+
+
+def payload_from_config(config: Union[None, str, Dict[str, Any], Payload]) -> Optional[Payload]:
+    """
+    Builds a payload from a text body or a dictionary like `{"type": "json_items", "count": 100}`.
+    """
+    if config is None or isinstance(config, Payload):
+        return config
+    if isinstance(config, str):
+        return text(config)
+    options = dict(config)
+    kind = options.pop("type")
+    if kind not in PAYLOADS:
+        raise InvalidArgumentError(f"Invalid payload type: {kind}. Must be one of {list(PAYLOADS)}.")
+    return PAYLOADS[kind](**options)
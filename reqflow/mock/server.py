@@ -0,0 +1,446 @@
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.mock.profiles import Latency, Payload, latency_from_config, payload_from_config
+
+MAX_HEADER_BYTES = 64 * 1024
+_REASONS = {status.value: status.phrase for status in HTTPStatus}
+
+
+class Route:
+    """
+    A route of the mock server.
+
+    The path can contain `{name}` parameters matching one segment and end with `*` to match any suffix.
+
+    Args:
+        method (str): The HTTP method, or "*" for any method.
+        path (str): The path pattern, e.g. "/users/{id}".
+        status (Union[int, Dict[int, float]]): The status code, or a mix of status codes and their weights,
+            e.g. `{200: 0.95, 503: 0.05}`.
+        latency (Latency): The delay before the response, see `reqflow.mock.profiles`. A number is a fixed delay.
+        payload (Payload): The response body, see `reqflow.mock.profiles`. A string is a text body.
+        headers (Dict[str, str]): Additional response headers.
+        drop_rate (float): The fraction of requests answered by closing the connection without a response.
+    """
+
+    def __init__(self, method: str, path: str, status: Union[int, Dict[int, float]] = 200,
+                 latency: Union[None, float, Latency] = None, payload: Union[None, str, Payload] = None,
+                 headers: Optional[Dict[str, str]] = None, drop_rate: float = 0.0):
+        self.method = method.upper()
+        self.path = path
+        self.latency = latency_from_config(latency)
+        self.payload = payload_from_config(payload)
+        self.headers = headers or {}
+        self.drop_rate = drop_rate
+        if isinstance(status, dict):
+            self.statuses = [int(code) for code in status]
+            self.weights = list(status.values())
+        else:
+            self.statuses, self.weights = [int(status)], None
+        for code in self.statuses:
+            if code not in _REASONS:
+                raise InvalidArgumentError(f"Invalid status code: {code}")
+
+        pattern = re.sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", re.escape(path.rstrip("*")))
+        self._regex = re.compile(pattern + (".*" if path.endswith("*") else "") + "$")
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+    def match(self, method: str, path: str) -> Optional[Dict[str, str]]:
+        """
+        Returns the path parameters if the route matches the request, otherwise None.
+        """
+        if self.method != "*" and self.method != method and not (method == "HEAD" and self.method == "GET"):
+            return None
+        match = self._regex.match(path)
+        return match.groupdict() if match else None
+
+    def choose_status(self, rng: random.Random) -> int:
+        if self.weights is None:
+            return self.statuses[0]
+        return rng.choices(self.statuses, self.weights)[0]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'Route':
+        """
+        Builds a route from a dictionary with the keys of the constructor, e.g.
+        `{"method": "GET", "path": "/items", "latency": {"type": "long_tail", "median": 0.05},
+        "payload": {"type": "json_items", "count": 100}}`.
+        """
+        options = dict(config)
+        status = options.pop("status", 200)
+        if isinstance(status, dict):
+            status = {int(code): weight for code, weight in status.items()}
+        return cls(options.pop("method", "GET"), options.pop("path"), status=status, **options)
+
+
+class MockServer:
+    """
+    A local asyncio HTTP/1.1 server with configurable routes, latency distributions and payloads.
+
+    The server runs its own event loop in a background thread. Every connection is a coroutine and delays are
+    non-blocking, so it keeps tens of thousands of concurrent (slow) connections open, limited by the file
+    descriptor limit of the process. With `raise_fd_limit=True` the limit is raised to the hard limit while the
+    server runs.
+
+    Examples:
+        >>> from reqflow import Client, given
+        >>> from reqflow.mock import MockServer, profiles
+        >>>
+        >>> server = MockServer(seed=1)
+        >>> server.add_route("GET", "/items", latency=profiles.long_tail(0.05, sigma=0.5),
+        >>>                  payload=profiles.json_items(100), status={200: 0.99, 503: 0.01})
+        >>> with server:
+        >>>     given(Client(base_url=server.url)).when("GET", "/items").then().status_code(200)
+        >>>     server.counters()["GET /items"]
+        >>>     {'requests': 1, 'dropped': 0, 'statuses': {200: 1}}
+    """
+
+    def __init__(self, routes: Optional[List[Route]] = None, host: str = "127.0.0.1", port: int = 0,
+                 uds: Optional[str] = None, seed: Optional[int] = None, backlog: int = 65535,
+                 raise_fd_limit: bool = False):
+        """
+        Args:
+            routes (List[Route]): The initial routes. Routes are matched in the order they were added.
+            host (str): The interface to listen on.
+            port (int): The port to listen on, 0 picks a free port.
+            uds (str): Listen on this Unix domain socket path instead of TCP.
+            seed (int): Optional seed for the latencies, status mixes and drops.
+            backlog (int): The listen backlog.
+            raise_fd_limit (bool): If True, raises the open files limit of the process to the hard limit on start
+                and restores it on stop.
+        """
+        self.routes: List[Route] = list(routes or [])
+        self.host = host
+        self.port = port
+        self.uds = uds
+        self.backlog = backlog
+        self.raise_fd_limit = raise_fd_limit
+        self.rng = random.Random(seed)
+        self._counters: Dict[str, Dict[str, Any]] = {}
+        self._connections = 0
+        self._max_connections = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._fd_limit: Optional[Tuple[int, int]] = None
+
+    def add_route(self, method: str, path: str, **kwargs) -> Route:
+        """
+        Adds a route, see `Route` for the arguments.
+
+        Returns:
+            Route: The added route.
+        """
+        route = Route(method, path, **kwargs)
+        self.routes.append(route)
+        return route
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'MockServer':
+        """
+        Builds a server from a dictionary with a `routes` list and optional `host`, `port`, `uds` and `seed`.
+        """
+        options = dict(config)
+        routes = [Route.from_config(route) for route in options.pop("routes", [])]
+        return cls(routes=routes, **options)
+
+    @classmethod
+    def from_file(cls, file_path: str) -> 'MockServer':
+        """
+        Builds a server from a JSON or YAML file, see `from_config`. YAML requires PyYAML.
+
+        Examples:
+            >>> # mock.yaml
+            >>> # routes:
+            >>> #   - {method: GET, path: /items, payload: {type: json_items, count: 100},
+            >>> #      latency: {type: normal, mean: 0.05, stdev: 0.01}, status: {200: 0.9, 500: 0.1}}
+            >>> server = MockServer.from_file("mock.yaml").start()
+        """
+        with open(file_path, "r", encoding="utf-8") as file:
+            if file_path.endswith((".yaml", ".yml")):
+                import yaml
+                return cls.from_config(yaml.safe_load(file))
+            return cls.from_config(json.load(file))
+
+    @property
+    def url(self) -> str:
+        """
+        The base URL of the server. With a Unix domain socket the host is only used in the Host header.
+        """
+        return "http://localhost" if self.uds else f"http://{self.host}:{self.port}"
+
+    def counters(self) -> Dict[str, Any]:
+        """
+        Returns the request counters per route ("METHOD path", or "unmatched") and the connection counters.
+        """
+        with self._lock:
+            counters = {name: {"requests": counter["requests"], "dropped": counter["dropped"],
+                               "statuses": dict(counter["statuses"])}
+                        for name, counter in self._counters.items()}
+            counters["connections"] = {"active": self._connections, "max_active": self._max_connections}
+        return counters
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._max_connections = self._connections
+
+    def _count(self, name: str, status: Optional[int]) -> None:
+        with self._lock:
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters[name] = {"requests": 0, "dropped": 0, "statuses": {}}
+            counter["requests"] += 1
+            if status is None:
+                counter["dropped"] += 1
+            else:
+                counter["statuses"][status] = counter["statuses"].get(status, 0) + 1
+
+    def start(self) -> 'MockServer':
+        """
+        Starts the server in a background thread and waits until it accepts connections.
+
+        Returns:
+            MockServer: The instance of the MockServer class.
+        """
+        if self.raise_fd_limit:
+            self._fd_limit = _raise_open_files_limit()
+        started = threading.Event()
+        errors: List[BaseException] = []
+
+        def run():
+            loop = self._loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(self._listen())
+            except BaseException as e:  # Reported to the caller of start()
+                errors.append(e)
+                started.set()
+                loop.close()
+                return
+            started.set()
+            try:
+                loop.run_forever()
+            finally:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+                loop.close()
+
+        self._thread = threading.Thread(target=run, name="reqflow-mock-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            self._restore_open_files_limit()
+            raise errors[0]
+        return self
+
+    async def _listen(self) -> None:
+        if self.uds:
+            if os.path.exists(self.uds):
+                os.remove(self.uds)
+            self._server = await asyncio.start_unix_server(self._handle, path=self.uds, backlog=self.backlog,
+                                                           limit=MAX_HEADER_BYTES)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=self.backlog,
+                                                      reuse_address=True, limit=MAX_HEADER_BYTES)
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    def stop(self) -> None:
+        """
+        Stops the server and closes the open connections.
+        """
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+        if self.uds and os.path.exists(self.uds):
+            os.remove(self.uds)
+        self._restore_open_files_limit()
+
+    def _restore_open_files_limit(self) -> None:
+        if self._fd_limit is not None:
+            _set_open_files_limit(self._fd_limit)
+            self._fd_limit = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        with self._lock:
+            self._connections += 1
+            self._max_connections = max(self._max_connections, self._connections)
+        try:
+            while await self._handle_request(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            with self._lock:
+                self._connections -= 1
+            writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """
+        Serves one request of a connection and returns whether the connection can be reused.
+        """
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            writer.write(b"HTTP/1.1 431 Request Header Fields Too Large\r\nContent-Length: 0\r\n"
+                         b"Connection: close\r\n\r\n")
+            await writer.drain()
+            return False
+        except asyncio.IncompleteReadError:
+            return False
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            return await _bad_request(writer)
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            await _read_body(reader, headers)
+        except (ValueError, asyncio.LimitOverrunError):  # Invalid Content-Length or chunk size
+            return await _bad_request(writer)
+        keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+        path = target.split("?", 1)[0]
+
+        for route in self.routes:
+            params = route.match(method, path)
+            if params is not None:
+                break
+        else:
+            self._count("unmatched", 404)
+            await _write_response(writer, 404, b'{"error":"Not Found"}', "application/json", {}, keep_alive,
+                                  method == "HEAD")
+            return keep_alive
+
+        if route.drop_rate and self.rng.random() < route.drop_rate:
+            self._count(route.name, None)
+            return False
+
+        status = route.choose_status(self.rng)
+        if route.latency is not None:
+            delay = route.latency.sample(self.rng, params)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        self._count(route.name, status)
+        payload = route.payload
+        if payload is not None and payload.streaming and method != "HEAD":
+            await _write_streaming_response(writer, status, payload, route.headers, keep_alive)
+        else:
+            body = payload.body() if payload is not None else b""
+            content_type = payload.content_type if payload is not None else "text/plain; charset=utf-8"
+            await _write_response(writer, status, body, content_type, route.headers, keep_alive, method == "HEAD")
+        return keep_alive
+
+
+async def _bad_request(writer: asyncio.StreamWriter) -> bool:
+    writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+    await writer.drain()
+    return False
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> None:
+    """
+    Reads and discards the body of a request.
+
+    Raises:
+        ValueError: If the Content-Length or a chunk size is invalid.
+    """
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+            if size < 0:
+                raise ValueError(f"Invalid chunk size: {size}")
+            await reader.readexactly(size + 2)
+            if size == 0:
+                return
+    length = int(headers.get("content-length") or 0)
+    if length < 0:
+        raise ValueError(f"Invalid Content-Length: {length}")
+    if length:
+        await reader.readexactly(length)
+
+
+def _head(status: int, content_type: str, headers: Dict[str, str], keep_alive: bool, framing: str) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS[status]}", f"Content-Type: {content_type}", framing,
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _write_response(writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str,
+                          headers: Dict[str, str], keep_alive: bool, head_only: bool) -> None:
+    writer.write(_head(status, content_type, headers, keep_alive, f"Content-Length: {len(body)}"))
+    if not head_only and body:
+        writer.write(body)
+    await writer.drain()
+
+
+async def _write_streaming_response(writer: asyncio.StreamWriter, status: int, payload: Payload,
+                                    headers: Dict[str, str], keep_alive: bool) -> None:
+    writer.write(_head(status, payload.content_type, headers, keep_alive, "Transfer-Encoding: chunked"))
+    async for chunk in payload.chunks():
+        if chunk:
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+def _raise_open_files_limit() -> Optional[Tuple[int, int]]:
+    """
+    Raises the soft open files limit to the hard limit.
+
+    Returns:
+        The previous limits if they were changed, otherwise None.
+    """
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = hard if hard != resource.RLIM_INFINITY else 1 << 20
+    if soft != resource.RLIM_INFINITY and soft < target and _set_open_files_limit((target, hard)):
+        return soft, hard
+    return None
+
+
+def _set_open_files_limit(limits: Tuple[int, int]) -> bool:
+    import resource
+    try:
+        resource.setrlimit(resource.RLIMIT_NOFILE, limits)
+    except (ValueError, OSError):
+        return False
+    return True
@@ -0,0 +1,59 @@
+import pytest
+
+from reqflow.utils.context import caller_context
+from reqflow.utils.logger import GlobalLogger
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("reqflow")
+    group.addoption("--reqflow-baseline", metavar="PATH", default=None,
+                    help="Compare the logged requests against a baseline file and fail the session on regressions.")
+    group.addoption("--reqflow-save-baseline", metavar="PATH", default=None,
+                    help="Save the logged requests as a baseline file.")
+    group.addoption("--reqflow-regression-threshold", type=float, default=0.2,
+                    help="Relative slowdown of an endpoint that counts as a regression. Defaults to 0.2 (20%%).")
+    group.addoption("--reqflow-regression-alpha", type=float, default=0.05,
+                    help="Significance level of the regression test. Defaults to 0.05.")
+
+
+@pytest.hookimpl(tryfirst=True, hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """
+    Attributes the requests logged while a test runs to the test name and node id.
+    """
+    with caller_context(item.name, test_id=item.nodeid):
+        yield
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session, exitstatus):
+    """
+    Saves or compares the baseline before the logs are reported and cleared.
+    """
+    config = session.config
+    baseline_path, save_path = config.getoption("reqflow_baseline"), config.getoption("reqflow_save_baseline")
+    if not baseline_path and not save_path:
+        return
+
+    from reqflow.baseline import Baseline
+
+    current = Baseline.from_logs()
+    if save_path:
+        current.save(save_path)
+    if baseline_path:
+        comparison = Baseline.load(baseline_path).compare(
+            current, threshold=config.getoption("reqflow_regression_threshold"),
+            alpha=config.getoption("reqflow_regression_alpha"))
+        GlobalLogger.baseline_comparison = comparison
+        if comparison.regressions and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    comparison = GlobalLogger.baseline_comparison
+    if comparison is None or not config.getoption("reqflow_baseline"):
+        return
+    terminalreporter.section("reqflow baseline comparison")
+    terminalreporter.write_line(comparison.format())
+    if comparison.regressions:
+        terminalreporter.write_line(f"{len(comparison.regressions)} endpoint(s) regressed", red=True)
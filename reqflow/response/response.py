@@ -1,43 +1,142 @@
+import hashlib
 import httpx
 import json
 from json.decoder import JSONDecodeError
 from jsonpath_ng import parse
-from typing import Any, Callable
+from typing import Any, Callable, Dict, Optional
+
+from reqflow.utils.timing import RequestTimings
+
+
+_UNSET = object()
+
+
+class ResponseSummary:
+    """
+    What a batch run needs to keep of a response: the status, the timings and the size and digest of the body.
+    """
+
+    __slots__ = ("status_code", "response_time", "timings", "size", "digest", "truncated")
+
+    def __init__(self, status_code: int, response_time: Optional[float], timings: Optional[RequestTimings],
+                 size: int, digest: str, truncated: bool = False):
+        self.status_code = status_code
+        self.response_time = response_time
+        self.timings = timings
+        self.size = size
+        self.digest = digest
+        self.truncated = truncated
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"status_code": self.status_code, "response_time": self.response_time,
+                "timings": self.timings.to_dict() if self.timings is not None else None, "size": self.size,
+                "digest": self.digest, "truncated": self.truncated}
+
+    def __repr__(self):
+        return f"ResponseSummary(status_code={self.status_code}, size={self.size}, digest={self.digest[:12]})"
 
 
 class UnifiedResponse:
     """
     A unified response object.
+
+    The response does not keep the httpx response: the raw body is stored once and decoded on first access, the
+    headers are kept as raw pairs and the headers and the cookie jar are only built when they are read. An invalid
+    JSON body therefore raises a `JSONDecodeError` on the first access to the body, unless `force_json` is set.
     """
+
+    __slots__ = ("_status_code", "_raw_headers", "_content_type", "_response_time", "_raw_body", "_body",
+                 "_text", "_response_type", "_encoding", "_force_json", "_retain_log", "_timings", "_truncated",
+                 "_headers", "_cookies", "_method", "_url")
+
     def __init__(self, http_response: httpx.Response, response_time: float = None, response_type: str = 'REST',
-                 force_json: bool = False):
+                 force_json: bool = False, retain_log: Optional[Callable[[], None]] = None,
+                 timings: Optional[RequestTimings] = None, truncated: bool = False):
+        headers = http_response.headers
         self._status_code = http_response.status_code
-        self._headers = http_response.headers
+        self._raw_headers = tuple(headers.raw) if isinstance(headers, httpx.Headers) else tuple(headers.items())
+        self._content_type = headers.get('Content-Type', '')
         self._response_time = response_time
         self._raw_body = http_response.content
         self._response_type = response_type
-        self._content_type = http_response.headers.get('Content-Type', '')
         self._encoding = http_response.encoding
         self._force_json = force_json
+        self._retain_log = retain_log
+        self._timings = timings
+        self._truncated = truncated
+        self._headers: Optional[httpx.Headers] = None
+        self._cookies = _UNSET
+        self._body = _UNSET
+        self._text: Optional[str] = None
 
         try:
-            self.cookies = http_response.cookies
+            request = http_response.request
+            self._method, self._url = request.method, str(request.url)
         except (RuntimeError, AttributeError):
-            self.cookies = None
+            self._method = self._url = None
+
+        if self._force_json:
+            # Decoded right away, so that a body which is not JSON fails the request
+            self._body = self._decode()
 
+    def _decode(self) -> Any:
+        if self._truncated:
+            # A truncated JSON document cannot be decoded
+            if 'application/json' in self.content_type or 'text/' in self.content_type:
+                return self.text
+            return self._raw_body
         if self._force_json:
             try:
-                self.body = http_response.json()
+                return json.loads(self._raw_body)
             except (JSONDecodeError, UnicodeDecodeError):
                 raise JSONDecodeError("Force JSON decoding failed", str(self._raw_body), pos=0)
-        else:
-            if 'application/json' in self.content_type:
-                self.body = http_response.json()
-            elif 'text/' in self.content_type:
-                    self.body = http_response.text
+        if 'application/json' in self.content_type:
+            return json.loads(self._raw_body)
+        if 'text/' in self.content_type:
+            return self.text
+        # For binary data
+        return self._raw_body
+
+    @property
+    def body(self) -> Any:
+        """
+        Returns the body of the response: the decoded JSON document, the text, or the bytes of a binary body.
+        """
+        if self._body is _UNSET:
+            self._body = self._decode()
+        return self._body
+
+    @body.setter
+    def body(self, value: Any) -> None:
+        self._body = value
+
+    @property
+    def cookies(self) -> Optional[httpx.Cookies]:
+        """
+        Returns the cookies set by the response, or None if the response has no request.
+        """
+        if self._cookies is _UNSET:
+            if self._url is None:
+                self._cookies = None
             else:
-                # For binary data
-                self.body = http_response.content
+                response = httpx.Response(self._status_code, headers=self._raw_headers,
+                                          request=httpx.Request(self._method, self._url))
+                self._cookies = response.cookies
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value: Optional[httpx.Cookies]) -> None:
+        self._cookies = value
+
+    def summary(self) -> ResponseSummary:
+        """
+        Returns the status, timings, size and digest of the response, to keep instead of the response in large runs.
+
+        Returns:
+            ResponseSummary: The summary of the response.
+        """
+        return ResponseSummary(self._status_code, self._response_time, self._timings, len(self._raw_body),
+                               hashlib.blake2b(self._raw_body, digest_size=20).hexdigest(), self._truncated)
 
     @property
     def encoding(self) -> str:
@@ -70,13 +169,15 @@ class UnifiedResponse:
         return self._status_code
 
     @property
-    def headers(self) -> dict:
+    def headers(self) -> httpx.Headers:
         """
-        Returns the headers of the response.
+        Returns the headers of the response, built on first access.
 
         Returns:
-            dict: The headers of the response.
+            httpx.Headers: The case-insensitive headers of the response.
         """
+        if self._headers is None:
+            self._headers = httpx.Headers(self._raw_headers)
         return self._headers
 
     @property
@@ -93,6 +194,27 @@ class UnifiedResponse:
         """
         return self._response_time
 
+    @property
+    def timings(self) -> Optional[RequestTimings]:
+        """
+        Returns the phase breakdown of the request (connection pool wait, connect, TLS, request write,
+        server wait, download and time to first byte).
+
+        Returns:
+            RequestTimings: The timings of the request, or None if they were not measured.
+        """
+        return self._timings
+
+    @property
+    def truncated(self) -> bool:
+        """
+        Returns whether the body was cut at the `max_response_bytes` of the request.
+
+        Returns:
+            bool: True if the body is only the first `max_response_bytes` of the response body.
+        """
+        return self._truncated
+
     @property
     def content(self) -> Any:
         """
@@ -107,19 +229,36 @@ class UnifiedResponse:
 
     @property
     def json(self) -> Any:
-        return self.body  # Already parsed as JSON or None if invalid
+        """
+        Returns the decoded JSON document of the body.
+
+        Raises:
+            JSONDecodeError: If the body is declared as JSON but is not valid JSON.
+        """
+        return self.body
 
     @property
     def text(self) -> str:
         """
-        Returns the text of the response.
+        Returns the body decoded with the declared encoding (UTF-8 by default), decoded once and cached. For a JSON
+        body, this is the JSON document as sent by the server.
 
         Returns:
             str: The text of the response.
         """
-        if self.body is not None:
-            return str(self.body)
-        return self._raw_body.decode('utf-8')
+        if self._text is None:
+            self._text = self._raw_body.decode(self._encoding or 'utf-8', errors='replace')
+        return self._text
+
+    @property
+    def raw_bytes(self) -> memoryview:
+        """
+        Returns a read-only view of the raw body, without copying it.
+
+        Returns:
+            memoryview: The bytes of the body.
+        """
+        return memoryview(self._raw_body)
 
     @property
     def errors(self):
@@ -133,16 +272,29 @@ class UnifiedResponse:
             return self.body.get('errors')
         return None
 
-    def _assert_json(self, json_path: str, assertion_func: Callable[[Any], None]) -> "UnifiedResponse":
-        if self.body is None:
-            raise ValueError("Response body is not valid JSON")
+    def retain_log(self) -> None:
+        """
+        Keeps the request in the logs if the retention policy of the GlobalLogger did not keep it.
+        """
+        if self._retain_log is not None:
+            retain_log, self._retain_log = self._retain_log, None
+            retain_log()
+
+    def _find_json(self, json_path: str) -> Any:
+        try:
+            body = self.body
+        except JSONDecodeError as e:
+            raise ValueError(f"Response body is not valid JSON: {e}") from e
 
         jsonpath_expr = parse(json_path)
-        matches = [match.value for match in jsonpath_expr.find(self.body)]
+        matches = [match.value for match in jsonpath_expr.find(body)]
         if not matches:
             raise ValueError(f"JSONPath {json_path} does not match any elements in the JSON response")
 
-        actual_value = matches[0]
+        return matches[0]
+
+    def _assert_json(self, json_path: str, assertion_func: Callable[[Any], None]) -> "UnifiedResponse":
+        actual_value = self._find_json(json_path)
         assertion_func(actual_value)  # Use the assertion function
 
         return self
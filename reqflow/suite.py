@@ -0,0 +1,235 @@
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from reqflow.client import Client
+from reqflow.dataset import check_response
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.utils.context import caller_context
+from reqflow.utils.logger import GlobalLogger
+
+_VARIABLE = re.compile(r"\$\{(\w+)\}")
+_REQUEST_FIELDS = ("method", "url", "params", "headers", "cookies", "json", "data")
+
+
+def substitute(value: Any, variables: Dict[str, Any]) -> Any:
+    """
+    Replaces `${name}` in the strings of a value (at any depth) with the variables, falling back to the environment.
+
+    A string that is exactly `${name}` takes the value of the variable as is, e.g. a number stays a number.
+
+    Raises:
+        InvalidArgumentError: If a variable is neither defined nor in the environment.
+    """
+    if isinstance(value, dict):
+        return {substitute(key, variables): substitute(item, variables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute(item, variables) for item in value]
+    if not isinstance(value, str) or "${" not in value:
+        return value
+
+    def lookup(name):
+        if name in variables:
+            return variables[name]
+        if name in os.environ:
+            return os.environ[name]
+        raise InvalidArgumentError(f"Undefined variable: ${{{name}}}")
+
+    whole = _VARIABLE.fullmatch(value)
+    if whole:
+        return lookup(whole.group(1))
+    return _VARIABLE.sub(lambda match: str(lookup(match.group(1))), value)
+
+
+def load_suite(file_path: str) -> Dict[str, Any]:
+    """
+    Loads a suite from a JSON or YAML file. YAML requires PyYAML (`pip install reqflow[yaml]`).
+
+    Examples:
+        >>> # smoke.yaml
+        >>> # name: smoke
+        >>> # base_url: ${BASE_URL}
+        >>> # variables: {user_id: 1}
+        >>> # concurrency: 4
+        >>> # retries: 1
+        >>> # tests:
+        >>> #   - name: fetch user
+        >>> #     request: {method: GET, url: "/users/${user_id}"}
+        >>> #     expect: {status: 200, max_time: 0.5, body: {id: "${user_id}", name: {matches_regex: "^A"}}}
+        >>> suite = load_suite("smoke.yaml")
+
+    Raises:
+        InvalidArgumentError: If the file cannot be parsed, PyYAML is missing, or it does not hold a suite.
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        if file_path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise InvalidArgumentError(f"{file_path}: YAML suites require PyYAML: pip install reqflow[yaml]")
+            try:
+                suite = yaml.safe_load(file)
+            except yaml.YAMLError as e:
+                raise InvalidArgumentError(f"{file_path}: invalid YAML: {e}") from e
+        else:
+            try:
+                suite = json.load(file)
+            except ValueError as e:
+                raise InvalidArgumentError(f"{file_path}: invalid JSON: {e}") from e
+    if not isinstance(suite, dict) or not isinstance(suite.get("tests"), list):
+        raise InvalidArgumentError(f"{file_path}: a suite must be a mapping with a `tests` list")
+    suite.setdefault("name", os.path.splitext(os.path.basename(file_path))[0])
+    return suite
+
+
+class CaseResult:
+    """
+    The outcome of one test of a suite.
+    """
+
+    def __init__(self, suite: str, name: str, passed: bool, failures: Optional[List[str]] = None,
+                 error: Optional[str] = None, attempts: int = 1, time: float = 0.0):
+        self.suite = suite
+        self.name = name
+        self.passed = passed
+        self.failures = list(failures or [])
+        self.error = error
+        self.attempts = attempts
+        self.time = time
+
+    @property
+    def message(self) -> str:
+        return self.error or "; ".join(self.failures)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"suite": self.suite, "name": self.name, "passed": self.passed, "failures": self.failures,
+                "error": self.error, "attempts": self.attempts, "time": self.time}
+
+
+class SuiteResult:
+    """
+    The outcome of a suite, see `run_suite`.
+    """
+
+    def __init__(self, name: str, file_path: Optional[str], cases: List[CaseResult], time: float = 0.0,
+                 logs: Optional[List[Dict[str, Any]]] = None):
+        self.name = name
+        self.file_path = file_path
+        self.cases = cases
+        self.time = time
+        self.logs = logs
+
+    @property
+    def passed(self) -> bool:
+        return all(case.passed for case in self.cases)
+
+    @property
+    def failed(self) -> List[CaseResult]:
+        return [case for case in self.cases if not case.passed]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "file_path": self.file_path, "time": self.time,
+                "cases": [case.to_dict() for case in self.cases]}
+
+
+def _run_test(client: Client, suite: Dict[str, Any], test: Dict[str, Any], variables: Dict[str, Any]) -> CaseResult:
+    name = test.get("name") or f"{test.get('request', {}).get('method', 'GET')} {test.get('request', {}).get('url')}"
+    retries = int(test.get("retries", suite.get("retries", 0)))
+    retry_delay = float(test.get("retry_delay", suite.get("retry_delay", 0.5)))
+    start = time.perf_counter()
+
+    try:
+        variables = {**variables, **(test.get("variables") or {})}
+        request = substitute(test.get("request") or {}, variables)
+        expect = substitute(test.get("expect") or {}, variables)
+        kwargs = {field: request[field] for field in _REQUEST_FIELDS if field in request}
+        kwargs["method"] = str(kwargs.get("method", "GET")).upper()
+        kwargs["url"] = kwargs.get("url", "")
+        kwargs["headers"] = {**(suite.get("headers") or {}), **(kwargs.get("headers") or {})} or None
+        kwargs["timeout"] = float(test.get("timeout", suite.get("timeout", 5.0)))
+        kwargs["redirect"] = bool(test.get("follow_redirects", suite.get("follow_redirects", False)))
+    except InvalidArgumentError as e:
+        return CaseResult(suite["name"], name, False, error=str(e))
+
+    attempt, failures, error = 0, [], None
+    with caller_context(name, f"{suite['name']}::{name}"):
+        while True:
+            attempt += 1
+            try:
+                response = client.send(**kwargs)
+                failures, error = check_response(response, expect), None
+            except httpx.HTTPError as e:
+                failures, error = [], f"{type(e).__name__}: {e}"
+            except Exception as e:
+                # A malformed test (invalid URL, bad JSONPath in `expect`...) is an error of the test, not retried
+                failures, error = [], f"{type(e).__name__}: {e}"
+                break
+            if (not failures and error is None) or attempt > retries:
+                break
+            time.sleep(retry_delay)
+
+    return CaseResult(suite["name"], name, not failures and error is None, failures, error, attempt,
+                      time.perf_counter() - start)
+
+
+def run_suite(suite: Any, variables: Optional[Dict[str, Any]] = None, base_url: Optional[str] = None,
+              concurrency: Optional[int] = None, retries: Optional[int] = None, logging: bool = False,
+              return_logs: bool = False) -> SuiteResult:
+    """
+    Runs the tests of a declarative suite without pytest.
+
+    Each test has a `request` (`method`, `url`, `params`, `headers`, `cookies`, `json`, `data`) and an `expect`
+    spec (see `reqflow.dataset.check_response`). Strings can reference `${variables}` of the suite, of the test
+    or of the environment. Up to `concurrency` tests run at the same time on a shared client, and failed tests are
+    retried `retries` times.
+
+    Args:
+        suite (Union[str, Dict[str, Any]]): The path of a JSON/YAML suite file, or the loaded suite.
+        variables (Dict[str, Any]): Variables overriding those of the suite.
+        base_url (str): Overrides the base URL of the suite.
+        concurrency (int): Overrides the number of tests running at the same time.
+        retries (int): Overrides the number of retries of the failed tests.
+        logging (bool): Logs the requests in the `GlobalLogger`, e.g. for the HTML and JSON reports.
+        return_logs (bool): Returns the log entries in `SuiteResult.logs`, e.g. when running in another process.
+
+    Examples:
+        >>> from reqflow.suite import run_suite
+        >>> result = run_suite("smoke.yaml", variables={"BASE_URL": "https://staging.example.com"}, concurrency=8)
+        >>> assert result.passed, [case.message for case in result.failed]
+
+    Returns:
+        SuiteResult: The result of every test.
+    """
+    file_path = suite if isinstance(suite, str) else None
+    if file_path is not None:
+        suite = load_suite(file_path)
+    suite = dict(suite)
+    suite.setdefault("name", "suite")
+    if retries is not None:
+        suite["retries"] = retries
+    variables = {**(suite.get("variables") or {}), **(variables or {})}
+    base_url = base_url or substitute(suite.get("base_url", ""), variables)
+    concurrency = concurrency or int(suite.get("concurrency", 1))
+
+    client = Client(base_url=base_url, logging=logging or return_logs)
+    start = time.perf_counter()
+    try:
+        tests = suite["tests"]
+        if concurrency > 1 and len(tests) > 1:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="reqflow-suite") as executor:
+                cases = list(executor.map(lambda test: _run_test(client, suite, test, variables), tests))
+        else:
+            cases = [_run_test(client, suite, test, variables) for test in tests]
+    finally:
+        client.close()
+
+    logs = None
+    if return_logs:
+        logs = list(GlobalLogger.get_logs())
+        GlobalLogger.clear_logs()
+    return SuiteResult(suite["name"], file_path, cases, time.perf_counter() - start, logs)
@@ -0,0 +1,256 @@
+import json as jsonlib
+import re
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from reqflow.benchmark import BenchmarkResult, run_benchmark
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.response.response import UnifiedResponse
+
+if TYPE_CHECKING:
+    from reqflow.client import Client
+    from reqflow.fluent_api import Then, When
+
+_PLACEHOLDER = re.compile(r"^\{(\w+)\}$")
+_URL_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_MARKER = "\x00reqflow:{}\x00"
+_ENCODED_MARKER = re.compile(r'"\\u0000reqflow:(\w+)\\u0000"')
+
+
+def _placeholder(value: Any) -> Optional[str]:
+    """
+    Returns the name of a value that is exactly a placeholder like "{name}", otherwise None.
+    """
+    if isinstance(value, str):
+        match = _PLACEHOLDER.match(value)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _placeholders(mapping: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Returns the (key, placeholder) pairs of the values of a mapping that are placeholders.
+    """
+    return tuple((key, name) for key, name in ((key, _placeholder(value)) for key, value in mapping.items()) if name)
+
+
+def _compile_url(url: str) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+    """
+    Splits a URL with `{name}` placeholders into (literal, placeholder) parts, or returns None if it has none.
+    """
+    parts, position = [], 0
+    for match in _URL_PLACEHOLDER.finditer(url):
+        parts.append((url[position:match.start()], match.group(1)))
+        position = match.end()
+    if not parts:
+        return None
+    parts.append((url[position:], None))
+    return tuple(parts)
+
+
+def _compile_json(value: Any) -> Tuple[Tuple[bytes, Optional[str]], ...]:
+    """
+    Encodes a JSON body once, leaving holes for the values that are placeholders.
+    """
+    def mark(item):
+        if isinstance(item, dict):
+            return {key: mark(child) for key, child in item.items()}
+        if isinstance(item, list):
+            return [mark(child) for child in item]
+        name = _placeholder(item)
+        return _MARKER.format(name) if name else item
+
+    encoded = jsonlib.dumps(mark(value), ensure_ascii=False, separators=(",", ":"))
+    parts, position = [], 0
+    for match in _ENCODED_MARKER.finditer(encoded):
+        parts.append((encoded[position:match.start()].encode("utf-8"), match.group(1)))
+        position = match.end()
+    parts.append((encoded[position:].encode("utf-8"), None))
+    return tuple(parts)
+
+
+class RequestTemplate:
+    """
+    An immutable, precompiled request that can be sent many times with different placeholder values.
+
+    Values that are exactly `{name}` in the query parameters, headers and JSON body, and `{name}` anywhere in the
+    URL, are placeholders filled in when the template is rendered. Everything else is prepared once: the
+    headers (including authentication) are merged and the static parts of the JSON body are pre-encoded.
+
+    Examples:
+        >>> from reqflow import given, Client
+        >>> client = Client(base_url="https://httpbin.org")
+        >>> template = given(client).header("X-Trace", "{trace}").body({"id": "{id}", "kind": "static"}) \\
+        >>>     .when("POST", "/anything/{id}").with_oauth2("TOKEN").template()
+        >>> for index in range(1000):
+        >>>     template.then(id=index, trace=f"t-{index}").status_code(200)
+        >>> template.benchmark(iterations=200, values={"id": 1, "trace": "bench"}).assert_p99_below(0.5)
+    """
+
+    __slots__ = ("client", "method", "url", "timeout", "follow_redirects", "force_json", "placeholders",
+                 "_url_parts", "_params", "_param_placeholders", "_headers", "_header_placeholders",
+                 "_cookies", "_json_parts", "_data", "_files")
+
+    def __init__(self, client: 'Client', method: str, url: str = "", params: Optional[Dict[str, Any]] = None,
+                 headers: Optional[Dict[str, Any]] = None, cookies: Optional[Dict[str, Any]] = None,
+                 json: Any = None, data: Any = None, files: Optional[Dict[str, Any]] = None, timeout: float = 5.0,
+                 follow_redirects: bool = False, force_json: bool = False):
+        """
+        Args:
+            client (Client): The client used to send the requests.
+            method (str): The HTTP method.
+            url (str): The URL, relative to the base URL of the client, with optional `{name}` placeholders.
+            params (Dict[str, Any]): The query parameters, values can be placeholders.
+            headers (Dict[str, Any]): The headers, values can be placeholders.
+            cookies (Dict[str, Any]): The cookies.
+            json (Any): The JSON body, values at any depth can be placeholders.
+            data (Any): The form data, sent as is.
+            files (Dict[str, Any]): The files to upload, sent as is.
+            timeout (float): The timeout of each request in seconds.
+            follow_redirects (bool): Whether redirects are followed.
+            force_json (bool): Forces JSON decoding of the responses.
+        """
+        if json is not None and (data or files):
+            raise InvalidArgumentError("A template cannot have both a JSON body and form data or files.")
+
+        headers = dict(headers or {})
+        params = dict(params or {})
+        json_parts = None
+        if json is not None:
+            json_parts = _compile_json(json)
+            if not any(name.lower() == "content-type" for name in headers):
+                headers["Content-Type"] = "application/json"
+
+        set_ = object.__setattr__
+        set_(self, "client", client)
+        set_(self, "method", method.upper())
+        set_(self, "url", url)
+        set_(self, "timeout", timeout)
+        set_(self, "follow_redirects", follow_redirects)
+        set_(self, "force_json", force_json)
+        set_(self, "_url_parts", _compile_url(url))
+        set_(self, "_params", params)
+        set_(self, "_param_placeholders", _placeholders(params))
+        set_(self, "_headers", headers)
+        set_(self, "_header_placeholders", _placeholders(headers))
+        set_(self, "_cookies", dict(cookies) if cookies else None)
+        set_(self, "_json_parts", json_parts)
+        set_(self, "_data", data)
+        set_(self, "_files", files or None)
+
+        names = {name for _, name in self._url_parts or () if name}
+        names.update(name for _, name in self._param_placeholders)
+        names.update(name for _, name in self._header_placeholders)
+        names.update(name for _, name in json_parts or () if name)
+        set_(self, "placeholders", frozenset(names))
+
+    @classmethod
+    def from_when(cls, when: 'When', timeout: float = 5.0, follow_redirects: bool = False,
+                  force_json: bool = False) -> 'RequestTemplate':
+        """
+        Builds a template from a `When` stage, see `When.template`.
+        """
+        return cls(when.client, when.method, when.url, params=when.params, headers=when.headers,
+                   cookies=when.cookies, json=when.json, data=when.data, files=when.files, timeout=timeout,
+                   follow_redirects=follow_redirects, force_json=force_json)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RequestTemplate is immutable")
+
+    def __repr__(self):
+        return f"RequestTemplate({self.method} {self.url}, placeholders={sorted(self.placeholders)})"
+
+    def _check(self, values: Dict[str, Any]) -> None:
+        missing = self.placeholders.difference(values)
+        if missing:
+            raise InvalidArgumentError(f"Missing values for the placeholders: {sorted(missing)}")
+
+    def render(self, **values: Any) -> Dict[str, Any]:
+        """
+        Fills in the placeholders.
+
+        Args:
+            **values: The value of every placeholder.
+
+        Raises:
+            InvalidArgumentError: If a placeholder has no value.
+
+        Returns:
+            Dict[str, Any]: The keyword arguments of `Client.send`.
+        """
+        if self.placeholders:
+            self._check(values)
+        url = self.url
+        if self._url_parts is not None:
+            url = "".join(literal + (str(values[name]) if name else "") for literal, name in self._url_parts)
+
+        # Copies, so that changing a rendered request does not change the template
+        params = dict(self._params)
+        for key, name in self._param_placeholders:
+            params[key] = values[name]
+
+        headers = dict(self._headers)
+        for key, name in self._header_placeholders:
+            headers[key] = str(values[name])
+
+        content = None
+        if self._json_parts is not None:
+            if len(self._json_parts) == 1:
+                content = self._json_parts[0][0]
+            else:
+                content = b"".join(
+                    literal + (jsonlib.dumps(values[name], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                               if name else b"")
+                    for literal, name in self._json_parts)
+
+        return {"method": self.method, "url": url, "params": params or None, "headers": headers or None,
+                "cookies": dict(self._cookies) if self._cookies else None, "data": self._data, "files": self._files, "content": content,
+                "redirect": self.follow_redirects, "timeout": self.timeout, "force_json": self.force_json}
+
+    def send(self, **values: Any) -> UnifiedResponse:
+        """
+        Renders the template and sends the request.
+
+        Returns:
+            UnifiedResponse: The response.
+        """
+        return self.client.send(**self.render(**values))
+
+    async def send_async(self, **values: Any) -> UnifiedResponse:
+        """
+        Async version of `send`.
+        """
+        return await self.client.send_async(**self.render(**values))
+
+    def then(self, **values: Any) -> 'Then':
+        """
+        Renders the template, sends the request and returns the Then stage for assertions.
+        """
+        from reqflow.fluent_api import Then
+        return Then(self.send(**values), self.client)
+
+    async def then_async(self, **values: Any) -> 'Then':
+        """
+        Async version of `then`.
+        """
+        from reqflow.fluent_api import Then
+        return Then(await self.send_async(**values), self.client)
+
+    def benchmark(self, iterations: int = 100, warmup: int = 5, concurrency: int = 1,
+                  values: Optional[Dict[str, Any]] = None) -> BenchmarkResult:
+        """
+        Sends the rendered request repeatedly and collects latency statistics, see `When.benchmark`.
+
+        Args:
+            iterations (int): The number of measured requests.
+            warmup (int): The number of requests sent before measuring.
+            concurrency (int): The number of requests in flight at the same time.
+            values (Dict[str, Any]): The values of the placeholders.
+
+        Returns:
+            BenchmarkResult: The statistics of the measured requests.
+        """
+        request = self.render(**(values or {}))
+        send = self.client.send
+        return run_benchmark(lambda: send(**request), self.method, f"{self.client.base_url}{request['url']}",
+                             iterations=iterations, warmup=warmup, concurrency=concurrency)
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+_REQUEST_BODY_FIELDS = ("json", "data")
+
+
+class BodyRef:
+    """
+    A reference to a body kept in a `BodyStore`.
+
+    Attributes:
+        digest (str): The hex digest of the full body.
+        length (int): The length of the full body in bytes.
+        kind (str): "bytes", "text" or "json", the type the body is resolved to.
+        truncated (bool): True if only the first `max_body_bytes` of the body were stored.
+    """
+
+    def __init__(self, store: 'BodyStore', digest: str, length: int, kind: str, truncated: bool):
+        self.store = store
+        self.digest = digest
+        self.length = length
+        self.kind = kind
+        self.truncated = truncated
+
+    def read(self) -> bytes:
+        """
+        Returns the stored bytes of the body.
+
+        Returns:
+            bytes: The body, or its first `max_body_bytes` if it was truncated.
+        """
+        return self.store.get(self.digest)
+
+    def resolve(self) -> Any:
+        """
+        Returns the body as the type it was logged with.
+
+        Truncated text and JSON bodies are returned as bytes since they can't be decoded reliably.
+
+        Returns:
+            Any: The body.
+        """
+        content = self.read()
+        if self.truncated or self.kind == "bytes":
+            return content
+        if self.kind == "text":
+            return content.decode("utf-8")
+        return json.loads(content)
+
+    def __eq__(self, other):
+        return isinstance(other, BodyRef) and (self.digest, self.kind) == (other.digest, other.kind)
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        truncated = ", truncated" if self.truncated else ""
+        return f"BodyRef({self.digest[:12]}, {self.length} bytes, {self.kind}{truncated})"
+
+
+class BodyStore:
+    """
+    A content-addressed store keeping each distinct body once.
+
+    Bodies are kept in memory, or in `directory` as one file per digest if a directory is given.
+
+    Examples:
+        >>> from reqflow.utils.bodies import BodyStore
+        >>>
+        >>> store = BodyStore(max_body_bytes=1024 * 1024)
+        >>> ref = store.put(b"error page")
+        >>> store.put(b"error page") == ref
+        >>> True
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_body_bytes: Optional[int] = None):
+        """
+        Args:
+            directory (str): Optional directory to keep the bodies in instead of memory.
+            max_body_bytes (int): Bodies longer than this are truncated, keeping the digest and length of the full body.
+        """
+        self.directory = directory
+        self.max_body_bytes = max_body_bytes
+        self.references = 0
+        self.referenced_bytes = 0
+        self._bodies: Dict[str, bytes] = {}
+        self._lengths: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def put(self, body: Any) -> BodyRef:
+        """
+        Stores a body unless an identical one is already stored.
+
+        Args:
+            body: bytes, str or a JSON serializable value.
+
+        Returns:
+            BodyRef: The reference to the stored body.
+        """
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            kind, content = "bytes", bytes(body)
+        elif isinstance(body, str):
+            kind, content = "text", body.encode("utf-8")
+        else:
+            kind, content = "json", json.dumps(body, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+        digest = hashlib.blake2b(content, digest_size=20).hexdigest()
+        truncated = self.max_body_bytes is not None and len(content) > self.max_body_bytes
+        with self._lock:
+            self.references += 1
+            self.referenced_bytes += len(content)
+            if digest not in self._lengths:
+                self._lengths[digest] = len(content)
+                self._save(digest, content[:self.max_body_bytes] if truncated else content)
+        return BodyRef(self, digest, len(content), kind, truncated)
+
+    def get(self, digest: str) -> bytes:
+        """
+        Returns the stored bytes for a digest.
+
+        Raises:
+            KeyError: If no body with this digest is stored.
+        """
+        if self.directory is None:
+            return self._bodies[digest]
+        try:
+            with open(self._path(digest), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            raise KeyError(digest)
+
+    def dedupe_entry(self, log: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns a copy of a log entry with the request JSON/data and the response content replaced by references.
+
+        Args:
+            log: The log entry.
+
+        Returns:
+            Dict[str, Any]: The log entry referencing the stored bodies.
+        """
+        log = dict(log)
+        if log.get("request"):
+            request = log["request"] = dict(log["request"])
+            for field in _REQUEST_BODY_FIELDS:
+                if request.get(field) is not None:
+                    request[field] = self.put(request[field])
+        if log.get("response") and log["response"].get("content") is not None:
+            response = log["response"] = dict(log["response"])
+            response["content"] = self.put(response["content"])
+        return log
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns how much the deduplication saved.
+
+        Returns:
+            Dict[str, int]: The number of references and distinct bodies, and the referenced and stored bytes.
+        """
+        with self._lock:
+            return {
+                "references": self.references,
+                "bodies": len(self._lengths),
+                "referenced_bytes": self.referenced_bytes,
+                "stored_bytes": sum(min(length, self.max_body_bytes or length) for length in self._lengths.values()),
+            }
+
+    def clear(self) -> None:
+        """
+        Removes all the stored bodies.
+        """
+        with self._lock:
+            if self.directory is not None:
+                for digest in self._lengths:
+                    try:
+                        os.remove(self._path(digest))
+                    except FileNotFoundError:
+                        pass
+            self._bodies.clear()
+            self._lengths.clear()
+            self.references = 0
+            self.referenced_bytes = 0
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest)
+
+    def _save(self, digest: str, content: bytes) -> None:
+        if self.directory is None:
+            self._bodies[digest] = content
+            return
+        path = self._path(digest)
+        if not os.path.exists(path):
+            temporary_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "wb") as file:
+                file.write(content)
+            os.replace(temporary_path, path)
+
+
+def resolve_body(body: Any) -> Any:
+    """
+    Returns the body a `BodyRef` points to, other values are returned unchanged.
+    """
+    return body.resolve() if isinstance(body, BodyRef) else body
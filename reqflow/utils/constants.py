@@ -82,7 +82,7 @@ class HTTPStatusCodes(Enum):
     NETWORK_AUTHENTICATION_REQUIRED = 511
 
 
-HTML_TEMPLATE = """
+HTML_REPORT_HEAD = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -102,16 +102,159 @@ HTML_TEMPLATE = """
         table {{ width: 100%; border-collapse: collapse; }}
         th, td {{ padding: 8px 12px; border: 1px solid #ccc; text-align: left; }}
         th {{ background-color: #f2f2f2; }}
+        td pre {{ margin: 0; white-space: pre-wrap; word-break: break-all; max-height: 400px; overflow: auto; }}
+        .summary {{ margin-bottom: 30px; }}
+        .controls {{ margin: 20px 0; display: flex; gap: 10px; align-items: center; }}
+        .controls input {{ flex: 1; padding: 6px; }}
     </style>
+    <script>const REQFLOW_ENTRIES = [];</script>
 </head>
 <body>
+"""
+
+HTML_REPORT_BODY = """
     <h1>{report_name} - {date}</h1>
-    {log_entries}
+    <div class="summary">
+        <h2>Endpoints</h2>
+        <table>
+            <tr><th>Method</th><th>Endpoint</th><th>Requests</th><th>Errors</th><th>Mean (s)</th><th>p95 (s)</th><th>Max (s)</th></tr>
+            {summary_rows}
+        </table>
+    </div>
+    {comparison}
+    <h2>Requests ({total})</h2>
+    <div class="controls">
+        <input id="filter" type="search" placeholder="Filter by function, method, URL or status">
+        <button id="prev">&laquo; Prev</button>
+        <span id="page-info"></span>
+        <button id="next">Next &raquo;</button>
+    </div>
+    <div id="logs"></div>
+    <script>const REQFLOW_CONFIG = {config};</script>
+"""
+
+HTML_REPORT_COMPARISON = """
+    <div class="summary">
+        <h2>Baseline comparison (threshold {threshold}, alpha {alpha})</h2>
+        <table>
+            <tr><th>Endpoint</th><th>Status</th><th>Requests (baseline / current)</th><th>p50</th><th>p95</th><th>p99</th><th>Throughput</th><th>p-value</th></tr>
+            {rows}
+        </table>
+    </div>
+"""
+
+HTML_REPORT_SCRIPT = """
     <script>
-        function toggleLog(header) {{
+        const bodyChunks = {};
+        const pendingChunks = {};
+        let filtered = REQFLOW_ENTRIES;
+        let page = 0;
+
+        function reqflowLoadBodies(chunk, bodies) {
+            bodyChunks[chunk] = bodies;
+            (pendingChunks[chunk] || []).forEach(callback => callback(bodies));
+            delete pendingChunks[chunk];
+        }
+
+        function loadBodies(chunk, callback) {
+            if (bodyChunks[chunk]) { callback(bodyChunks[chunk]); return; }
+            if (!pendingChunks[chunk]) {
+                pendingChunks[chunk] = [];
+                const script = document.createElement('script');
+                script.src = encodeURIComponent(REQFLOW_CONFIG.dataDir) + '/bodies_' + chunk + '.js';
+                document.head.appendChild(script);
+            }
+            pendingChunks[chunk].push(callback);
+        }
+
+        function cell(value) {
+            const td = document.createElement('td');
+            const pre = document.createElement('pre');
+            pre.textContent = typeof value === 'string' ? value : JSON.stringify(value, null, 2);
+            td.appendChild(pre);
+            return td;
+        }
+
+        function table(rows) {
+            const element = document.createElement('table');
+            rows.forEach(([name, value]) => {
+                const tr = document.createElement('tr');
+                const th = document.createElement('th');
+                th.textContent = name;
+                tr.appendChild(th);
+                tr.appendChild(cell(value));
+                element.appendChild(tr);
+            });
+            return element;
+        }
+
+        function renderBody(container, index) {
+            const chunk = Math.floor(index / REQFLOW_CONFIG.chunkSize);
+            loadBodies(chunk, bodies => {
+                const entry = bodies[index % REQFLOW_CONFIG.chunkSize];
+                const request = entry.request || {};
+                const response = entry.response || {};
+                container.textContent = '';
+                const requestTitle = document.createElement('h3');
+                requestTitle.textContent = 'Request';
+                container.appendChild(requestTitle);
+                container.appendChild(table(Object.entries(request)));
+                const responseTitle = document.createElement('h3');
+                responseTitle.textContent = 'Response';
+                container.appendChild(responseTitle);
+                container.appendChild(table(Object.entries(response)));
+            });
+        }
+
+        function toggleLog(header) {
             const body = header.nextElementSibling;
+            if (!body.dataset.loaded) {
+                body.dataset.loaded = 'true';
+                body.textContent = 'Loading...';
+                renderBody(body, Number(header.dataset.index));
+            }
             body.style.display = body.style.display === 'block' ? 'none' : 'block';
-        }}
+        }
+
+        function render() {
+            const pages = Math.max(1, Math.ceil(filtered.length / REQFLOW_CONFIG.pageSize));
+            page = Math.min(page, pages - 1);
+            const container = document.getElementById('logs');
+            container.textContent = '';
+            filtered.slice(page * REQFLOW_CONFIG.pageSize, (page + 1) * REQFLOW_CONFIG.pageSize).forEach(entry => {
+                const [index, fn, method, url, status, time] = entry;
+                const log = document.createElement('div');
+                log.className = 'log';
+                const header = document.createElement('div');
+                header.className = 'log-header';
+                header.dataset.index = index;
+                header.onclick = () => toggleLog(header);
+                header.appendChild(document.createTextNode(fn + ' - ' + method + ' ' + url + ' - Status: '));
+                const statusElement = document.createElement('span');
+                statusElement.className = status !== null && status < 300 ? 'status-success' : 'status-failure';
+                statusElement.innerHTML = '<b></b>';
+                statusElement.firstChild.textContent = status;
+                header.appendChild(statusElement);
+                header.appendChild(document.createTextNode(' - ' + time + ' s'));
+                const body = document.createElement('div');
+                body.className = 'log-body';
+                log.appendChild(header);
+                log.appendChild(body);
+                container.appendChild(log);
+            });
+            document.getElementById('page-info').textContent = 'Page ' + (page + 1) + ' of ' + pages;
+        }
+
+        document.getElementById('prev').onclick = () => { page = Math.max(0, page - 1); render(); };
+        document.getElementById('next').onclick = () => { page += 1; render(); };
+        document.getElementById('filter').oninput = event => {
+            const query = event.target.value.toLowerCase();
+            filtered = query ? REQFLOW_ENTRIES.filter(entry => entry.slice(1).join(' ').toLowerCase().includes(query))
+                             : REQFLOW_ENTRIES;
+            page = 0;
+            render();
+        };
+        render();
     </script>
 </body>
 </html>
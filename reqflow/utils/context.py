@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Tuple
+
+_caller_context: ContextVar[Optional[Tuple[str, Optional[str]]]] = ContextVar("reqflow_caller_context", default=None)
+
+
+def get_caller_context() -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Returns the attribution currently in scope for logged requests.
+
+    Returns:
+        A `(name, test_id)` tuple or None if no attribution scope is active.
+    """
+    return _caller_context.get()
+
+
+@contextmanager
+def caller_context(name: str, test_id: Optional[str] = None) -> Iterator[None]:
+    """
+    Attributes every request logged inside the block to `name`.
+
+    Args:
+        name (str): The name stored in the `function` field of the log entries.
+        test_id (str): Optional test node id. Inherited from the enclosing scope if not provided.
+
+    Examples:
+        >>> from reqflow.utils.context import caller_context
+        >>>
+        >>> with caller_context("create_user"):
+        >>>     given(client).when("POST", "/users").then().status_code(201)
+    """
+    if test_id is None:
+        outer = _caller_context.get()
+        test_id = outer[1] if outer else None
+
+    token = _caller_context.set((name, test_id))
+    try:
+        yield
+    finally:
+        _caller_context.reset(token)
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Awaitable, Dict, List, Optional
+
+import httpx
+
+from reqflow.exceptions import DeadlineExceededError
+
+_deadline: ContextVar[Optional['Deadline']] = ContextVar("reqflow_deadline", default=None)
+
+
+def current_deadline() -> Optional['Deadline']:
+    """
+    Returns the innermost deadline in scope, or None.
+    """
+    return _deadline.get()
+
+
+class Deadline:
+    """
+    A time budget shared by all the requests sent inside a `with` (or `async with`) block, see `Client.deadline`.
+
+    The timeout of every request is trimmed to the remaining budget and async requests still in flight when the
+    budget runs out are cancelled. Once it is exhausted, requests raise a `DeadlineExceededError` with a report of
+    the requests sent within the budget and their durations. An inner deadline never extends an outer one. The
+    deadline follows the context into the asyncio tasks created inside the block, e.g. the steps of a `Flow`.
+    """
+
+    def __init__(self, seconds: float, name: Optional[str] = None):
+        """
+        Args:
+            seconds (float): The budget in seconds.
+            name (str): Optional name shown in the report.
+        """
+        self.seconds = seconds
+        self.name = name
+        self.start: Optional[float] = None
+        self.expires_at: Optional[float] = None
+        self.requests: List[Dict[str, Any]] = []
+        self._parent: Optional[Deadline] = None
+        self._token: Optional[Token] = None
+
+    def __enter__(self) -> 'Deadline':
+        self.start = time.perf_counter()
+        self.expires_at = self.start + self.seconds
+        self._parent = _deadline.get()
+        if self._parent is not None:
+            self.expires_at = min(self.expires_at, self._parent.expires_at)
+        self._token = _deadline.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _deadline.reset(self._token)
+
+    async def __aenter__(self) -> 'Deadline':
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start if self.start is not None else 0.0
+
+    def remaining(self) -> float:
+        """
+        Returns the remaining budget in seconds, 0 once it is exhausted.
+        """
+        if self.expires_at is None:
+            return self.seconds
+        return max(0.0, self.expires_at - time.perf_counter())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.perf_counter() >= self.expires_at
+
+    def timeout_for(self, method: str, url: str, timeout: Optional[float]) -> float:
+        """
+        Returns the timeout of a request trimmed to the remaining budget.
+
+        Raises:
+            DeadlineExceededError: If the budget is exhausted.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise self.exceeded(method, url)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    async def wait_for(self, awaitable: Awaitable[Any]) -> Any:
+        """
+        Awaits a request, cancelling it when the budget runs out with an `httpx.TimeoutException`.
+        """
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError:
+            raise httpx.TimeoutException("The request was cancelled at the deadline") from None
+
+    def record(self, method: str, url: str, status_code: Optional[int], duration: float,
+               error: Optional[BaseException] = None) -> None:
+        """
+        Records a request sent within the budget, and within the budgets of the enclosing deadlines.
+        """
+        deadline = self
+        while deadline is not None:
+            deadline.requests.append({"method": method, "url": url, "status_code": status_code,
+                                      "start": time.perf_counter() - duration - deadline.start,
+                                      "duration": duration, "error": None if error is None else repr(error)})
+            deadline = deadline._parent
+
+    def report(self) -> str:
+        """
+        Returns where the budget went: every request with its start, duration and outcome, and the time spent
+        outside of requests.
+        """
+        name = f" ({self.name})" if self.name else ""
+        spent = sum(request["duration"] for request in self.requests)
+        lines = [f"Deadline of {self.seconds:.3f}s{name}: {self.elapsed:.3f}s elapsed, {len(self.requests)} "
+                 f"requests took {spent:.3f}s, {max(0.0, self.elapsed - spent):.3f}s outside of requests"]
+        for request in self.requests:
+            outcome = request["error"] or request["status_code"]
+            lines.append(f"  +{request['start']:.3f}s  {request['duration']:.3f}s  {request['method']} "
+                         f"{request['url']}  {outcome}")
+        return "\n".join(lines)
+
+    def exceeded(self, method: str, url: str) -> DeadlineExceededError:
+        """
+        Returns the error raised when a request runs out of budget.
+        """
+        return DeadlineExceededError(f"{method.upper()} {url} exceeded the deadline\n{self.report()}", self)
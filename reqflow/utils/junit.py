@@ -0,0 +1,52 @@
+import socket
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from reqflow.suite import SuiteResult
+
+
+def write_junit_xml(results: Iterable['SuiteResult'], file_path: str) -> None:
+    """
+    Writes suite results as a JUnit XML report, one `<testsuite>` per suite, as read by CI servers.
+
+    Tests that got a response not matching their expectations are reported as failures, tests that could not get
+    a response (e.g. a connection error) as errors.
+
+    Args:
+        results (Iterable[SuiteResult]): The suite results.
+        file_path (str): The path of the XML report.
+    """
+    root = ET.Element("testsuites")
+    totals = {"tests": 0, "failures": 0, "errors": 0, "time": 0.0}
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    hostname = socket.gethostname()
+
+    for result in results:
+        failures = sum(1 for case in result.cases if not case.passed and case.error is None)
+        errors = sum(1 for case in result.cases if case.error is not None)
+        element = ET.SubElement(root, "testsuite", name=result.name, tests=str(len(result.cases)),
+                                failures=str(failures), errors=str(errors), skipped="0",
+                                time=f"{result.time:.3f}", timestamp=timestamp, hostname=hostname)
+        for case in result.cases:
+            testcase = ET.SubElement(element, "testcase", classname=result.name, name=case.name,
+                                     time=f"{case.time:.3f}")
+            if case.error is not None:
+                ET.SubElement(testcase, "error", message=case.error, type="error").text = case.error
+            elif not case.passed:
+                ET.SubElement(testcase, "failure", message=case.failures[0] if case.failures else "",
+                              type="AssertionError").text = "\n".join(case.failures)
+            if case.attempts > 1:
+                ET.SubElement(testcase, "system-out").text = f"attempts: {case.attempts}"
+
+        totals["tests"] += len(result.cases)
+        totals["failures"] += failures
+        totals["errors"] += errors
+        totals["time"] += result.time
+
+    root.set("tests", str(totals["tests"]))
+    root.set("failures", str(totals["failures"]))
+    root.set("errors", str(totals["errors"]))
+    root.set("time", f"{totals['time']:.3f}")
+    ET.ElementTree(root).write(file_path, encoding="utf-8", xml_declaration=True)
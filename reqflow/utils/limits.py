@@ -0,0 +1,104 @@
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from reqflow.exceptions import ResponseTooLargeError
+
+SIZE_LIMIT_EXTENSION = "reqflow.size_limit"
+
+
+def _content_length(response: httpx.Response) -> Optional[int]:
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _read_response(response: httpx.Response, content: bytes,
+                   size_limit: Optional[Dict[str, Any]] = None) -> httpx.Response:
+    """
+    Returns a response with the status, headers, request and extensions of a streamed response and the given body.
+    """
+    extensions = dict(response.extensions)
+    if size_limit is not None:
+        extensions[SIZE_LIMIT_EXTENSION] = size_limit
+    # The body is already decoded, so it is set without the Content-Encoding header, then the headers are restored
+    headers = [(name, value) for name, value in response.headers.raw if name.lower() != b"content-encoding"]
+    read = httpx.Response(response.status_code, headers=headers, content=content, request=response.request,
+                          extensions=extensions, history=response.history)
+    read.headers = response.headers
+    return read
+
+
+def _exceeded(response: httpx.Response, chunks: List[bytes], limit: int, size: int,
+              truncate: bool) -> httpx.Response:
+    info = {"limit": limit, "size": size, "content_length": _content_length(response), "truncated": truncate}
+    if not truncate:
+        raise ResponseTooLargeError(
+            f"The response of {response.request.method} {response.request.url} exceeded {limit} bytes, the download "
+            f"was aborted after {size} bytes (Content-Length: {info['content_length']})",
+            str(response.request.url), response.status_code, limit, size)
+    return _read_response(response, b"".join(chunks)[:limit], info)
+
+
+def read_limited(response: httpx.Response, limit: int, truncate: bool = False) -> httpx.Response:
+    """
+    Reads the body of a streamed response unless it exceeds `limit` bytes (after decoding), then closes the
+    connection. The Content-Length header is checked before reading anything.
+
+    Args:
+        response (httpx.Response): A response sent with `stream=True`.
+        limit (int): The maximum body size in bytes.
+        truncate (bool): Keeps the first `limit` bytes instead of raising, the size info is stored in the
+            `reqflow.size_limit` extension of the response.
+
+    Returns:
+        httpx.Response: A response with the body read, the streamed response is left unread.
+
+    Raises:
+        ResponseTooLargeError: If the body exceeds the limit and `truncate` is False.
+    """
+    chunks, size = [], 0
+    try:
+        content_length = _content_length(response)
+        if content_length is not None and content_length > limit:
+            if truncate:
+                for chunk in response.iter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= limit:
+                        break
+            return _exceeded(response, chunks, limit, content_length, truncate)
+        for chunk in response.iter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                return _exceeded(response, chunks, limit, size, truncate)
+        return _read_response(response, b"".join(chunks))
+    finally:
+        response.close()
+
+
+async def aread_limited(response: httpx.Response, limit: int, truncate: bool = False) -> httpx.Response:
+    """
+    Async version of `read_limited`.
+    """
+    chunks, size = [], 0
+    try:
+        content_length = _content_length(response)
+        if content_length is not None and content_length > limit:
+            if truncate:
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= limit:
+                        break
+            return _exceeded(response, chunks, limit, content_length, truncate)
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                return _exceeded(response, chunks, limit, size, truncate)
+        return _read_response(response, b"".join(chunks))
+    finally:
+        await response.aclose()
@@ -1,45 +1,309 @@
-from reqflow.utils.constants import HTML_TEMPLATE
-from datetime import datetime
+from reqflow.utils.bodies import BodyStore
+from reqflow.utils.report import write_html_report
+from reqflow.utils.retention import RetentionPolicy
+from reqflow.utils.serialization import json_default
+from reqflow.utils.sinks import JsonlSink
+from reqflow.utils.store import SQLiteLogStore
+from reqflow.utils.url import url_template as to_url_template
+from typing import Iterator, List, Optional
 import json
 
+def _matches(log, function=None, test_id=None, method=None, url_template=None, status_code=None, min_status=None,
+             max_status=None, min_time=None, max_time=None) -> bool:
+    request, response = log.get('request') or {}, log.get('response') or {}
+    status, time = response.get('status_code'), response.get('time')
+    return ((function is None or log.get('function') == function)
+            and (test_id is None or log.get('test_id') == test_id)
+            and (method is None or (request.get('method') or '').upper() == method.upper())
+            and (url_template is None or to_url_template(request.get('url') or '') == url_template)
+            and (status_code is None or status == status_code)
+            and (min_status is None or (status is not None and status >= min_status))
+            and (max_status is None or (status is not None and status <= max_status))
+            and (min_time is None or (time is not None and time >= min_time))
+            and (max_time is None or (time is not None and time <= max_time)))
+
+
 class GlobalLogger:
     """
     A global logger to store all the requests made by the client.
     """
     logs = []
+    sinks = []
+    store = None
+    body_store = None
+    retention_policy = None
+    keep_in_memory = True
+    baseline_comparison = None
 
     @classmethod
     def log_request(cls, log):
         """
-        Add a log entry to the logs list.
+        Add a log entry to the logs list and to the attached sinks.
         Args:
             log: A dictionary containing the log entry.
         """
 
-        cls.logs.append(log)
+        if cls.body_store is not None:
+            log = cls.body_store.dedupe_entry(log)
+        if cls.keep_in_memory:
+            cls.logs.append(log)
+        for sink in cls.sinks:
+            sink.write(log)
+
+    @classmethod
+    def set_retention_policy(cls, policy: Optional[RetentionPolicy]):
+        """
+        Set the policy deciding which requests sent by clients with `logging=True` are kept.
+
+        Requests that are not kept only update the policy counters, unless a `Then` assertion fails on them.
+        The slowest requests retained per endpoint are added to the logs when the logs are read.
+        Args:
+            policy: (RetentionPolicy) The retention policy, or None to keep every request.
+
+        Examples:
+            >>> from reqflow.utils.logger import GlobalLogger
+            >>> from reqflow.utils.retention import RetentionPolicy
+            >>>
+            >>> GlobalLogger.set_retention_policy(RetentionPolicy(sample_rate=0.01, slowest_per_endpoint=10,
+            >>>                                                   max_per_endpoint=100))
+        """
+
+        cls.flush_retained()
+        cls.retention_policy = policy
+
+    @classmethod
+    def flush_retained(cls):
+        """
+        Add the slowest requests retained by the retention policy so far to the logs.
+
+        Examples:
+            >>> from reqflow.utils.logger import GlobalLogger
+            >>>
+            >>> GlobalLogger.flush_retained()
+        """
+
+        if cls.retention_policy is not None:
+            cls.retention_policy.flush(cls.log_request)
+
+    @classmethod
+    def enable_body_dedup(cls, directory: Optional[str] = None, max_body_bytes: Optional[int] = None) -> BodyStore:
+        """
+        Store each distinct request/response body once and keep references to it in the log entries.
+
+        The request `json`/`data` and the response `content` of the logged entries become `BodyRef` objects,
+        call `resolve()` on them to get the body back.
+        Args:
+            directory: (str) Optional directory to keep the bodies on disk instead of in memory.
+            max_body_bytes: (int) Bodies longer than this are truncated, keeping the digest and the full length.
+
+        Examples:
+            >>> from reqflow.utils.logger import GlobalLogger
+            >>>
+            >>> GlobalLogger.enable_body_dedup(max_body_bytes=1024 * 1024)
+            >>> GlobalLogger.get_logs()[0]['response']['content'].resolve()
+
+        Returns:
+            BodyStore: The store holding the bodies.
+        """
+
+        cls.body_store = BodyStore(directory=directory, max_body_bytes=max_body_bytes)
+        return cls.body_store
+
+    @classmethod
+    def disable_body_dedup(cls):
+        """
+        Stop deduplicating the bodies of the new log entries.
+
+        Examples:
+            >>> from reqflow.utils.logger import GlobalLogger
+            >>>
+            >>> GlobalLogger.disable_body_dedup()
+        """
+
+        cls.body_store = None
+
+    @classmethod
+    def add_jsonl_sink(cls, file_path: str, compression: Optional[str] = None, max_body_bytes: Optional[int] = None,
+                       keep_in_memory: Optional[bool] = None) -> JsonlSink:
+        """
+        Stream every log entry to a JSON Lines file as it is logged.
+        Args:
+            file_path: (str) The path of the JSON Lines file.
+            compression: (str) None, "gzip" or "zstd" (requires the `zstandard` package).
+            max_body_bytes: (int) Bodies longer than this are truncated in the file. Defaults to no limit.
+            keep_in_memory: (bool) Sets `GlobalLogger.keep_in_memory`, see `set_keep_in_memory`. Left unchanged
+                if None.
+
+        Examples:
+            >>> from reqflow.utils.logger import GlobalLogger
+            >>>
+            >>> GlobalLogger.add_jsonl_sink("requests.jsonl.gz", compression="gzip", keep_in_memory=False)
+
+        Returns:
+            JsonlSink: The attached sink.
+        """
+
+        sink = JsonlSink(file_path, compression=compression, max_body_bytes=max_body_bytes)
+        cls.sinks.append(sink)
+        if keep_in_memory is not None:
+            cls.set_keep_in_memory(keep_in_memory)
+        return sink
+
+    @classmethod
+    def use_sqlite_store(cls, file_path: str, keep_in_memory: Optional[bool] = None) -> SQLiteLogStore:
+        """
+        Store every log entry in an indexed SQLite database, which backs `query` and the reports when the logs are
+        not kept in memory.
+        Args:
+            file_path: (str) The path of the SQLite database.
+            keep_in_memory: (bool) Sets `GlobalLogger.keep_in_memory`, see `set_keep_in_memory`. Left unchanged
+                if None.
+
+        Examples:
+            >>> from reqflow.utils.logger import GlobalLogger
+            >>>
+            >>> GlobalLogger.use_sqlite_store("requests.db", keep_in_memory=False)
+
+        Returns:
+            SQLiteLogStore: The attached store.
+        """
+
+        store = SQLiteLogStore(file_path)
+        cls.sinks.append(store)
+        cls.store = store
+        if keep_in_memory is not None:
+            cls.set_keep_in_memory(keep_in_memory)
+        return store
+
+    @classmethod
+    def set_keep_in_memory(cls, keep_in_memory: bool):
+        """
+        Set whether the log entries are kept in memory, the default, for all the sinks and the store.
+
+        When they are not, entries are only written to the sinks, and `get_logs`, `query` and the reports read them
+        back from the SQLite store if one is attached, otherwise from the first sink.
+        Args:
+            keep_in_memory: (bool) If False, the entries are not kept in the in-memory logs.
+
+        Examples:
+            >>> from reqflow.utils.logger import GlobalLogger
+            >>>
+            >>> GlobalLogger.add_jsonl_sink("requests.jsonl.gz", compression="gzip")
+            >>> GlobalLogger.use_sqlite_store("requests.db")
+            >>> GlobalLogger.set_keep_in_memory(False)
+        """
+
+        cls.keep_in_memory = keep_in_memory
+
+    @classmethod
+    def query(cls, function: Optional[str] = None, test_id: Optional[str] = None, method: Optional[str] = None,
+              url_template: Optional[str] = None, status_code: Optional[int] = None,
+              min_status: Optional[int] = None, max_status: Optional[int] = None,
+              min_time: Optional[float] = None, max_time: Optional[float] = None,
+              limit: Optional[int] = None) -> List[dict]:
+        """
+        Get the log entries matching all the given filters.
+
+        The query runs against the SQLite store if one is attached, otherwise against the in-memory logs.
+        Args:
+            function: (str) The name of the test (or `client.context()`) that sent the request.
+            test_id: (str) The test node id that sent the request.
+            method: (str) The HTTP method.
+            url_template: (str) The endpoint with identifiers collapsed, e.g. `/orders/{id}`.
+            status_code: (int) The exact status code.
+            min_status: (int) The minimum status code (inclusive).
+            max_status: (int) The maximum status code (inclusive).
+            min_time: (float) The minimum response time in seconds (inclusive).
+            max_time: (float) The maximum response time in seconds (inclusive).
+            limit: (int) The maximum number of entries to return.
+
+        Examples:
+            >>> from reqflow.utils.logger import GlobalLogger
+            >>>
+            >>> slow_errors = GlobalLogger.query(function="test_orders", url_template="/orders",
+            >>>                                  min_status=500, max_status=599, min_time=0.8)
+
+        Returns:
+            A list of log entries.
+        """
+
+        cls.flush_retained()
+        filters = dict(function=function, test_id=test_id, method=method, url_template=url_template,
+                       status_code=status_code, min_status=min_status, max_status=max_status,
+                       min_time=min_time, max_time=max_time)
+        if cls.store is not None and not cls.keep_in_memory:
+            return cls.store.query(limit=limit, **filters)
+
+        matches = []
+        for log in cls.logs:
+            if limit is not None and len(matches) >= limit:
+                break
+            if _matches(log, **filters):
+                matches.append(log)
+        return matches
+
+    @classmethod
+    def close_sinks(cls):
+        """
+        Flush and detach all the sinks and the store and go back to keeping the logs in memory.
+
+        Every sink is closed even if closing one fails, then the first error is raised.
+
+        Examples:
+            >>> from reqflow.utils.logger import GlobalLogger
+            >>>
+            >>> GlobalLogger.close_sinks()
+        """
+
+        sinks, cls.sinks = cls.sinks, []
+        cls.store = None
+        cls.keep_in_memory = True
+        error = None
+        for sink in sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+    @classmethod
+    def _iter_entries(cls) -> Iterator[dict]:
+        cls.flush_retained()
+        if cls.keep_in_memory or not cls.sinks:
+            return iter(cls.logs)
+        if cls.store is not None:
+            return cls.store.iter_entries()
+        return cls.sinks[0].iter_entries()
 
     @classmethod
     def get_logs(cls):
         """
         Get all the logs stored in the logger.
         Returns:
-            A list of log entries.
+            A list of log entries. Read from the sink or the store when the logs are not kept in memory.
 
         Examples:
             >>> from reqflow.utils.logger import GlobalLogger
             >>>
             >>> logs = GlobalLogger.get_logs()
             >>> print(logs)
-            >>> [{'function': 'test_function', 'request': {'method': 'GET', 'url': 'https://some_url.com', 'params': {}, 'headers': {}, 'cookies': {}, 'json': None, 'data': None, 'redirect': 'auto', 'files': None, 'timeout': None}, 'response': {'status_code': 200, 'headers': {'Content-Type': 'application/json'}, 'content': b'{"key": "value"}', 'time': 0.123}}]
+            >>> [{'function': 'test_function', 'test_id': 'tests/test_api.py::test_function', 'request': {'method': 'GET', 'url': 'https://some_url.com', 'params': {}, 'headers': {}, 'cookies': {}, 'json': None, 'data': None, 'redirect': 'auto', 'files': None, 'timeout': None}, 'response': {'status_code': 200, 'headers': {'Content-Type': 'application/json'}, 'content': b'{"key": "value"}', 'time': 0.123}}]
         """
 
-        return cls.logs
+        cls.flush_retained()
+        if cls.keep_in_memory:
+            return cls.logs
+        return list(cls._iter_entries())
 
     @classmethod
     def clear_logs(cls):
         """
         Clear all the logs stored in the logger.
 
+        The entries already written to the sinks and the store are kept, they are durable records of the run, so
+        when the logs are not kept in memory `get_logs` still reads them back. Use `close_sinks` to detach them.
+
         Examples:
             >>> from reqflow.utils.logger import GlobalLogger
             >>>
@@ -47,14 +311,26 @@ class GlobalLogger:
         """
 
         cls.logs.clear()
+        if cls.body_store is not None:
+            for sink in cls.sinks:
+                sink.flush()
+            cls.body_store.clear()
 
     @classmethod
-    def generate_html_report(cls, file_path="test_report.html", report_title="Test Report"):
+    def generate_html_report(cls, file_path="test_report.html", report_title="Test Report", page_size=100,
+                             max_body_bytes=1024 * 1024, comparison=None):
         """
         Generate an HTML report from the logs across all client instances.
+
+        The report starts with a per-endpoint summary and renders the requests page by page. Request and
+        response details are stored in a `<report>_data` directory next to the report and loaded on demand.
         Args:
             file_path: (str) The path/name to save the HTML report.
             report_title: (str) The name of the report.
+            page_size: (int) The number of requests shown per page.
+            max_body_bytes: (int) Bodies longer than this are truncated in the report.
+            comparison: (BaselineComparison) A comparison against a baseline shown after the summary. Defaults to
+                `GlobalLogger.baseline_comparison`, set by the pytest plugin when `--reqflow-baseline` is used.
 
         Examples:
             >>> from reqflow.utils.logger import GlobalLogger
@@ -63,48 +339,16 @@ class GlobalLogger:
 
         """
 
-        log_entries = ""
-        for log in cls.logs:
-            log_entries += f"""
-            <div class="log">
-                <div class="log-header" onclick="toggleLog(this)">
-                    {log['function']} - Status: <span class="{'status-success' if log['response']['status_code'] < 300 else 'status-failure'}"><b>{log['response']['status_code']}</b></span>
-                </div>
-                <div class="log-body">
-                    <h3>Request</h3>
-                    <table>
-                        <tr><th>Method</th><td>{log['request']['method']}</td></tr>
-                        <tr><th>URL</th><td>{log['request']['url']}</td></tr>
-                        <tr><th>Params</th><td>{log['request']['params']}</td></tr>
-                        <tr><th>Headers</th><td>{log['request']['headers']}</td></tr>
-                        <tr><th>Cookies</th><td>{log['request']['cookies']}</td></tr>
-                        <tr><th>JSON</th><td>{log['request']['json']}</td></tr>
-                        <tr><th>Data</th><td>{log['request']['data']}</td></tr>
-                        <tr><th>Redirect</th><td>{log['request']['redirect']}</td></tr>
-                        <tr><th>Files</th><td>{log['request']['files']}</td></tr>
-                        <tr><th>Timeout</th><td>{log['request']['timeout']}</td></tr>
-                    </table>
-                    <h3>Response</h3>
-                    <table>
-                        <tr><th>Status Code</th><td>{log['response']['status_code']}</td></tr>
-                        <tr><th>Headers</th><td>{log['response']['headers']}</td></tr>
-                        <tr><th>Content</th><td>{log['response']['content']}</td></tr>
-                        <tr><th>Time</th><td>{log['response']['time']}</td></tr>
-                    </table>
-                </div>
-            </div>
-            """
-
-        html_content = HTML_TEMPLATE.format(log_entries=log_entries, date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                            report_name=report_title)
-
-        with open(file_path, "w") as file:
-            file.write(html_content)
+        write_html_report(cls._iter_entries(), file_path, report_title, page_size=page_size,
+                          max_body_bytes=max_body_bytes,
+                          comparison=cls.baseline_comparison if comparison is None else comparison)
 
     @classmethod
     def generate_json_report(cls, file_path="test_report.json"):
         """
         Generate a JSON report from the logs across all client instances.
+
+        The entries are written one at a time, binary bodies are base64 encoded.
         Args:
             file_path: (str) The path/name to save the HTML report.
 
@@ -114,10 +358,9 @@ class GlobalLogger:
             >>> GlobalLogger.generate_json_report(file_path="test_report.json")
         """
 
-        def convert_bytes(o):
-            if isinstance(o, bytes):
-                return o.decode("utf-8")
-            raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
-
         with open(file_path, "w") as file:
-            json.dump(cls.logs, file, default=convert_bytes, indent=4)
+            file.write("[")
+            for index, log in enumerate(cls._iter_entries()):
+                file.write(",\n" if index else "\n")
+                file.write(json.dumps(log, default=json_default, indent=4))
+            file.write("\n]\n")
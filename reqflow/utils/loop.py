@@ -0,0 +1,37 @@
+import asyncio
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Awaitable, Optional, Set, TypeVar
+
+if TYPE_CHECKING:
+    from reqflow.client import Client
+
+T = TypeVar("T")
+
+_loop_clients: ContextVar[Optional[Set['Client']]] = ContextVar("reqflow_loop_clients", default=None)
+
+
+def track_client(client: 'Client') -> None:
+    """
+    Records that a client sent an async request on the loop started by `run_sync`, if any.
+    """
+    clients = _loop_clients.get()
+    if clients is not None:
+        clients.add(client)
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """
+    Runs an awaitable on a new event loop like `asyncio.run`, then closes the async connections the clients opened
+    on it. The pooled connections are bound to the loop they were opened on, so keeping them would fail the next
+    run with the same clients with "Event loop is closed".
+    """
+    async def main() -> T:
+        clients: Set['Client'] = set()
+        _loop_clients.set(clients)
+        try:
+            return await awaitable
+        finally:
+            for client in clients:
+                await client.close_async_connections()
+
+    return asyncio.run(main())
@@ -0,0 +1,313 @@
+import json
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from reqflow.utils.url import url_template
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def status_class(status_code: Optional[int]) -> str:
+    """
+    Returns the status class of a status code, e.g. "2xx", or "error" if no response was received.
+    """
+    return "error" if status_code is None else f"{status_code // 100}xx"
+
+
+class LatencyHistogram:
+    """
+    A cumulative latency histogram with fixed bucket bounds in seconds.
+
+    Histograms with the same bounds can be merged, e.g. to aggregate several clients or runs.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Records one observation.
+
+        Args:
+            value (float): The latency in seconds.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """
+        Adds the observations of another histogram with the same bucket bounds.
+
+        Raises:
+            ValueError: If the bucket bounds differ.
+        """
+        if other.buckets != self.buckets:
+            raise ValueError("Cannot merge histograms with different buckets")
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimates a quantile by linear interpolation inside the bucket it falls into.
+
+        Args:
+            q (float): The quantile between 0 and 1.
+
+        Returns:
+            float: The estimated latency in seconds, or None if the histogram is empty.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def cumulative_counts(self):
+        """
+        Yields `(upper_bound, cumulative_count)` pairs, ending with `(inf, count)`.
+        """
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            yield bound, cumulative
+
+
+class MetricsRegistry:
+    """
+    In-memory request counters and latency histograms keyed by method, endpoint template and status class.
+
+    Examples:
+        >>> from reqflow import Client
+        >>> from reqflow.utils.metrics import MetricsRegistry
+        >>>
+        >>> metrics = MetricsRegistry()
+        >>> client = Client(base_url="https://some_url.com", metrics=metrics)
+        >>> ...
+        >>> metrics.write_openmetrics("metrics.txt")
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix: str = "reqflow"):
+        """
+        Args:
+            buckets (Sequence[float]): The upper bounds of the latency buckets in seconds.
+            prefix (str): The prefix of the exported metric names.
+        """
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self.hedges: Dict[Tuple[str, str], List[int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, url: str, status_code: Optional[int], response_time: float) -> None:
+        """
+        Records a request.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL of the request, identifiers are collapsed into the endpoint template.
+            status_code (int): The status code, or None if no response was received.
+            response_time (float): The response time in seconds.
+        """
+        key = (method.upper(), url_template(url), status_class(status_code))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram(self.buckets)
+            histogram.observe(response_time)
+
+    def observe_hedge(self, method: str, url: str, hedges: int, won: bool) -> None:
+        """
+        Records a hedged request, see `reqflow.hedging.HedgingPolicy`.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL of the request, identifiers are collapsed into the endpoint template.
+            hedges (int): The number of duplicates sent.
+            won (bool): Whether a duplicate answered first.
+        """
+        key = (method.upper(), url_template(url))
+        with self._lock:
+            counters = self.hedges.get(key)
+            if counters is None:
+                counters = self.hedges[key] = [0, 0, 0]
+            counters[0] += 1
+            counters[1] += hedges
+            counters[2] += won
+
+    def merge(self, other: 'MetricsRegistry') -> 'MetricsRegistry':
+        """
+        Adds the observations of another registry.
+
+        Returns:
+            MetricsRegistry: This registry.
+        """
+        with self._lock:
+            for key, histogram in other.histograms.items():
+                if key not in self.histograms:
+                    self.histograms[key] = LatencyHistogram(self.buckets)
+                self.histograms[key].merge(histogram)
+            for key, counters in other.hedges.items():
+                own = self.hedges.setdefault(key, [0, 0, 0])
+                for index, value in enumerate(counters):
+                    own[index] += value
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the registry as a JSON serializable dictionary, see `from_dict`.
+        """
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "series": [
+                    {"method": method, "endpoint": endpoint, "status_class": status,
+                     "counts": histogram.counts, "count": histogram.count, "sum": histogram.sum}
+                    for (method, endpoint, status), histogram in self.histograms.items()
+                ],
+                "hedges": [
+                    {"method": method, "endpoint": endpoint, "requests": requests, "hedges": hedges, "wins": wins}
+                    for (method, endpoint), (requests, hedges, wins) in self.hedges.items()
+                ],
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], prefix: str = "reqflow") -> 'MetricsRegistry':
+        """
+        Rebuilds a registry saved with `to_dict`, e.g. to merge the results of previous runs.
+        """
+        registry = cls(buckets=data["buckets"], prefix=prefix)
+        for series in data["series"]:
+            histogram = LatencyHistogram(registry.buckets)
+            histogram.counts = list(series["counts"])
+            histogram.count = series["count"]
+            histogram.sum = series["sum"]
+            registry.histograms[(series["method"], series["endpoint"], series["status_class"])] = histogram
+        for series in data.get("hedges", ()):
+            registry.hedges[(series["method"], series["endpoint"])] = \
+                [series["requests"], series["hedges"], series["wins"]]
+        return registry
+
+    def save(self, file_path: str) -> None:
+        """
+        Saves the registry as JSON.
+        """
+        with open(file_path, "w") as file:
+            json.dump(self.to_dict(), file)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'MetricsRegistry':
+        """
+        Loads a registry saved with `save`.
+        """
+        with open(file_path, "r") as file:
+            return cls.from_dict(json.load(file))
+
+    def to_openmetrics(self) -> str:
+        """
+        Renders the metrics in the OpenMetrics text format, which Prometheus can scrape.
+
+        Returns:
+            str: The exposition text.
+        """
+        duration = f"{self.prefix}_request_duration_seconds"
+        requests = f"{self.prefix}_requests"
+        with self._lock:
+            series = sorted(self.histograms.items(), key=lambda item: item[0])
+            lines = [f"# TYPE {duration} histogram", f"# UNIT {duration} seconds",
+                     f"# HELP {duration} Request latency by method, endpoint and status class."]
+            for (method, endpoint, status), histogram in series:
+                labels = f'method="{_escape(method)}",endpoint="{_escape(endpoint)}",status_class="{status}"'
+                for bound, cumulative in histogram.cumulative_counts():
+                    lines.append(f'{duration}_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}')
+                lines.append(f"{duration}_count{{{labels}}} {histogram.count}")
+                lines.append(f"{duration}_sum{{{labels}}} {histogram.sum}")
+
+            lines += [f"# TYPE {requests} counter", f"# HELP {requests} Requests by method, endpoint and status class."]
+            for (method, endpoint, status), histogram in series:
+                labels = f'method="{_escape(method)}",endpoint="{_escape(endpoint)}",status_class="{status}"'
+                lines.append(f"{requests}_total{{{labels}}} {histogram.count}")
+
+            if self.hedges:
+                hedged, hedges, wins = (f"{self.prefix}_hedged_requests", f"{self.prefix}_hedges",
+                                        f"{self.prefix}_hedge_wins")
+                for name, index, description in ((hedged, 0, "Requests for which duplicates were sent"),
+                                                 (hedges, 1, "Duplicate requests sent"),
+                                                 (wins, 2, "Hedged requests answered first by a duplicate")):
+                    lines += [f"# TYPE {name} counter", f"# HELP {name} {description}, by method and endpoint."]
+                    for (method, endpoint), counters in sorted(self.hedges.items()):
+                        labels = f'method="{_escape(method)}",endpoint="{_escape(endpoint)}"'
+                        lines.append(f"{name}_total{{{labels}}} {counters[index]}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_openmetrics(self, file_path: str) -> None:
+        """
+        Writes the metrics in the OpenMetrics text format, e.g. for the node exporter textfile collector.
+
+        Args:
+            file_path (str): The path of the file.
+        """
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(self.to_openmetrics())
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serves the metrics in the OpenMetrics text format on `http://host:port/metrics` from a background thread.
+
+        Args:
+            port (int): The port to listen on, 0 picks a free port.
+            host (str): The interface to listen on.
+
+        Examples:
+            >>> server = metrics.serve(port=9464)
+            >>> ...
+            >>> server.shutdown()
+
+        Returns:
+            ThreadingHTTPServer: The running server, call `shutdown()` to stop it.
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.to_openmetrics().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="reqflow-metrics", daemon=True).start()
+        return server
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
@@ -0,0 +1,133 @@
+import glob
+import json
+import os
+from datetime import datetime
+from html import escape
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from reqflow.utils.constants import HTML_REPORT_BODY, HTML_REPORT_COMPARISON, HTML_REPORT_HEAD, HTML_REPORT_SCRIPT
+from reqflow.utils.serialization import json_default
+from reqflow.utils.stats import percentile
+from reqflow.utils.url import url_template
+
+INDEX_CHUNK_SIZE = 1000
+
+
+def _script_json(value: Any, max_body_bytes: Optional[int] = None) -> str:
+    def default(obj):
+        try:
+            return json_default(obj, max_bytes=max_body_bytes)
+        except TypeError:
+            return str(obj)
+
+    # Keep the payload from closing the surrounding <script> element
+    return json.dumps(value, default=default, separators=(",", ":")).replace("</", "<\\/")
+
+
+class EndpointSummary:
+    """
+    Aggregates request counts, errors and response times per method and endpoint template.
+    """
+
+    def __init__(self):
+        self.endpoints: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def add(self, method: Optional[str], url: Optional[str], status_code: Optional[int],
+            response_time: Optional[float]) -> None:
+        key = (method or "", url_template(url or ""))
+        endpoint = self.endpoints.get(key)
+        if endpoint is None:
+            endpoint = self.endpoints[key] = {"count": 0, "errors": 0, "times": []}
+        endpoint["count"] += 1
+        if status_code is None or status_code >= 400:
+            endpoint["errors"] += 1
+        if response_time is not None:
+            endpoint["times"].append(response_time)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        rows = []
+        for (method, template), endpoint in sorted(self.endpoints.items(), key=lambda item: item[0][1]):
+            times = sorted(endpoint["times"])
+            rows.append({
+                "method": method,
+                "endpoint": template,
+                "count": endpoint["count"],
+                "errors": endpoint["errors"],
+                "mean": sum(times) / len(times) if times else None,
+                "p95": percentile(times, 95) if times else None,
+                "max": times[-1] if times else None,
+            })
+        return rows
+
+    def to_html(self) -> str:
+        def seconds(value):
+            return "-" if value is None else f"{value:.4f}"
+
+        return "\n".join(
+            f"<tr><td>{escape(row['method'])}</td><td>{escape(row['endpoint'])}</td><td>{row['count']}</td>"
+            f"<td class=\"{'status-failure' if row['errors'] else 'status-success'}\">{row['errors']}</td>"
+            f"<td>{seconds(row['mean'])}</td><td>{seconds(row['p95'])}</td><td>{seconds(row['max'])}</td></tr>"
+            for row in self.rows()
+        )
+
+
+def write_html_report(entries: Iterable[Dict[str, Any]], file_path: str, report_title: str, page_size: int = 100,
+                      max_body_bytes: Optional[int] = 1024 * 1024, comparison=None) -> None:
+    """
+    Streams log entries into an HTML report.
+
+    The page only embeds a compact index of the entries and renders it page by page. Request and response
+    details are written in chunks to a `<report>_data` directory next to the report and loaded when an
+    entry is expanded, so neither generating nor opening the report holds all bodies in memory.
+
+    Args:
+        entries (Iterable[Dict[str, Any]]): The log entries.
+        file_path (str): The path/name of the HTML report.
+        report_title (str): The name of the report.
+        page_size (int): The number of entries rendered per page.
+        max_body_bytes (int): Bodies longer than this are truncated in the report.
+        comparison (BaselineComparison): Optional comparison against a baseline rendered after the summary.
+    """
+    data_dir = os.path.splitext(file_path)[0] + "_data"
+    os.makedirs(data_dir, exist_ok=True)
+    for stale_chunk in glob.glob(os.path.join(data_dir, "bodies_*.js")):
+        os.remove(stale_chunk)
+
+    summary = EndpointSummary()
+    total = 0
+
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(HTML_REPORT_HEAD.format(report_name=escape(report_title)))
+
+        index_rows, bodies = [], []
+
+        def flush_chunk():
+            chunk = (total - 1) // INDEX_CHUNK_SIZE
+            file.write(f"<script>REQFLOW_ENTRIES.push(...{_script_json(index_rows)});</script>\n")
+            with open(os.path.join(data_dir, f"bodies_{chunk}.js"), "w", encoding="utf-8") as chunk_file:
+                chunk_file.write(f"reqflowLoadBodies({chunk}, {_script_json(bodies, max_body_bytes)});\n")
+            index_rows.clear()
+            bodies.clear()
+
+        for log in entries:
+            request, response = log.get("request") or {}, log.get("response") or {}
+            method, url = request.get("method"), request.get("url")
+            status_code, response_time = response.get("status_code"), response.get("time")
+
+            summary.add(method, url, status_code, response_time)
+            index_rows.append([total, log.get("function"), method, url, status_code, response_time])
+            bodies.append({"request": request, "response": response})
+            total += 1
+            if len(index_rows) == INDEX_CHUNK_SIZE:
+                flush_chunk()
+        if index_rows:
+            flush_chunk()
+
+        comparison_html = "" if comparison is None else HTML_REPORT_COMPARISON.format(
+            threshold=f"{comparison.threshold:.0%}", alpha=comparison.alpha, rows=comparison.to_html())
+        config = {"pageSize": page_size, "chunkSize": INDEX_CHUNK_SIZE, "dataDir": os.path.basename(data_dir)}
+        file.write(HTML_REPORT_BODY.format(report_name=escape(report_title), total=total,
+                                           date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                           summary_rows=summary.to_html(), comparison=comparison_html,
+                                           config=_script_json(config)))
+        file.write(HTML_REPORT_SCRIPT)
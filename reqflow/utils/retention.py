@@ -0,0 +1,152 @@
+import heapq
+import itertools
+import random
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from reqflow.utils.url import url_template
+
+KEEP = "keep"
+DROP = "drop"
+CANDIDATE = "candidate"
+
+
+class RetainedCandidate:
+    """
+    A request kept by a `RetentionPolicy` as one of the slowest of its endpoint.
+
+    The log entry is built when the request enters the slowest set and is added to the logs when
+    the policy is flushed, unless it was pushed out by slower requests in the meantime.
+    """
+
+    def __init__(self, response_time: float, entry: Dict[str, Any]):
+        self.response_time = response_time
+        self.entry = entry
+        self.logged = False
+
+
+class RetentionPolicy:
+    """
+    Decides which logged requests are kept in full.
+
+    Failed requests (status code >= 400 or no response) are always kept when `keep_failures` is True. Other
+    requests are kept if they are sampled, up to `max_per_endpoint` per endpoint, or if they are among the
+    `slowest_per_endpoint` slowest of their endpoint. Requests that are not kept only update the counters
+    and can still be kept later, e.g. when a `Then` assertion fails on them.
+
+    Examples:
+        >>> from reqflow.utils.logger import GlobalLogger
+        >>> from reqflow.utils.retention import RetentionPolicy
+        >>>
+        >>> GlobalLogger.set_retention_policy(RetentionPolicy(sample_rate=0.01, slowest_per_endpoint=10))
+    """
+
+    def __init__(self, sample_rate: float = 1.0, keep_failures: bool = True, slowest_per_endpoint: int = 0,
+                 max_per_endpoint: Optional[int] = None, seed: Optional[int] = None):
+        """
+        Args:
+            sample_rate (float): The fraction of the successful requests kept, between 0 and 1.
+            keep_failures (bool): If True, failed requests are always kept.
+            slowest_per_endpoint (int): The number of slowest requests kept per endpoint on top of the sampled ones.
+            max_per_endpoint (int): The maximum number of sampled successful requests kept per endpoint.
+            seed (int): Optional seed for the sampling.
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("The `sample_rate` must be between 0 and 1.")
+
+        self.sample_rate = sample_rate
+        self.keep_failures = keep_failures
+        self.slowest_per_endpoint = slowest_per_endpoint
+        self.max_per_endpoint = max_per_endpoint
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._counters: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._slowest: Dict[Tuple[str, str], List[Tuple[float, int, RetainedCandidate]]] = {}
+
+    def admit(self, method: str, url: str, status_code: Optional[int], response_time: float) -> str:
+        """
+        Decides whether a request is kept.
+
+        Returns:
+            str: `KEEP` to log the request now, `CANDIDATE` to offer it to `add_candidate` as one of the
+                slowest requests of the endpoint, or `DROP`.
+        """
+        key = (method.upper(), url_template(url))
+        failed = status_code is None or status_code >= 400
+        with self._lock:
+            counters = self._counters.get(key)
+            if counters is None:
+                counters = self._counters[key] = {"seen": 0, "kept": 0, "failures": 0}
+            counters["seen"] += 1
+
+            if failed:
+                counters["failures"] += 1
+                if self.keep_failures:
+                    counters["kept"] += 1
+                    return KEEP
+
+            sampled = self.sample_rate >= 1 or self._random.random() < self.sample_rate
+            if sampled and (self.max_per_endpoint is None or counters["kept"] < self.max_per_endpoint):
+                counters["kept"] += 1
+                return KEEP
+
+            if self.slowest_per_endpoint > 0:
+                slowest = self._slowest.get(key)
+                if slowest is None or len(slowest) < self.slowest_per_endpoint or response_time > slowest[0][0]:
+                    return CANDIDATE
+        return DROP
+
+    def add_candidate(self, method: str, url: str, response_time: float,
+                      entry: Dict[str, Any]) -> RetainedCandidate:
+        """
+        Adds a request to the slowest set of its endpoint, pushing out the fastest one if the set is full.
+
+        Returns:
+            RetainedCandidate: The candidate holding the log entry.
+        """
+        key = (method.upper(), url_template(url))
+        candidate = RetainedCandidate(response_time, entry)
+        with self._lock:
+            slowest = self._slowest.setdefault(key, [])
+            item = (response_time, next(self._sequence), candidate)
+            if len(slowest) < self.slowest_per_endpoint:
+                heapq.heappush(slowest, item)
+            else:
+                heapq.heappushpop(slowest, item)
+        return candidate
+
+    def flush(self, log: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Logs the slowest requests retained so far and starts new slowest sets.
+
+        Args:
+            log: The function called with each retained log entry.
+        """
+        with self._lock:
+            slowest, self._slowest = self._slowest, {}
+            for key, items in slowest.items():
+                self._counters[key]["kept"] += sum(1 for _, _, candidate in items if not candidate.logged)
+
+        for items in slowest.values():
+            for _, _, candidate in sorted(items, key=lambda item: item[1]):
+                if not candidate.logged:
+                    candidate.logged = True
+                    log(candidate.entry)
+
+    def record_kept(self, method: str, url: str) -> None:
+        """
+        Counts a request that was dropped and kept later, e.g. after a failed assertion.
+        """
+        with self._lock:
+            self._counters[(method.upper(), url_template(url))]["kept"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the number of seen, kept and failed requests per endpoint.
+
+        Returns:
+            Dict[str, Dict[str, int]]: The counters keyed by `"METHOD /endpoint/{id}"`.
+        """
+        with self._lock:
+            return {f"{method} {template}": dict(counters) for (method, template), counters in self._counters.items()}
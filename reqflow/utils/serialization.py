@@ -0,0 +1,70 @@
+import base64
+from typing import Any, Optional
+
+from reqflow.utils.bodies import BodyRef
+
+
+def encode_body(body: Any, max_bytes: Optional[int] = None) -> Any:
+    """
+    Converts a logged request/response body into a JSON serializable value.
+
+    UTF-8 bodies are returned as text. Binary bodies are base64 encoded and bodies longer
+    than `max_bytes` are truncated; both are returned as a dictionary describing the encoding.
+
+    Args:
+        body: The body to encode. Anything other than bytes is returned unchanged.
+        max_bytes (int): Optional maximum number of bytes to keep.
+
+    Returns:
+        Any: A JSON serializable representation of the body.
+    """
+    if not isinstance(body, (bytes, bytearray, memoryview)):
+        return body
+
+    raw = bytes(body)
+    length = len(raw)
+    truncated = max_bytes is not None and length > max_bytes
+    if truncated:
+        raw = raw[:max_bytes]
+
+    text = _decode_utf8(raw, allow_split_tail=truncated)
+    if text is not None and not truncated:
+        return text
+
+    return {
+        "encoding": "utf-8" if text is not None else "base64",
+        "data": text if text is not None else base64.b64encode(raw).decode("ascii"),
+        "length": length,
+        "truncated": truncated,
+    }
+
+
+def _decode_utf8(raw: bytes, allow_split_tail: bool = False) -> Optional[str]:
+    # A truncated body may end in the middle of a multibyte character
+    for cut in range(4 if allow_split_tail else 1):
+        try:
+            return raw[:len(raw) - cut].decode("utf-8")
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def json_default(obj: Any, max_bytes: Optional[int] = None) -> Any:
+    """
+    `default` hook for `json.dump` that encodes the bytes and body references found in log entries.
+
+    Raises:
+        TypeError: If the object is not bytes-like or a body reference.
+    """
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return encode_body(obj, max_bytes)
+    if isinstance(obj, BodyRef):
+        if not obj.truncated:
+            body = obj.resolve()
+            return encode_body(body, max_bytes) if isinstance(body, bytes) else body
+        encoded = encode_body(obj.read(), max_bytes)
+        if not isinstance(encoded, dict):
+            encoded = {"encoding": "utf-8", "data": encoded}
+        encoded.update(length=obj.length, truncated=True, digest=obj.digest)
+        return encoded
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
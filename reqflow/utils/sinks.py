@@ -0,0 +1,143 @@
+import gzip
+import json
+import queue
+import threading
+from functools import partial
+from typing import Any, Dict, Iterator, Optional
+
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.utils.serialization import json_default
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSIONS = (None, "gzip", "zstd")
+
+_STOP = object()
+
+
+def _open(file_path: str, mode: str, compression: Optional[str]):
+    if compression == "gzip":
+        return gzip.open(file_path, mode)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires the `zstandard` package: pip install zstandard")
+        return zstandard.open(file_path, mode)
+    return open(file_path, mode, buffering=1 << 16)
+
+
+class JsonlSink:
+    """
+    Writes log entries to a JSON Lines file as they are logged.
+
+    Entries are serialized when they are written, so that changes made to them afterwards (e.g. to the request
+    headers or JSON body) do not race with the writer, and the lines are compressed and written to the file on a
+    background thread. Lines are buffered and flushed to disk whenever no entry arrives for `flush_interval` seconds, on `flush()`
+    and when the sink is closed.
+
+    Examples:
+        >>> from reqflow.utils.sinks import JsonlSink
+        >>>
+        >>> sink = JsonlSink("requests.jsonl.gz", compression="gzip", max_body_bytes=64 * 1024)
+        >>> sink.write(log_entry)
+        >>> sink.close()
+    """
+
+    def __init__(self, file_path: str, compression: Optional[str] = None, max_body_bytes: Optional[int] = None,
+                 flush_interval: float = 1.0, max_queue_size: int = 10000):
+        """
+        Args:
+            file_path (str): The path of the JSON Lines file.
+            compression (str): None, "gzip" or "zstd" (requires the `zstandard` package).
+            max_body_bytes (int): Bodies longer than this are truncated. Defaults to no limit.
+            flush_interval (float): Seconds of inactivity after which buffered lines are flushed to disk.
+            max_queue_size (int): Maximum number of entries waiting to be written before `write` blocks.
+        """
+        if compression not in COMPRESSIONS:
+            raise InvalidArgumentError(f"Invalid compression: {compression}. Must be one of {list(COMPRESSIONS)}.")
+
+        self.file_path = file_path
+        self.compression = compression
+        self.flush_interval = flush_interval
+        self._default = partial(json_default, max_bytes=max_body_bytes)
+        self._file = _open(file_path, "wb", compression)
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._error = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="reqflow-jsonl-sink", daemon=True)
+        self._thread.start()
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """
+        Serializes a log entry and queues it for writing.
+
+        Args:
+            entry: The log entry.
+        """
+        if self._closed:
+            raise ValueError(f"Sink {self.file_path} is closed")
+        self._queue.put(json.dumps(entry, default=self._default, separators=(",", ":")).encode("utf-8") + b"\n")
+
+    def flush(self) -> None:
+        """
+        Blocks until all queued entries are written and flushed to disk.
+        """
+        self._queue.join()
+        with self._lock:
+            self._file.flush()
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        """
+        Writes the remaining entries and closes the file.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise self._error
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """
+        Reads the written entries back one at a time.
+
+        Returns:
+            Iterator[Dict[str, Any]]: The JSON decoded log entries.
+        """
+        if not self._closed:
+            self.flush()
+        with _open(self.file_path, "rb", self.compression) as file:
+            try:
+                for line in file:
+                    yield json.loads(line)
+            except EOFError:
+                # The compressed stream of an open sink has no end marker yet
+                return
+
+    def _run(self) -> None:
+        while True:
+            try:
+                line = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                with self._lock:
+                    self._file.flush()
+                continue
+
+            try:
+                if line is _STOP:
+                    with self._lock:
+                        self._file.flush()
+                    return
+                with self._lock:
+                    self._file.write(line)
+            except Exception as e:  # surfaced on flush/close, the writer keeps draining the queue
+                self._error = e
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,64 @@
+import math
+from typing import Sequence, Tuple
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    Returns the q-th percentile of already sorted values using linear interpolation.
+
+    Args:
+        sorted_values (Sequence[float]): The values in ascending order.
+        q (float): The percentile between 0 and 100.
+
+    Returns:
+        float: The percentile value.
+    """
+    if not sorted_values:
+        raise ValueError("Cannot compute a percentile of an empty sequence")
+
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def mann_whitney_u(baseline: Sequence[float], current: Sequence[float]) -> Tuple[float, float]:
+    """
+    One-sided Mann-Whitney U test of whether `current` tends to be larger than `baseline`.
+
+    The p-value uses the normal approximation with tie and continuity corrections, which is
+    accurate from about 8 samples per side.
+
+    Args:
+        baseline (Sequence[float]): The baseline samples.
+        current (Sequence[float]): The current samples.
+
+    Returns:
+        Tuple[float, float]: The U statistic of `current` and the p-value.
+    """
+    n1, n2 = len(baseline), len(current)
+    if not n1 or not n2:
+        raise ValueError("Cannot compare empty samples")
+
+    pooled = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    rank_sum = 0.0
+    tie_term = 0
+    index = 0
+    while index < len(pooled):
+        end = index
+        while end + 1 < len(pooled) and pooled[end + 1][0] == pooled[index][0]:
+            end += 1
+        ties = end - index + 1
+        average_rank = (index + end) / 2 + 1
+        rank_sum += average_rank * sum(1 for _, group in pooled[index:end + 1] if group)
+        tie_term += ties ** 3 - ties
+        index = end + 1
+
+    u = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 0.5 if u == n1 * n2 / 2 else (0.0 if u > n1 * n2 / 2 else 1.0)
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
@@ -0,0 +1,289 @@
+import hashlib
+import json
+import queue
+import sqlite3
+import threading
+import zlib
+from contextlib import closing
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from reqflow.utils.bodies import resolve_body
+from reqflow.utils.serialization import json_default
+from reqflow.utils.url import url_template as to_url_template
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    digest TEXT PRIMARY KEY,
+    length INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS requests (
+    id INTEGER PRIMARY KEY,
+    function TEXT,
+    test_id TEXT,
+    method TEXT,
+    url TEXT,
+    url_template TEXT,
+    status_code INTEGER,
+    time REAL,
+    request TEXT,
+    response TEXT,
+    extra TEXT,
+    request_body TEXT REFERENCES bodies(digest),
+    response_body TEXT REFERENCES bodies(digest)
+);
+CREATE INDEX IF NOT EXISTS idx_requests_function ON requests(function);
+CREATE INDEX IF NOT EXISTS idx_requests_test_id ON requests(test_id);
+CREATE INDEX IF NOT EXISTS idx_requests_method ON requests(method);
+CREATE INDEX IF NOT EXISTS idx_requests_endpoint ON requests(url_template, status_code, time);
+CREATE INDEX IF NOT EXISTS idx_requests_status_code ON requests(status_code);
+CREATE INDEX IF NOT EXISTS idx_requests_time ON requests(time);
+"""
+
+_REQUEST_BODY_FIELDS = ("json", "data", "files")
+_RESPONSE_COLUMNS = ("status_code", "time", "content")
+_ENTRY_COLUMNS = ("function", "test_id", "request", "response")
+
+_STOP = object()
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=json_default, separators=(",", ":"))
+
+
+class SQLiteLogStore:
+    """
+    Stores log entries in an indexed SQLite database.
+
+    Entries are written in batches on a background thread. Request and response bodies are zlib
+    compressed and stored once per distinct content in a separate `bodies` table.
+
+    Examples:
+        >>> from reqflow.utils.store import SQLiteLogStore
+        >>>
+        >>> store = SQLiteLogStore("requests.db")
+        >>> store.write(log_entry)
+        >>> store.query(url_template="/orders", min_status=500, min_time=0.8)
+    """
+
+    def __init__(self, file_path: str, batch_size: int = 500, flush_interval: float = 1.0,
+                 max_queue_size: int = 10000):
+        """
+        Args:
+            file_path (str): The path of the SQLite database. Existing entries are kept.
+            batch_size (int): The maximum number of entries inserted per transaction.
+            flush_interval (float): Seconds of inactivity after which queued entries are committed.
+            max_queue_size (int): Maximum number of entries waiting to be written before `write` blocks.
+        """
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._error = None
+
+        connection = sqlite3.connect(file_path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        connection.close()
+
+        self._thread = threading.Thread(target=self._run, name="reqflow-sqlite-store", daemon=True)
+        self._thread.start()
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """
+        Queues a log entry for writing.
+
+        Args:
+            entry: The log entry.
+        """
+        if self._closed:
+            raise ValueError(f"Store {self.file_path} is closed")
+        self._queue.put(entry)
+
+    def flush(self) -> None:
+        """
+        Blocks until all queued entries are committed.
+        """
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        """
+        Commits the remaining entries and stops the writer thread.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def count(self, **filters) -> int:
+        """
+        Counts the stored entries matching the filters of `query`.
+
+        Returns:
+            int: The number of matching entries.
+        """
+        if not self._closed:
+            self.flush()
+        where, args = self._where(**filters)
+        with closing(self._connect()) as connection:
+            return connection.execute(f"SELECT COUNT(*) FROM requests r{where}", args).fetchone()[0]
+
+    def query(self, function: Optional[str] = None, test_id: Optional[str] = None, method: Optional[str] = None,
+              url_template: Optional[str] = None, status_code: Optional[int] = None,
+              min_status: Optional[int] = None, max_status: Optional[int] = None,
+              min_time: Optional[float] = None, max_time: Optional[float] = None,
+              limit: Optional[int] = None, include_bodies: bool = True) -> List[Dict[str, Any]]:
+        """
+        Returns the stored entries matching all the given filters, in logging order.
+
+        Args:
+            function (str): The name of the test or context that sent the request.
+            test_id (str): The test node id that sent the request.
+            method (str): The HTTP method.
+            url_template (str): The endpoint template with identifiers collapsed, e.g. `/orders/{id}`.
+            status_code (int): The exact status code.
+            min_status (int): The minimum status code (inclusive).
+            max_status (int): The maximum status code (inclusive).
+            min_time (float): The minimum response time in seconds (inclusive).
+            max_time (float): The maximum response time in seconds (inclusive).
+            limit (int): The maximum number of entries to return.
+            include_bodies (bool): If False, the request and response bodies are not loaded.
+
+        Returns:
+            List[Dict[str, Any]]: The matching log entries.
+        """
+        return list(self.iter_entries(function=function, test_id=test_id, method=method, url_template=url_template,
+                                      status_code=status_code, min_status=min_status, max_status=max_status,
+                                      min_time=min_time, max_time=max_time, limit=limit,
+                                      include_bodies=include_bodies))
+
+    def iter_entries(self, limit: Optional[int] = None, include_bodies: bool = True,
+                     **filters) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yields the stored entries matching the filters of `query`.
+
+        Returns:
+            Iterator[Dict[str, Any]]: The matching log entries.
+        """
+        if not self._closed:
+            self.flush()
+
+        where, args = self._where(**filters)
+        columns = "r.function, r.test_id, r.status_code, r.time, r.request, r.response, r.extra"
+        if include_bodies:
+            sql = (f"SELECT {columns}, rq.data, rs.data FROM requests r "
+                   f"LEFT JOIN bodies rq ON rq.digest = r.request_body "
+                   f"LEFT JOIN bodies rs ON rs.digest = r.response_body{where} ORDER BY r.id")
+        else:
+            sql = f"SELECT {columns}, NULL, NULL FROM requests r{where} ORDER BY r.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+
+        with closing(self._connect()) as connection:
+            for row in connection.execute(sql, args):
+                yield self._to_entry(row)
+
+    @staticmethod
+    def _where(function=None, test_id=None, method=None, url_template=None, status_code=None, min_status=None,
+               max_status=None, min_time=None, max_time=None) -> Tuple[str, list]:
+        conditions, args = [], []
+        for column, operator, value in (("function", "=", function), ("test_id", "=", test_id),
+                                        ("method", "=", method.upper() if method else None),
+                                        ("url_template", "=", url_template), ("status_code", "=", status_code),
+                                        ("status_code", ">=", min_status), ("status_code", "<=", max_status),
+                                        ("time", ">=", min_time), ("time", "<=", max_time)):
+            if value is not None:
+                conditions.append(f"r.{column} {operator} ?")
+                args.append(value)
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), args
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.file_path)
+        connection.execute("PRAGMA query_only=ON")
+        return connection
+
+    @staticmethod
+    def _to_entry(row) -> Dict[str, Any]:
+        function, test_id, status_code, time, request, response, extra, request_body, response_body = row
+        request = json.loads(request)
+        if request_body is not None:
+            request.update(json.loads(zlib.decompress(request_body)))
+        response = {"status_code": status_code, **json.loads(response),
+                    "content": zlib.decompress(response_body) if response_body is not None else None,
+                    "time": time}
+        return {"function": function, "test_id": test_id, "request": request, "response": response,
+                **json.loads(extra)}
+
+    @staticmethod
+    def _body(content: Any, bodies: Dict[str, Tuple[int, bytes]]) -> Optional[str]:
+        if content is None:
+            return None
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        elif not isinstance(content, (bytes, bytearray, memoryview)):
+            content = _dumps(content).encode("utf-8")
+        digest = hashlib.sha256(content).hexdigest()
+        if digest not in bodies:
+            bodies[digest] = (len(content), zlib.compress(content))
+        return digest
+
+    def _to_rows(self, entry: Dict[str, Any], bodies: Dict[str, Tuple[int, bytes]]) -> tuple:
+        request = dict(entry.get("request") or {})
+        response = entry.get("response") or {}
+        request_body = {field: resolve_body(request.pop(field)) for field in _REQUEST_BODY_FIELDS if field in request}
+        url = request.get("url") or ""
+        return (
+            entry.get("function"),
+            entry.get("test_id"),
+            request["method"].upper() if request.get("method") else None,
+            url,
+            to_url_template(url),
+            response.get("status_code"),
+            response.get("time"),
+            _dumps(request),
+            _dumps({key: value for key, value in response.items() if key not in _RESPONSE_COLUMNS}),
+            _dumps({key: value for key, value in entry.items() if key not in _ENTRY_COLUMNS}),
+            self._body(_dumps(request_body), bodies) if request_body else None,
+            self._body(resolve_body(response.get("content")), bodies),
+        )
+
+    def _run(self) -> None:
+        connection = sqlite3.connect(self.file_path)
+        stop = False
+        while not stop:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                if batch[-1] is _STOP:
+                    stop = True
+                    batch.pop()
+                bodies = {}
+                rows = [self._to_rows(entry, bodies) for entry in batch]
+                with connection:
+                    connection.executemany("INSERT OR IGNORE INTO bodies (digest, length, data) VALUES (?, ?, ?)",
+                                           [(digest, length, data) for digest, (length, data) in bodies.items()])
+                    connection.executemany(
+                        "INSERT INTO requests (function, test_id, method, url, url_template, status_code, time, "
+                        "request, response, extra, request_body, response_body) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            except Exception as e:  # surfaced on flush/close, the writer keeps draining the queue
+                self._error = e
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+        connection.close()
@@ -0,0 +1,117 @@
+from time import perf_counter_ns
+from typing import Any, Dict, Optional
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class RequestTimings:
+    """
+    The phase breakdown of a request in seconds.
+
+    A phase is None when it did not happen (e.g. `connect` and `tls` on a reused connection) or
+    could not be observed (e.g. with in-process transports that emit no trace events).
+
+    Attributes:
+        pool (float): From the start of the request until the connection was acquired (pool wait and
+            client-side request preparation).
+        dns (float): Name resolution. httpcore resolves names inside the TCP connect, so it is always None and
+            included in `connect`.
+        connect (float): TCP or Unix socket connection setup.
+        tls (float): TLS handshake.
+        request_write (float): Sending the request headers and body.
+        wait (float): From the request being sent until the response headers were received (server time).
+        download (float): Reading the response body.
+        ttfb (float): Time to first byte, from the start of the request until the response headers were received.
+        total (float): The whole request.
+    """
+
+    PHASES = ("pool", "dns", "connect", "tls", "request_write", "wait", "download", "ttfb", "total")
+
+    def __init__(self, total: float, pool: Optional[float] = None, dns: Optional[float] = None,
+                 connect: Optional[float] = None, tls: Optional[float] = None,
+                 request_write: Optional[float] = None, wait: Optional[float] = None,
+                 download: Optional[float] = None, ttfb: Optional[float] = None):
+        self.total = total
+        self.pool = pool
+        self.dns = dns
+        self.connect = connect
+        self.tls = tls
+        self.request_write = request_write
+        self.wait = wait
+        self.download = download
+        self.ttfb = ttfb
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        """
+        Returns the phases as a dictionary.
+
+        Returns:
+            Dict[str, Optional[float]]: The duration of each phase in seconds.
+        """
+        return {phase: getattr(self, phase) for phase in self.PHASES}
+
+    def __repr__(self):
+        phases = ", ".join(f"{phase}={value:.6f}" for phase, value in self.to_dict().items() if value is not None)
+        return f"RequestTimings({phases})"
+
+
+class PhaseTracer:
+    """
+    Collects the httpcore `trace` extension events of a request.
+
+    Examples:
+        >>> tracer = PhaseTracer()
+        >>> http_client.request("GET", url, extensions={"trace": tracer})
+        >>> timings = tracer.finish()
+    """
+
+    def __init__(self):
+        self.start_ns = perf_counter_ns()
+        self.events: Dict[str, int] = {}
+        self.first_event_ns: Optional[int] = None
+
+    def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        now = perf_counter_ns()
+        if self.first_event_ns is None:
+            self.first_event_ns = now
+        # Drop the "connection." / "http11." / "http2." prefix
+        self.events[event_name.partition(".")[2]] = now
+
+    async def trace_async(self, event_name: str, info: Dict[str, Any]) -> None:
+        """
+        The `trace` extension callback for async clients.
+        """
+        self(event_name, info)
+
+    def _span(self, start_event: str, end_event: str) -> Optional[float]:
+        start, end = self.events.get(start_event), self.events.get(end_event)
+        if start is None or end is None:
+            return None
+        return (end - start) / NS_PER_SECOND
+
+    def finish(self, end_ns: Optional[int] = None) -> RequestTimings:
+        """
+        Computes the phase breakdown.
+
+        Args:
+            end_ns (int): The end of the request as returned by `perf_counter_ns`. Defaults to now.
+
+        Returns:
+            RequestTimings: The timings of the request.
+        """
+        end_ns = perf_counter_ns() if end_ns is None else end_ns
+        events = self.events
+        headers_received = events.get("receive_response_headers.complete")
+        connect = self._span("connect_tcp.started", "connect_tcp.complete")
+        if connect is None:
+            connect = self._span("connect_unix_socket.started", "connect_unix_socket.complete")
+        return RequestTimings(
+            total=(end_ns - self.start_ns) / NS_PER_SECOND,
+            pool=(self.first_event_ns - self.start_ns) / NS_PER_SECOND if self.first_event_ns is not None else None,
+            connect=connect,
+            tls=self._span("start_tls.started", "start_tls.complete"),
+            request_write=self._span("send_request_headers.started", "send_request_body.complete"),
+            wait=self._span("send_request_body.complete", "receive_response_headers.complete"),
+            download=self._span("receive_response_body.started", "receive_response_body.complete"),
+            ttfb=(headers_received - self.start_ns) / NS_PER_SECOND if headers_received is not None else None,
+        )
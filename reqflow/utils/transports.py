@@ -0,0 +1,88 @@
+import inspect
+import threading
+from typing import Any, Callable, Tuple
+
+import anyio
+import httpx
+from anyio.from_thread import start_blocking_portal
+
+APP_BASE_URL = "http://testserver"
+
+
+def is_asgi_app(app: Any) -> bool:
+    """
+    Returns whether `app` is an ASGI application (an async callable) rather than a WSGI application.
+    """
+    return inspect.iscoroutinefunction(app) or inspect.iscoroutinefunction(getattr(app, "__call__", None))
+
+
+class SyncASGITransport(httpx.BaseTransport):
+    """
+    Sends the requests of a sync client to an ASGI application.
+
+    The application runs on an event loop in a background thread that is kept for the lifetime of the transport,
+    so state created by the application on the loop survives between requests.
+    """
+
+    def __init__(self, app: Callable, **kwargs):
+        self._transport = httpx.ASGITransport(app=app, **kwargs)
+        self._portal = None
+        self._portal_context = None
+        self._lock = threading.Lock()
+
+    def _get_portal(self):
+        with self._lock:
+            if self._portal is None:
+                self._portal_context = start_blocking_portal()
+                self._portal = self._portal_context.__enter__()
+            return self._portal
+
+    async def _handle(self, request: httpx.Request) -> Tuple[int, list, bytes, dict]:
+        response = await self._transport.handle_async_request(request)
+        content = await response.aread()
+        return response.status_code, response.headers.raw, content, response.extensions
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        status_code, headers, content, extensions = self._get_portal().call(self._handle, request)
+        return httpx.Response(status_code, headers=headers, content=content, extensions=extensions)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._portal_context is not None:
+                self._portal_context.__exit__(None, None, None)
+                self._portal, self._portal_context = None, None
+
+
+class AsyncWSGITransport(httpx.AsyncBaseTransport):
+    """
+    Sends the requests of an async client to a WSGI application, which runs in a worker thread.
+    """
+
+    def __init__(self, app: Callable, **kwargs):
+        self._transport = httpx.WSGITransport(app=app, **kwargs)
+
+    def _handle(self, request: httpx.Request, content: bytes) -> Tuple[int, list, bytes, dict]:
+        request = httpx.Request(request.method, request.url, headers=request.headers, content=content,
+                                extensions=request.extensions)
+        response = self._transport.handle_request(request)
+        return response.status_code, response.headers.raw, response.read(), response.extensions
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        content = await request.aread()
+        status_code, headers, body, extensions = await anyio.to_thread.run_sync(self._handle, request, content)
+        return httpx.Response(status_code, headers=headers, content=body, extensions=extensions)
+
+
+def app_transports(app: Callable) -> Tuple[httpx.BaseTransport, httpx.AsyncBaseTransport]:
+    """
+    Returns the sync and async transports sending requests in-process to an ASGI or WSGI application.
+
+    Args:
+        app (Callable): The ASGI (e.g. FastAPI, Starlette) or WSGI (e.g. Flask, Django) application.
+
+    Returns:
+        Tuple[httpx.BaseTransport, httpx.AsyncBaseTransport]: The transports of the sync and async httpx clients.
+    """
+    if is_asgi_app(app):
+        return SyncASGITransport(app), httpx.ASGITransport(app=app)
+    return httpx.WSGITransport(app=app), AsyncWSGITransport(app)
@@ -0,0 +1,29 @@
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+_ID_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,})$"
+)
+
+
+@lru_cache(maxsize=4096)
+def url_template(url: str) -> str:
+    """
+    Normalizes a URL into an endpoint template used to group requests.
+
+    The scheme, host and query string are dropped and path segments that look like identifiers
+    (integers, UUIDs and long hex strings) are collapsed into `{id}`.
+
+    Args:
+        url (str): The full or relative URL of the request.
+
+    Examples:
+        >>> url_template("https://api.com/users/42/orders/9f1c2e4a-63b1-4f4e-9a4e-0c2a0d9a7e11?page=2")
+        >>> '/users/{id}/orders/{id}'
+
+    Returns:
+        str: The endpoint template.
+    """
+    path = urlsplit(url).path or "/"
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
@@ -10,6 +10,13 @@ setup(
         'jsonpath-ng>=1.6.1',
         'pydantic>=2.5.3'
     ],
+    extras_require={
+        'yaml': ['PyYAML'],
+    },
+    entry_points={
+        'pytest11': ['reqflow = reqflow.pytest_plugin'],
+        'console_scripts': ['reqflow = reqflow.cli:main'],
+    },
     # Metadata
     author='Oleksii P.',
     description='A streamlined Python library for crafting HTTP requests and testing API',
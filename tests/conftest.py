@@ -1,9 +1,14 @@
 import pytest
+from reqflow import pytest_plugin
 from reqflow.utils.logger import GlobalLogger
 
-@pytest.hookimpl(tryfirst=True, hookwrapper=True)
-def pytest_runtest_protocol(item, nextitem):
-    yield
+
+@pytest.hookimpl
+def pytest_configure(config):
+    # The plugin is already registered when reqflow is installed, through its pytest11 entry point
+    if not config.pluginmanager.is_registered(pytest_plugin):
+        config.pluginmanager.register(pytest_plugin, "reqflow")
+
 
 @pytest.hookimpl
 def pytest_sessionfinish(session, exitstatus):
@@ -11,4 +16,4 @@ def pytest_sessionfinish(session, exitstatus):
     if logs:
         GlobalLogger.generate_html_report(file_path="test_report.html", report_title="Aggregated Requests")
         GlobalLogger.generate_json_report(file_path="test_report.json")
-    GlobalLogger.clear_logs()
\ No newline at end of file
+    GlobalLogger.clear_logs()
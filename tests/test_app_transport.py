@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from reqflow import Client, given
+from reqflow.assertions import equal_to
+from reqflow.exceptions import GivenInitializationError
+from reqflow.utils.logger import GlobalLogger
+
+
+async def asgi_app(scope, receive, send):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    payload = json.dumps({"server": "asgi", "method": scope["method"], "path": scope["path"],
+                          "json": json.loads(body) if body else None}).encode()
+    await send({"type": "http.response.start", "status": 201 if scope["method"] == "POST" else 200,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": payload})
+
+
+def wsgi_app(environ, start_response):
+    length = int(environ.get("CONTENT_LENGTH") or 0)
+    body = environ["wsgi.input"].read(length) if length else b""
+    payload = json.dumps({"server": "wsgi", "method": environ["REQUEST_METHOD"], "path": environ["PATH_INFO"],
+                          "json": json.loads(body) if body else None}).encode()
+    start_response("201 Created" if environ["REQUEST_METHOD"] == "POST" else "200 OK",
+                   [("Content-Type", "application/json")])
+    return [payload]
+
+
+@pytest.mark.parametrize("app, server", [(asgi_app, "asgi"), (wsgi_app, "wsgi")])
+def test_app_sync(app, server):
+    with Client(app=app) as client:
+        given(client).when("GET", "/items/1").then().status_code(200) \
+            .assert_body("server", equal_to(server)).assert_body("path", equal_to("/items/1"))
+        given(client).body({"name": "item"}).when("POST", "/items").then().status_code(201) \
+            .assert_body("json.name", equal_to("item"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("app, server", [(asgi_app, "asgi"), (wsgi_app, "wsgi")])
+async def test_app_async(app, server):
+    async with Client(app=app) as client:
+        then = await given(client).body({"name": "item"}).when("POST", "/items").then_async()
+        then.status_code(201).assert_body("server", equal_to(server)).assert_body("json.name", equal_to("item"))
+
+
+def test_given_app_with_logging():
+    GlobalLogger.clear_logs()
+    try:
+        given(app=asgi_app, logging=True).when("GET", "/health").then().status_code(200)
+        log = GlobalLogger.get_logs()[0]
+        assert log['request']['url'] == "http://testserver/health"
+        assert log['response']['status_code'] == 200 and log['response']['time'] > 0
+    finally:
+        GlobalLogger.clear_logs()
+
+    with pytest.raises(GivenInitializationError):
+        given(Client(app=asgi_app), app=asgi_app)
@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import httpx
+
+from reqflow import Client, given
+from reqflow.baseline import Baseline
+from reqflow.benchmark import BenchmarkResult
+from reqflow.utils.logger import GlobalLogger
+from reqflow.utils.stats import mann_whitney_u
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _samples(base, count=30):
+    return [base + index * 0.001 for index in range(count)]
+
+
+def test_mann_whitney_u():
+    u, p_value = mann_whitney_u([1, 2, 3, 4, 5, 6, 7, 8], [5, 6, 7, 8, 9, 10, 11, 12])
+    assert u == 56 and p_value < 0.01
+    assert mann_whitney_u([1, 2, 3, 4, 5, 6, 7, 8], [1, 2, 3, 4, 5, 6, 7, 8])[1] > 0.4
+
+
+def test_compare(tmp_path):
+    baseline = Baseline().add("GET /users/{id}", _samples(0.1)).add("GET /items", _samples(0.1)) \
+        .add("GET /old", _samples(0.1)).add("GET /rare", [0.1, 0.2])
+    baseline.save(tmp_path / "baseline.json")
+
+    current = Baseline().add("GET /users/{id}", _samples(0.15)).add("GET /items", _samples(0.101)) \
+        .add("GET /new", _samples(0.1)).add("GET /rare", [0.5, 0.6])
+    comparison = Baseline.load(tmp_path / "baseline.json").compare(current, threshold=0.2)
+
+    statuses = {endpoint.endpoint: endpoint.status for endpoint in comparison.endpoints}
+    assert statuses == {"GET /users/{id}": "regressed", "GET /items": "unchanged", "GET /old": "missing",
+                        "GET /new": "new", "GET /rare": "insufficient data"}
+    assert [endpoint.endpoint for endpoint in comparison.regressions] == ["GET /users/{id}"]
+    try:
+        comparison.assert_no_regressions()
+    except AssertionError as e:
+        assert "GET /users/{id}: regressed" in str(e)
+    else:
+        raise AssertionError("The regression was not detected")
+
+
+def test_throughput_regression():
+    before = BenchmarkResult("GET", "https://example.com/items", _samples(0.1), wall_time=1.0)
+    after = BenchmarkResult("GET", "https://example.com/items", _samples(0.1), wall_time=2.0)
+    comparison = Baseline.from_benchmarks([before]).compare(Baseline.from_benchmarks([after]))
+    assert comparison.endpoints[0].throughput[2] == -0.5
+    assert comparison.endpoints[0].regressed
+
+
+def test_from_logs_and_report(tmp_path):
+    client = Client(base_url="https://example.com", logging=True)
+    client.http_client = httpx.Client(transport=httpx.MockTransport(
+        lambda request: httpx.Response(500 if request.url.path == "/error" else 200)))
+    GlobalLogger.clear_logs()
+    try:
+        for index in range(3):
+            given(client).when("GET", f"/users/{index}").then()
+        given(client).when("GET", "/error").then()
+
+        baseline = Baseline.from_logs()
+        assert baseline.endpoints["GET /users/{id}"]["count"] == 3
+        assert baseline.endpoints["GET /error"]["errors"] == 1
+
+        report = tmp_path / "report.html"
+        GlobalLogger.generate_html_report(str(report), "Report", comparison=baseline.compare(baseline))
+        assert "Baseline comparison" in report.read_text() and "insufficient data" in report.read_text()
+    finally:
+        GlobalLogger.clear_logs()
+
+
+def test_pytest_plugin_fails_on_regression(tmp_path):
+    (tmp_path / "test_sample.py").write_text(textwrap.dedent("""
+        import os
+        import time
+        import httpx
+        from reqflow import Client, given
+
+        def handler(request):
+            time.sleep(float(os.environ["SAMPLE_DELAY"]))
+            return httpx.Response(200)
+
+        def test_requests():
+            client = Client(base_url="https://example.com", logging=True)
+            client.http_client = httpx.Client(transport=httpx.MockTransport(handler))
+            for index in range(10):
+                given(client).when("GET", f"/users/{index}").then().status_code(200)
+    """))
+    baseline = tmp_path / "baseline.json"
+
+    def run(delay, *args):
+        env = dict(os.environ, SAMPLE_DELAY=str(delay), PYTHONPATH=ROOT)
+        return subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "reqflow.pytest_plugin",
+                               "-p", "no:cacheprovider", *args], cwd=tmp_path, env=env, capture_output=True,
+                              text=True)
+
+    assert run(0.001, f"--reqflow-save-baseline={baseline}").returncode == 0
+    assert run(0.001, f"--reqflow-baseline={baseline}", "--reqflow-regression-threshold=10").returncode == 0
+
+    result = run(0.02, f"--reqflow-baseline={baseline}")
+    assert result.returncode == 1
+    assert "GET /users/{id}: regressed" in result.stdout
@@ -0,0 +1,69 @@
+import importlib.util
+import os
+
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.benchmark import BenchmarkResult
+
+
+def _mock_client(handler):
+    return Client(base_url="https://example.com", transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_benchmark(concurrency):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={})
+
+    result = given(_mock_client(handler)).when("GET", "/users/1").benchmark(iterations=20, warmup=3,
+                                                                             concurrency=concurrency)
+    assert len(calls) == 23
+    assert result.count == 20 and result.errors == 0 and result.status_codes == {200: 20}
+    assert result.endpoint == "GET /users/{id}"
+    assert result.min <= result.median <= result.p99 <= result.max
+    assert result.throughput > 0
+    result.assert_p99_below(1.0).assert_mean_below(1.0).assert_no_errors()
+
+    with pytest.raises(AssertionError):
+        result.assert_p99_below(0)
+
+
+def test_benchmark_errors():
+    def handler(request):
+        raise httpx.ConnectError("Connection refused", request=request)
+
+    result = given(_mock_client(handler)).when("GET", "/down").benchmark(iterations=5, warmup=1)
+    assert result.count == 0 and result.errors == 5 and result.mean is None
+    with pytest.raises(AssertionError):
+        result.assert_no_errors()
+    with pytest.raises(AssertionError):
+        result.assert_mean_below(1.0)
+
+
+def test_benchmark_result_stats(tmp_path):
+    result = BenchmarkResult("get", "https://example.com/items", [0.1, 0.2, 0.2, 0.3, 0.2, 5.0], wall_time=2.0)
+    assert result.mean == pytest.approx(1.0)
+    assert result.median == pytest.approx(0.2)
+    assert result.throughput == pytest.approx(3.0)
+    assert result.outliers() == {"low_mild": 0, "low_severe": 0, "high_mild": 0, "high_severe": 1}
+
+    result.save(tmp_path / "result.json")
+    loaded = BenchmarkResult.load(tmp_path / "result.json")
+    assert loaded.samples == result.samples and loaded.endpoint == "GET /items"
+    assert loaded.summary() == result.summary()
+
+
+def test_overhead_suite_smoke():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "overhead.py")
+    spec = importlib.util.spec_from_file_location("overhead", path)
+    overhead = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(overhead)
+
+    results = overhead.run(only="status_small", iterations=3, warmup=1)["results"]
+    assert set(results) == {"raw_httpx_small", "status_small", "status_small_logging"}
+    assert results["status_small"]["ops_per_sec"] > 0 and "relative_to_httpx" in results["status_small"]
@@ -0,0 +1,119 @@
+import json
+import os
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from reqflow.cli import main
+from reqflow.mock import MockServer
+from reqflow.suite import run_suite, substitute
+from reqflow.utils.logger import GlobalLogger
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = MockServer()
+    server.add_route("GET", "/users/{id}", payload={"type": "json", "value": {"id": 7, "name": "Alice"}})
+    with server:
+        yield server
+
+
+SUITE = {
+    "name": "users",
+    "base_url": "${BASE_URL}",
+    "variables": {"user_id": 7},
+    "concurrency": 2,
+    "tests": [
+        {"name": "fetch user", "request": {"method": "GET", "url": "/users/${user_id}"},
+         "expect": {"status": 200, "headers": {"Content-Type": {"contains_string": "json"}},
+                    "body": {"id": "${user_id}", "name": {"matches_regex": "^A"}}}},
+        {"name": "wrong status", "request": {"url": "/users/1"}, "expect": {"status": 201},
+         "retries": 2, "retry_delay": 0},
+    ],
+}
+
+
+def test_substitute(monkeypatch):
+    monkeypatch.setenv("REQFLOW_TEST_HOST", "example.com")
+    assert substitute({"url": "https://${REQFLOW_TEST_HOST}/${id}", "id": "${id}"}, {"id": 3}) == \
+        {"url": "https://example.com/3", "id": 3}
+
+
+def test_run_suite(server):
+    result = run_suite(SUITE, variables={"BASE_URL": server.url})
+    assert [case.passed for case in result.cases] == [True, False]
+    assert result.cases[1].attempts == 3 and result.cases[1].failures == ["Expected status 201, got 200"]
+
+
+def test_cli(server, tmp_path, capsys):
+    suite_file = tmp_path / "users.json"
+    suite_file.write_text(json.dumps(SUITE))
+    junit, report = tmp_path / "junit.xml", tmp_path / "report.json"
+    try:
+        status = main([str(tmp_path), "--var", f"BASE_URL={server.url}", "--workers", "1",
+                       "--junit", str(junit), "--json", str(report)])
+        assert len(json.loads(report.read_text())) == 4
+    finally:
+        GlobalLogger.clear_logs()
+
+    assert status == 1
+    assert "1 passed, 1 failed" in capsys.readouterr().out
+    testsuite = ET.parse(junit).getroot().find("testsuite")
+    assert (testsuite.get("tests"), testsuite.get("failures"), testsuite.get("errors")) == ("2", "1", "0")
+
+    invalid = tmp_path / "invalid.json"
+    invalid.write_text(json.dumps({"name": "no tests"}))
+    assert main([str(invalid)]) == 2
+
+
+def test_unparsable_suite_is_a_usage_error(tmp_path, capsys):
+    truncated = tmp_path / "truncated.json"
+    truncated.write_text('{"tests": [')
+    assert main([str(truncated)]) == 2
+    assert "invalid JSON" in capsys.readouterr().err
+
+    # Without PyYAML, the error says it is required
+    truncated = tmp_path / "truncated.yaml"
+    truncated.write_text("tests:\n  - name: [fetch\n")
+    assert main([str(truncated)]) == 2
+    assert "YAML" in capsys.readouterr().err
+
+
+def test_malformed_test_is_an_error(server, tmp_path, capsys):
+    suite = {"name": "broken", "tests": [
+        {"name": "bad url", "request": {"url": "http://[::1"}, "retries": 3},
+        {"name": "bad path", "request": {"url": f"{server.url}/users/7"}, "expect": {"body": {"$[": 1}}},
+        {"name": "fine", "request": {"url": f"{server.url}/users/7"}, "expect": {"status": 200}},
+    ]}
+    suite_file, junit = tmp_path / "broken.json", tmp_path / "junit.xml"
+    suite_file.write_text(json.dumps(suite))
+
+    assert main([str(suite_file), "--junit", str(junit)]) == 1
+    out = capsys.readouterr().out
+    assert "InvalidURL" in out and "JsonPathParserError" in out and "1 passed, 2 failed" in out
+    testsuite = ET.parse(junit).getroot().find("testsuite")
+    assert (testsuite.get("tests"), testsuite.get("failures"), testsuite.get("errors")) == ("3", "0", "2")
+
+
+def test_cli_workers(server, tmp_path, capsys):
+    for name in ("first", "second"):
+        (tmp_path / f"{name}.json").write_text(json.dumps({**SUITE, "name": name}))
+    report = tmp_path / "report.json"
+    try:
+        status = main([str(tmp_path), "--var", f"BASE_URL={server.url}", "--workers", "2", "--json", str(report)])
+        logs = json.loads(report.read_text())
+    finally:
+        GlobalLogger.clear_logs()
+
+    assert status == 1
+    assert "2 passed, 2 failed" in capsys.readouterr().out
+    # The logs of the worker processes are merged into the report
+    assert len(logs) == 8 and {entry["test_id"].split("::")[0] for entry in logs} == {"first", "second"}
+
+
+def test_import_is_lazy():
+    code = "import sys, reqflow.cli; assert 'httpx' not in sys.modules; from reqflow import given; print(given)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, cwd=root)
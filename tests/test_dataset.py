@@ -0,0 +1,94 @@
+import asyncio
+import gzip
+import json
+
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.dataset import iter_cases, run_cases, run_cases_async
+from reqflow.mock import MockServer, profiles
+
+
+def _echo(request):
+    body = json.loads(request.content) if request.content else None
+    status = 201 if request.method == "POST" else 200
+    return httpx.Response(status, json={"path": request.url.path, "query": dict(request.url.params), "json": body})
+
+
+def _client():
+    return Client(base_url="https://example.com", async_transport=httpx.MockTransport(_echo))
+
+
+def test_iter_cases(tmp_path):
+    jsonl = tmp_path / "cases.jsonl.gz"
+    with gzip.open(jsonl, "wt") as file:
+        file.write('{"url": "/a"}\n\n{"url": "/b"}\n')
+    assert list(iter_cases(str(jsonl))) == [{"url": "/a"}, {"url": "/b"}]
+
+    csv_file = tmp_path / "cases.csv"
+    csv_file.write_text("url,params.page,expect.status,expect.body.json.id,note\n/a,2,200,7,\n")
+    assert list(iter_cases(str(csv_file))) == [
+        {"url": "/a", "params": {"page": "2"}, "expect": {"status": 200, "body": {"json.id": 7}}}]
+
+
+@pytest.mark.asyncio
+async def test_run_cases_with_template(tmp_path):
+    client = _client()
+    template = given(client).body({"id": "{id}"}).when("POST", "/users/{id}").template()
+    cases = ({"id": index, "expect": {"body": {"json.id": index if index != 3 else -1}}} for index in range(50))
+    output = tmp_path / "results.jsonl"
+
+    result = await run_cases_async(client, cases, template=template, expect={"status": 201}, concurrency=8,
+                                   output=str(output))
+    assert (result.total, result.passed, result.failed, result.errors) == (50, 49, 1, 0)
+    assert result.status_codes == {201: 50}
+    assert result.failures[0]["case"] == 3 and "json.id" in result.failures[0]["failures"][0]
+    with pytest.raises(AssertionError, match="1 of 50 cases failed"):
+        result.assert_all_passed()
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(record["case"] for record in records) == list(range(50))
+    assert {record["url"] for record in records if record["case"] == 7} == {"/users/7"}
+
+
+def test_run_cases_from_csv(tmp_path):
+    cases = tmp_path / "cases.csv"
+    cases.write_text("method,url,params.q,expect.status,expect.body.query.q\n"
+                     "GET,/search,abc,200,abc\n"
+                     "GET,/search,xyz,404,xyz\n"
+                     ",,,,\n")
+    result = run_cases(_client(), str(cases), concurrency=2)
+    assert (result.total, result.passed, result.failed) == (3, 2, 1)
+    assert result.failures[0]["failures"] == ["Expected status 404, got 200"]
+
+
+@pytest.mark.asyncio
+async def test_broken_cases_do_not_stop_the_run():
+    cases = [{"url": "http://[::1"}, {"url": "https://example.com/a", "expect": {"body": {"$[": 1}}}] + \
+        [{"url": "https://example.com/b"}] * 10
+    client = Client(async_transport=httpx.MockTransport(_echo))
+    result = await asyncio.wait_for(run_cases_async(client, cases, concurrency=1), timeout=5)
+
+    assert (result.total, result.passed, result.errors) == (12, 10, 2)
+    assert result.failures[0]["error"].startswith("InvalidURL")
+
+
+@pytest.mark.asyncio
+async def test_failing_producer_stops_the_workers():
+    def cases():
+        yield {"url": "https://example.com/a"}
+        raise OSError("unreadable file")
+
+    with pytest.raises(OSError):
+        await asyncio.wait_for(run_cases_async(_client(), cases(), concurrency=2), timeout=5)
+
+
+def test_run_cases_twice_on_a_real_server():
+    with MockServer() as server:
+        server.add_route("GET", "/items/{id}", payload=profiles.json_value({"name": "item"}))
+        client = Client(base_url=server.url)
+        template = given(client).when("GET", "/items/{id}").template()
+        for _ in range(2):
+            result = run_cases(client, [{"id": 1}, {"id": 2}], template=template, expect={"status": 200})
+            assert (result.total, result.passed, result.errors) == (2, 2, 0)
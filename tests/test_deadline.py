@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.exceptions import DeadlineExceededError
+from reqflow.flow import Flow
+from reqflow.mock import MockServer
+
+
+def _client(delay):
+    def handler(request):
+        time.sleep(delay)
+        return httpx.Response(200, json={})
+
+    async def async_handler(request):
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={})
+
+    return Client(base_url="https://example.com", transport=httpx.MockTransport(handler),
+                  async_transport=httpx.MockTransport(async_handler))
+
+
+def test_deadline_fails_fast_with_a_report():
+    client = _client(0.05)
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceededError) as error:
+        with client.deadline(0.12, name="checkout"):
+            for index in range(20):
+                given(client).when("GET", f"/items/{index}").then().status_code(200)
+
+    assert time.perf_counter() - start < 0.5
+    deadline = error.value.deadline
+    assert len(deadline.requests) == 3 and deadline.expired
+    assert "Deadline of 0.120s (checkout)" in str(error.value)
+    assert "GET https://example.com/items/2  200" in deadline.report()
+
+
+def test_deadline_trims_the_request_timeout():
+    with MockServer() as server:
+        server.add_route("GET", "/slow", latency=2.0)
+        client = Client(base_url=server.url)
+        start = time.perf_counter()
+        with pytest.raises(DeadlineExceededError) as error:
+            with client.deadline(0.2):
+                given(client).when("GET", "/slow").then(timeout=5.0)
+        assert time.perf_counter() - start < 1.0
+        assert isinstance(error.value.__cause__, httpx.TimeoutException)
+
+
+def test_nested_deadlines():
+    client = _client(0.0)
+    with client.deadline(0.5) as outer:
+        with client.deadline(10) as inner:
+            assert inner.remaining() <= 0.5
+            client.send("GET", "/items")
+        client.send("GET", "/users")
+    assert len(inner.requests) == 1 and len(outer.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_deadline_cancels_requests_in_flight():
+    client = _client(1.0)
+    flow = Flow("slow")
+    flow.step("first", lambda ctx: given(client).when("GET", "/first"))
+    flow.step("second", lambda ctx: given(client).when("GET", "/second"), needs=["first"])
+
+    start = time.perf_counter()
+    async with client.deadline(0.1):
+        result = await flow.run_async(raise_on_failure=False)
+    assert time.perf_counter() - start < 0.5
+    assert isinstance(result.steps["first"].error, DeadlineExceededError)
+    assert result.steps["second"].status == "skipped"
@@ -0,0 +1,80 @@
+import time
+
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.faults import Fault, FaultInjection
+
+
+def _handler(request):
+    return httpx.Response(200, content=b"x" * 1000)
+
+
+def _client(*faults, seed=1):
+    injection = FaultInjection(faults, seed=seed)
+    client = Client(base_url="https://api.example.com", transport=httpx.MockTransport(_handler),
+                    async_transport=httpx.MockTransport(_handler), faults=injection)
+    return client, injection
+
+
+def _outcomes(client, count):
+    outcomes = []
+    for _ in range(count):
+        try:
+            outcomes.append(client.send("GET", "/items", timeout=0.01).status_code)
+        except httpx.HTTPError as e:
+            outcomes.append(type(e).__name__)
+    return outcomes
+
+
+def test_faults_are_deterministic_under_a_seed():
+    fault = Fault(error_rate=0.2, reset_rate=0.1, truncate_rate=0.1, timeout_rate=0.05)
+    first, injection = _client(fault, seed=7)
+    second, _ = _client(fault, seed=7)
+
+    outcomes = _outcomes(first, 200)
+    assert outcomes == _outcomes(second, 200)
+    counters = injection.counters()
+    assert counters["requests"] == 200
+    assert outcomes.count("ReadError") == counters["reset"] > 0
+    assert outcomes.count("ReadTimeout") == counters["timeout"] > 0
+    assert outcomes.count("RemoteProtocolError") == counters["truncate"] > 0
+    assert sum(1 for outcome in outcomes if outcome in (500, 502, 503, 504)) == counters["error"] > 0
+    assert outcomes.count(200) == 200 - counters["reset"] - counters["timeout"] - counters["truncate"] - \
+        counters["error"]
+
+
+def test_faults_per_route_and_host():
+    client, injection = _client(Fault(host="other.example.com", error_rate=1.0),
+                                Fault(path="/items/{id}", method="GET", error_rate=1.0, error_statuses=[503]))
+
+    response = client.send("GET", "/items/1")
+    assert response.status_code == 503 and response.headers["X-ReqFlow-Fault"] == "error"
+    assert client.send("POST", "/items/1").status_code == 200
+    assert client.send("GET", "/users/1").status_code == 200
+    assert injection.counters()["requests"] == 1
+
+    with pytest.raises(InvalidArgumentError):
+        Fault(error_rate=0.6, reset_rate=0.6)
+
+
+def test_latency_and_bandwidth():
+    client, injection = _client(Fault(path="/slow", latency=0.05), Fault(path="/download", bandwidth=10_000))
+
+    assert given(client).when("GET", "/slow").then().status_code(200).response.response_time >= 0.05
+    start = time.perf_counter()
+    given(client).when("GET", "/download").then().status_code(200)
+    assert time.perf_counter() - start >= 0.1
+    assert injection.counters()["latency"] == injection.counters()["throttle"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_faults():
+    client, injection = _client(Fault(latency={"type": "uniform", "low": 0.01, "high": 0.02}, truncate_rate=1.0))
+
+    with pytest.raises(httpx.RemoteProtocolError):
+        await given(client).when("GET", "/items").then_async()
+    assert injection.counters() == {"requests": 1, "latency": 1, "reset": 0, "timeout": 0, "error": 0,
+                                    "truncate": 1, "throttle": 0}
@@ -1,4 +1,5 @@
 from reqflow import Client, given
+import httpx
 import os
 
 
@@ -29,3 +30,13 @@ def test_file_download_txt():
 
     given(client).when("GET").then().status_code(200).save_response_to_file("data/download.txt")
     os.remove("data/download.txt")
+
+
+def test_file_download_json_writes_raw_bytes(tmp_path):
+    body = '{"name": "Zoë", "items": [1, 2]}'.encode("utf-8")
+    transport = httpx.MockTransport(lambda request: httpx.Response(
+        200, content=body, headers={"Content-Type": "application/json; charset=utf-8"}))
+    client = Client(base_url="https://example.com", transport=transport)
+
+    given(client).when("GET", "/items").then().status_code(200).save_response_to_file(str(tmp_path / "items.json"))
+    assert (tmp_path / "items.json").read_bytes() == body
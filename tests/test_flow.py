@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.exceptions import FlowError, InvalidArgumentError
+from reqflow.flow import Flow
+from reqflow.mock import MockServer, profiles
+
+
+async def _handler(request):
+    await asyncio.sleep(0.05)
+    body = json.loads(request.content) if request.content else {}
+    if request.url.path == "/users":
+        return httpx.Response(201, json={"id": 42})
+    if request.url.path == "/login":
+        return httpx.Response(200, json={"token": f"token-{body['user']}"})
+    if request.url.path == "/products":
+        return httpx.Response(200, json=[{"id": "p1"}, {"id": "p2"}])
+    if request.url.path == "/orders":
+        return httpx.Response(201, json={"id": 7, "auth": request.headers.get("Authorization"), **body})
+    return httpx.Response(404)
+
+
+def _flow(client):
+    flow = Flow("checkout")
+    flow.step("create_user", lambda ctx: given(client).body({"name": "Alice"}).when("POST", "/users"),
+              extract={"user_id": "id"})
+    flow.step("login", lambda ctx: given(client).body({"user": ctx["user_id"]}).when("POST", "/login"),
+              needs=["user_id"], extract={"token": "token"})
+    flow.step("catalog", lambda ctx: given(client).when("GET", "/products"), extract={"product": "[0].id"})
+
+    @flow.step("order", needs=["login", "catalog"])
+    async def create_order(ctx):
+        then = await given(client).body({"product": ctx["product"]}).when("POST", "/orders") \
+            .with_oauth2(ctx["token"]).then_async()
+        return then.status_code(201).extract("order_id", "id")
+
+    return flow
+
+
+@pytest.mark.asyncio
+async def test_flow():
+    client = Client(base_url="https://example.com", async_transport=httpx.MockTransport(_handler))
+    result = await _flow(client).run_async()
+
+    assert result.passed
+    assert result.context == {"user_id": 42, "token": "token-42", "product": "p1", "order_id": 7}
+    assert result.steps["order"].then.get_response().body["auth"] == "Bearer token-42"
+    assert result.critical_path == ["create_user", "login", "order"]
+    assert result.steps["catalog"].start < result.steps["login"].start  # independent branches overlap
+    assert result.wall_time < result.sequential_time
+    assert "* order" in result.format()
+
+
+@pytest.mark.asyncio
+async def test_flow_keeps_summaries_only():
+    client = Client(base_url="https://example.com", async_transport=httpx.MockTransport(_handler))
+    flow = _flow(client)
+    flow.keep_responses = False
+    result = await flow.run_async()
+
+    order = result.steps["order"]
+    assert order.then is None and order.summary.status_code == 201 and order.summary.size > 0
+    assert result.to_dict()["steps"][0]["response"]["digest"] == result.steps["create_user"].summary.digest
+
+
+@pytest.mark.asyncio
+async def test_flow_failure():
+    client = Client(base_url="https://example.com", async_transport=httpx.MockTransport(_handler))
+    flow = _flow(client)
+    flow.step("missing", lambda ctx: given(client).when("GET", "/products"), extract={"x": "[5].id"})
+    flow.step("skipped", lambda ctx: given(client).when("GET", "/products"), needs=["x"])
+
+    result = await flow.run_async(raise_on_failure=False)
+    assert [result.steps[name].status for name in ("order", "missing", "skipped")] == ["passed", "failed", "skipped"]
+
+    with pytest.raises(FlowError, match="Step missing of flow checkout failed") as info:
+        await flow.run_async()
+    assert info.value.result.steps["skipped"].start is None
+    assert isinstance(info.value.__cause__, ValueError)
+
+
+def test_flow_invalid_graph():
+    flow = Flow()
+    flow.step("a", lambda ctx: None, needs=["b"])
+    flow.step("b", lambda ctx: None, needs=["a"])
+    with pytest.raises(InvalidArgumentError, match="cycle"):
+        flow.run()
+
+    with pytest.raises(InvalidArgumentError, match="neither a step"):
+        Flow().step("a", lambda ctx: None, needs=["unknown"]).run()
+
+
+def test_flow_runs_twice_on_a_real_server():
+    with MockServer() as server:
+        server.add_route("POST", "/users", status=201, payload=profiles.json_value({"id": 42}))
+        server.add_route("GET", "/users/{id}", payload=profiles.json_value({"name": "Alice"}))
+        client = Client(base_url=server.url)
+        flow = Flow("profile")
+        flow.step("create_user", lambda ctx: given(client).when("POST", "/users"), extract={"user_id": "id"})
+        flow.step("get_user", lambda ctx: given(client).when("GET", f"/users/{ctx['user_id']}"), needs=["user_id"])
+
+        for _ in range(2):
+            assert flow.run().context == {"user_id": 42}
+        assert server.counters()["GET /users/{id}"]["requests"] == 2
@@ -0,0 +1,115 @@
+import asyncio
+
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.hedging import HedgingExperiment, HedgingPolicy, hedging_experiment
+from reqflow.utils.logger import GlobalLogger
+
+
+def _client(policy=None, slow_every=2, logging=False, metrics=False):
+    """A client whose service answers the first and every `slow_every`-th request in 300 ms, the others in 1 ms."""
+    calls = []
+
+    async def handler(request):
+        calls.append(request.method)
+        await asyncio.sleep(0.3 if slow_every and len(calls) % slow_every == 1 else 0.001)
+        return httpx.Response(200, json={"call": len(calls)})
+
+    client = Client(base_url="https://example.com", async_transport=httpx.MockTransport(handler),
+                    hedging=policy, logging=logging, metrics=metrics)
+    return client, calls
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_over_slow_request():
+    policy = HedgingPolicy(delay=0.02)
+    client, calls = _client(policy, logging=True, metrics=True)
+    GlobalLogger.clear_logs()
+
+    then = await given(client).when("GET", "/items/1").then_async()
+    then.status_code(200).assert_response_time(0.2)
+
+    assert calls == ["GET", "GET"]
+    assert then.get_content()["call"] == 2
+    assert policy.stats()["hedged"] == policy.stats()["wins"] == 1
+    assert GlobalLogger.get_logs()[-1]["response"]["hedge"] == {"sent": 1, "winner": 1, "delay": 0.02}
+    assert client.metrics.hedges == {("GET", "/items/{id}"): [1, 1, 1]}
+    assert 'reqflow_hedge_wins_total{method="GET",endpoint="/items/{id}"} 1' in client.metrics.to_openmetrics()
+
+
+@pytest.mark.asyncio
+async def test_failed_hedged_requests_are_recorded():
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        raise httpx.ConnectError("Connection refused")
+
+    policy = HedgingPolicy(delay=0.01)
+    client = Client(base_url="https://example.com", async_transport=httpx.MockTransport(handler), hedging=policy)
+    with pytest.raises(httpx.ConnectError):
+        await given(client).when("GET", "/items/1").then_async()
+
+    assert policy.stats()["requests"] == policy.stats()["hedged"] == 1
+    assert policy.stats()["hedge_rate"] == 1.0 and policy.stats()["wins"] == 0
+    assert policy.delay_for("GET /items/{id}") == 0.01
+
+    policy = HedgingPolicy(min_samples=1, initial_delay=0.01)
+    policy.record("GET /items/{id}", None)
+    assert policy.stats()["requests"] == 1 and policy.delay_for("GET /items/{id}") == 0.01
+
+
+@pytest.mark.asyncio
+async def test_fast_and_non_idempotent_requests_are_not_hedged():
+    policy = HedgingPolicy(delay=0.05)
+    client, calls = _client(policy, slow_every=0)
+
+    await given(client).when("GET", "/items/1").then_async()
+    assert calls == ["GET"] and policy.stats()["hedged"] == 0
+
+    client, calls = _client(policy)
+    await given(client).body({"name": "item"}).when("POST", "/items").then_async()
+    assert calls == ["POST"]
+
+
+def test_adaptive_delay():
+    policy = HedgingPolicy(percentile=90, min_samples=10, initial_delay=1.0)
+    assert policy.delay_for("GET /items/{id}") == 1.0
+    for value in range(1, 11):
+        policy.record("GET /items/{id}", value / 100)
+    assert policy.delay_for("GET /items/{id}") == pytest.approx(0.091)
+    assert policy.delay_for("GET /users") == 1.0
+
+    with pytest.raises(InvalidArgumentError):
+        HedgingPolicy(max_hedges=0)
+
+
+@pytest.mark.asyncio
+async def test_hedging_experiment():
+    shared_policy = HedgingPolicy(delay=1.0)
+    client, calls = _client(shared_policy, slow_every=10)
+    template = given(client).when("GET", "/items/{id}").template()
+
+    seen = []
+
+    async def other_coroutine():
+        # The client is shared, the experiment must not change its policy while it runs
+        await asyncio.sleep(0.4)
+        seen.append(client.hedging)
+
+    experiment, _ = await asyncio.gather(
+        hedging_experiment(template, HedgingPolicy(delay=0.02), requests=20, concurrency=1, values={"id": 1}),
+        other_coroutine())
+    assert seen == [shared_policy] and shared_policy.stats()["requests"] == 0
+    assert experiment.baseline.p99 >= 0.3 > experiment.hedged.p99
+    assert experiment.p99_reduction > 0.5
+    assert experiment.stats["hedged"] == experiment.stats["duplicates"] == 3
+    assert experiment.extra_load == pytest.approx(3 / 20)
+    assert "15.0% extra requests" in experiment.format()
+
+    policy = HedgingPolicy(delay=0.02, max_hedges=2)
+    policy.record("GET /items/{id}", 0.1, hedges=2, won=True)
+    policy.record("GET /items/{id}", 0.1)
+    assert policy.stats()["hedged"] == 1 and policy.stats()["duplicates"] == 2
+    assert HedgingExperiment(experiment.baseline, experiment.hedged, policy.stats()).extra_load == 1.0
@@ -0,0 +1,75 @@
+import asyncio
+
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.load import find_capacity, find_capacity_async
+from reqflow.mock import MockServer
+
+
+def _service(capacity):
+    """A service answering in 5 ms up to `capacity` requests in flight and in 100 ms above."""
+    in_flight = 0
+
+    async def handler(request):
+        nonlocal in_flight
+        in_flight += 1
+        try:
+            await asyncio.sleep(0.005 if in_flight <= capacity else 0.1)
+        finally:
+            in_flight -= 1
+        return httpx.Response(200, json={})
+
+    return Client(base_url="https://example.com", async_transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_find_capacity():
+    template = given(_service(capacity=4)).when("GET", "/items/{id}").template()
+    result = await find_capacity_async(template, p99_slo=0.05, step_duration=0.2, values={"id": 1})
+
+    assert [step.concurrency for step in result.steps[:4]] == [1, 2, 4, 8]
+    assert result.sustainable_concurrency == 4
+    assert all(not step.within_slo for step in result.steps if step.concurrency > 4)
+    assert result.steps[0].pool == {"connections": 0, "active": 0, "idle": 0, "queued": 0}
+    assert [point["concurrency"] for point in result.curve()] == sorted({step.concurrency for step in result.steps})
+    result.assert_sustains(rps=50)
+    with pytest.raises(AssertionError):
+        result.assert_sustains(rps=1e6)
+    assert "Sustainable: concurrency 4" in result.format()
+
+
+def test_find_capacity_errors():
+    async def failing():
+        raise httpx.ConnectError("Connection refused")
+
+    result = find_capacity(failing, step_duration=0.05, max_backoffs=1)
+    assert len(result.steps) == 1 and result.steps[0].error_rate == 1.0
+    assert result.sustainable_concurrency == 0 and result.sustainable_rps == 0.0
+
+    async def broken():
+        raise KeyError("token")
+
+    result = find_capacity(broken, step_duration=0.05, max_backoffs=1)
+    assert len(result.steps) == 1 and result.steps[0].error_rate == 1.0
+
+
+def test_find_capacity_runs_twice_on_a_real_server():
+    with MockServer() as server:
+        server.add_route("GET", "/ping", payload="pong")
+        template = given(Client(base_url=server.url)).when("GET", "/ping").template()
+        for _ in range(2):
+            result = find_capacity(template, p99_slo=1.0, max_concurrency=2, step_duration=0.05)
+            assert [step.error_rate for step in result.steps] == [0.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_pool_stats():
+    with MockServer() as server:
+        server.add_route("GET", "/ping", payload="pong")
+        async with Client(base_url=server.url) as client:
+            await asyncio.gather(*(given(client).when("GET", "/ping").then_async() for _ in range(3)))
+            stats = client.pool_stats()
+            assert stats["connections"] == stats["idle"] == 3 and stats["queued"] == 0
+            assert client.pool_stats(sync=True)["connections"] == 0
@@ -1,8 +1,23 @@
+import httpx
+import json
 import pytest
 from reqflow.utils.logger import GlobalLogger
+from reqflow.utils.sinks import JsonlSink
 from reqflow import Client, given
 
 
+@pytest.fixture(autouse=True)
+def clean_logs():
+    GlobalLogger.clear_logs()
+    yield
+
+
+def _mock_client(**kwargs):
+    client = Client(base_url="https://example.com", logging=True, **kwargs)
+    client.http_client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+    return client
+
+
 def test_log_request():
     log_entry = {
         'function': 'test_func',
@@ -130,6 +145,24 @@ def test_generate_html_report(tmp_path):
         GlobalLogger.clear_logs()
 
 
+def test_generate_html_report_summary_and_chunks(tmp_path):
+    for index in range(1500):
+        GlobalLogger.log_request({
+            'function': 'test_func',
+            'request': {'method': 'GET', 'url': f'https://example.com/users/{index}?q=</script>'},
+            'response': {'status_code': 500 if index % 10 == 0 else 200, 'headers': {}, 'content': b'\x00',
+                         'time': 0.1},
+        })
+    report_path = tmp_path / "test_report.html"
+    GlobalLogger.generate_html_report(file_path=str(report_path))
+    GlobalLogger.clear_logs()
+
+    data = report_path.read_text()
+    assert "<td>GET</td><td>/users/{id}</td><td>1500</td>" in data
+    assert "</script>'" not in data
+    assert sorted(path.name for path in (tmp_path / "test_report_data").iterdir()) == ['bodies_0.js', 'bodies_1.js']
+
+
 def test_client_logger():
     client = Client(base_url="https://httpbin.org", logging=True)
 
@@ -145,5 +178,185 @@ def test_client_logger():
     logs = GlobalLogger.get_logs()
     assert len(logs) == 2
 
+def test_generate_json_report_binary_content(tmp_path):
+    log_entry = {
+        'function': 'test_func',
+        'request': {'method': 'GET', 'url': 'https://example.com/image.png'},
+        'response': {'status_code': 200, 'headers': {}, 'content': b'\x89PNG\r\n\x1a\n', 'time': 0.1}
+    }
+
+    GlobalLogger.log_request(log_entry)
+    report_path = tmp_path / "test_report.json"
+    GlobalLogger.generate_json_report(file_path=str(report_path))
+
+    with open(report_path, "r") as file:
+        data = json.load(file)
+    assert data[0]['response']['content'] == {'encoding': 'base64', 'data': 'iVBORw0KGgo=', 'length': 8,
+                                              'truncated': False}
+    GlobalLogger.clear_logs()
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_jsonl_sink(tmp_path, compression):
+    sink_path = tmp_path / "requests.jsonl"
+    GlobalLogger.add_jsonl_sink(str(sink_path), compression=compression, max_body_bytes=4, keep_in_memory=False)
+    try:
+        for index in range(3):
+            GlobalLogger.log_request({'function': f'test_{index}', 'response': {'content': b'{"key": "value"}'}})
+        assert GlobalLogger.logs == []
+
+        report_path = tmp_path / "test_report.json"
+        GlobalLogger.generate_json_report(file_path=str(report_path))
+    finally:
+        GlobalLogger.close_sinks()
+
+    with open(report_path, "r") as file:
+        data = json.load(file)
+    assert [entry['function'] for entry in data] == ['test_0', 'test_1', 'test_2']
+    assert data[0]['response']['content'] == {'encoding': 'utf-8', 'data': '{"ke', 'length': 16, 'truncated': True}
+
+
+def test_jsonl_sink_snapshots_entries(tmp_path):
+    sink = JsonlSink(str(tmp_path / "requests.jsonl"))
+    entry = {'request': {'headers': {'X-Step': '1'}}}
+    sink.write(entry)
+    entry['request']['headers']['X-Step'] = '2'
+    sink.close()
+    assert [line['request']['headers'] for line in sink.iter_entries()] == [{'X-Step': '1'}]
+
+
+def test_close_sinks_closes_every_sink(tmp_path):
+    class FailingSink:
+        def write(self, entry):
+            pass
+
+        def close(self):
+            raise OSError("disk full")
+
+    GlobalLogger.sinks.append(FailingSink())
+    sink = GlobalLogger.add_jsonl_sink(str(tmp_path / "requests.jsonl"))
+    with pytest.raises(OSError, match="disk full"):
+        GlobalLogger.close_sinks()
+    assert GlobalLogger.sinks == []
+    with pytest.raises(ValueError, match="is closed"):
+        sink.write({})
+
+
+def test_keep_in_memory_is_one_setting(tmp_path):
+    GlobalLogger.add_jsonl_sink(str(tmp_path / "requests.jsonl"), keep_in_memory=False)
+    store = GlobalLogger.use_sqlite_store(str(tmp_path / "requests.db"))
+    try:
+        GlobalLogger.log_request({'function': 'test_func', 'request': {'method': 'GET', 'url': 'https://example.com'},
+                                  'response': {'status_code': 200, 'content': b'ok', 'time': 0.1}})
+        assert not GlobalLogger.keep_in_memory and GlobalLogger.logs == []
+        assert [entry['function'] for entry in GlobalLogger.get_logs()] == ['test_func']
+
+        GlobalLogger.clear_logs()
+        assert store.count() == 1 and len(GlobalLogger.query(function='test_func')) == 1
+    finally:
+        GlobalLogger.close_sinks()
+    assert GlobalLogger.keep_in_memory
+
+
+@pytest.mark.parametrize("use_store", [False, True])
+def test_query(tmp_path, use_store):
+    if use_store:
+        GlobalLogger.use_sqlite_store(str(tmp_path / "requests.db"), keep_in_memory=False)
+    try:
+        for index, (status_code, time) in enumerate([(200, 0.1), (503, 0.9), (500, 0.2), (502, 1.5)]):
+            GlobalLogger.log_request({
+                'function': 'test_orders' if index < 3 else 'test_other',
+                'request': {'method': 'get', 'url': f'https://example.com/orders/{index}', 'json': {'id': index}},
+                'response': {'status_code': status_code, 'headers': {'X-Id': str(index)}, 'content': b'error',
+                             'time': time},
+            })
+
+        matches = GlobalLogger.query(function="test_orders", method="GET", url_template="/orders/{id}",
+                                     min_status=500, max_status=599, min_time=0.8)
+        assert len(matches) == 1
+        assert matches[0]['request']['json'] == {'id': 1}
+        assert matches[0]['response']['headers'] == {'X-Id': '1'}
+        assert matches[0]['response']['content'] == b'error'
+        assert len(GlobalLogger.get_logs()) == 4
+    finally:
+        GlobalLogger.close_sinks()
+        GlobalLogger.clear_logs()
+
+    if use_store:
+        import sqlite3
+        with sqlite3.connect(str(tmp_path / "requests.db")) as connection:
+            assert connection.execute("SELECT COUNT(*) FROM bodies").fetchone()[0] == 5
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_body_dedup(tmp_path, on_disk):
+    store = GlobalLogger.enable_body_dedup(directory=str(tmp_path / "bodies") if on_disk else None, max_body_bytes=8)
+    try:
+        for _ in range(3):
+            GlobalLogger.log_request({
+                'function': 'test_func',
+                'request': {'method': 'POST', 'url': 'https://example.com', 'json': {'key': 'value'}},
+                'response': {'status_code': 500, 'content': b'Internal Server Error', 'time': 0.1},
+            })
+
+        logs = GlobalLogger.get_logs()
+        assert logs[0]['request']['json'] is not logs[1]['request']['json']
+        assert logs[0]['request']['json'] == logs[1]['request']['json']
+        assert logs[0]['response']['content'].length == 21
+        assert logs[0]['response']['content'].resolve() == b'Internal'
+        assert store.stats()['bodies'] == 2
+        assert store.stats()['references'] == 6
+
+        report_path = tmp_path / "test_report.json"
+        GlobalLogger.generate_json_report(file_path=str(report_path))
+        with open(report_path, "r") as file:
+            content = json.load(file)[0]['response']['content']
+        assert content['data'] == 'Internal'
+        assert content['length'] == 21 and content['truncated']
+    finally:
+        GlobalLogger.clear_logs()
+        GlobalLogger.disable_body_dedup()
+
+
+def test_client_logger_test_attribution():
+    given(_mock_client()).when("GET", "/get").then().status_code(200)
+
+    logs = GlobalLogger.get_logs()
+    assert logs[0]['function'] == 'test_client_logger_test_attribution'
+    assert logs[0]['test_id'].endswith('test_logger.py::test_client_logger_test_attribution')
+    GlobalLogger.clear_logs()
+
+
+def test_client_logger_context_attribution():
+    client = _mock_client()
+    with client.context("checkout"):
+        given(client).when("GET", "/cart").then().status_code(200)
+    given(client).when("GET", "/cart").then().status_code(200)
+
+    logs = GlobalLogger.get_logs()
+    assert logs[0]['function'] == 'checkout'
+    assert logs[0]['test_id'] == logs[1]['test_id']
+    assert logs[1]['function'] == 'test_client_logger_context_attribution'
+    GlobalLogger.clear_logs()
+
+
+def test_client_logger_trace_caller():
+    from reqflow.utils.context import _caller_context
+
+    def send_from_helper(client):
+        given(client).when("GET", "/get").then().status_code(200)
+
+    token = _caller_context.set(None)
+    try:
+        send_from_helper(_mock_client())
+        send_from_helper(_mock_client(trace_caller=True))
+    finally:
+        _caller_context.reset(token)
+
+    logs = GlobalLogger.get_logs()
+    assert logs[0]['function'] is None
+    assert logs[1]['function'] == 'send_from_helper'
+    GlobalLogger.clear_logs()
+
 if __name__ == "__main__":
     pytest.main()
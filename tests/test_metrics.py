@@ -0,0 +1,69 @@
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.utils.metrics import LatencyHistogram, MetricsRegistry
+
+
+def _handler(request):
+    if request.url.path.startswith("/down"):
+        raise httpx.ConnectError("Connection refused", request=request)
+    return httpx.Response(404 if request.url.path.startswith("/missing") else 200, json={})
+
+
+def _mock_client(**kwargs):
+    client = Client(base_url="https://example.com", **kwargs)
+    client.http_client = httpx.Client(transport=httpx.MockTransport(_handler))
+    return client
+
+
+def test_client_metrics():
+    client = _mock_client(metrics=True)
+    for index in range(3):
+        given(client).when("GET", f"/users/{index}").then().status_code(200)
+    given(client).when("GET", "/missing").then().status_code(404)
+    with pytest.raises(httpx.ConnectError):
+        given(client).when("POST", "/down").then()
+
+    histograms = client.metrics.histograms
+    assert histograms[("GET", "/users/{id}", "2xx")].count == 3
+    assert histograms[("GET", "/missing", "4xx")].count == 1
+    assert histograms[("POST", "/down", "error")].count == 1
+
+
+def test_shared_registry_and_merge():
+    metrics = MetricsRegistry()
+    given(_mock_client(metrics=metrics)).when("GET", "/users/1").then()
+    given(_mock_client(metrics=metrics)).when("GET", "/users/2").then()
+    assert metrics.histograms[("GET", "/users/{id}", "2xx")].count == 2
+
+    merged = MetricsRegistry.from_dict(metrics.to_dict()).merge(metrics)
+    assert merged.histograms[("GET", "/users/{id}", "2xx")].count == 4
+
+
+def test_histogram_quantile():
+    histogram = LatencyHistogram(buckets=(0.1, 0.2, 0.5))
+    for value in (0.05, 0.15, 0.15, 0.3, 1.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == pytest.approx(0.175)
+    assert list(histogram.cumulative_counts())[-1] == (float("inf"), 5)
+
+
+def test_openmetrics_export(tmp_path):
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+    metrics.observe("GET", "https://example.com/users/1?x=1", 200, 0.05)
+
+    text = metrics.to_openmetrics()
+    labels = 'method="GET",endpoint="/users/{id}",status_class="2xx"'
+    assert f'reqflow_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'reqflow_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f"reqflow_requests_total{{{labels}}} 1" in text
+    assert text.endswith("# EOF\n")
+
+    server = metrics.serve(port=0)
+    try:
+        response = httpx.get(f"http://127.0.0.1:{server.server_address[1]}/metrics")
+    finally:
+        server.shutdown()
+    assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+    assert response.text == text
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import socket
+
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.assertions import equal_to
+from reqflow.mock import MockServer, profiles
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = MockServer(seed=1)
+    server.add_route("GET", "/items", payload=profiles.json_items(3), headers={"X-Mock": "1"})
+    server.add_route("GET", "/delay/{seconds}", latency=profiles.from_path("seconds"), payload="Delayed")
+    server.add_route("GET", "/binary", payload=profiles.binary(megabytes=1))
+    server.add_route("GET", "/events", payload=profiles.sse(3, interval=0.01))
+    server.add_route("GET", "/stream", payload=profiles.ndjson(4))
+    server.add_route("GET", "/chunked", payload=profiles.chunked(100_000, chunk_size=30_000))
+    server.add_route("POST", "/mixed", status={200: 0.5, 503: 0.5})
+    server.add_route("GET", "/drop", drop_rate=1.0)
+    with server:
+        yield server
+
+
+def test_payloads(server):
+    client = Client(base_url=server.url)
+    then = given(client).when("GET", "/items").then().status_code(200).assert_header("X-Mock", equal_to("1"))
+    assert [item["id"] for item in then.get_content()] == [0, 1, 2]
+    assert len(given(client).when("GET", "/binary").then().get_response().content) == 1024 * 1024
+
+    events = httpx.get(f"{server.url}/events")
+    assert events.headers["Content-Type"] == "text/event-stream" and events.text.count("event: message") == 3
+    assert len(httpx.get(f"{server.url}/stream").text.splitlines()) == 4
+    assert len(httpx.get(f"{server.url}/chunked").content) == 100_000
+    assert httpx.get(f"{server.url}/unknown").status_code == 404
+
+
+def test_latency_status_mix_and_counters(server):
+    client = Client(base_url=server.url)
+    given(client).when("GET", "/delay/0.2").then().status_code(200).assert_body_text("Delayed")
+    assert given(client).when("GET", "/delay/0.2").then().get_response().response_time >= 0.2
+
+    statuses = {given(client).body({"id": 1}).when("POST", "/mixed").then().get_response().status_code
+                for _ in range(20)}
+    assert statuses == {200, 503}
+    counters = server.counters()
+    assert counters["GET /delay/{seconds}"]["requests"] == 2
+    assert sum(counters["POST /mixed"]["statuses"].values()) == 20
+
+    with pytest.raises(httpx.HTTPError):
+        httpx.get(f"{server.url}/drop")
+    assert server.counters()["GET /drop"]["dropped"] == 1
+
+
+def test_concurrent_slow_connections(server):
+    async def request():
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(b"GET /delay/0.5 HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def run():
+        return await asyncio.gather(*(request() for _ in range(500)))
+
+    responses = asyncio.run(asyncio.wait_for(run(), timeout=10))
+    assert all(response.startswith(b"HTTP/1.1 200 OK") for response in responses)
+    assert server.counters()["connections"]["max_active"] >= 250
+
+
+@pytest.mark.parametrize("suffix", [".json", ".yaml"])
+def test_from_file(tmp_path, suffix):
+    config = {"seed": 3, "routes": [{"method": "GET", "path": "/users/{id}", "status": {"201": 1},
+                                     "latency": {"type": "normal", "mean": 0.01, "stdev": 0.001},
+                                     "payload": {"type": "json", "value": {"name": "mock"}}}]}
+    path = tmp_path / f"mock{suffix}"
+    if suffix == ".yaml":
+        yaml = pytest.importorskip("yaml")
+        path.write_text(yaml.safe_dump(config))
+    else:
+        path.write_text(json.dumps(config))
+
+    with MockServer.from_file(str(path)) as server:
+        then = given(url=server.url).when("GET", "/users/7").then().status_code(201)
+        assert then.get_content() == {"name": "mock"}
+
+
+def test_unix_socket(tmp_path):
+    socket_path = str(tmp_path / "mock.sock")
+    with MockServer(uds=socket_path) as server:
+        server.add_route("GET", "/ping", payload="pong")
+        with httpx.Client(transport=httpx.HTTPTransport(uds=socket_path)) as client:
+            assert client.get(f"{server.url}/ping").text == "pong"
+
+
+def test_raise_fd_limit():
+    resource = pytest.importorskip("resource")
+    limits = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if limits[1] != resource.RLIM_INFINITY and limits[1] <= 256:
+        pytest.skip("The hard open files limit is too low")
+    resource.setrlimit(resource.RLIMIT_NOFILE, (256, limits[1]))
+    try:
+        with MockServer():
+            assert resource.getrlimit(resource.RLIMIT_NOFILE)[0] == 256
+        with MockServer(raise_fd_limit=True):
+            assert resource.getrlimit(resource.RLIMIT_NOFILE)[0] > 256
+        assert resource.getrlimit(resource.RLIMIT_NOFILE)[0] == 256
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, limits)
+
+
+@pytest.mark.parametrize("framing", [b"Content-Length: abc", b"Content-Length: -5",
+                                     b"Transfer-Encoding: chunked\r\n\r\nzz"])
+def test_malformed_body_framing_is_a_bad_request(framing):
+    with MockServer() as server:
+        server.add_route("POST", "/items", status=201)
+        with socket.create_connection((server.host, server.port), timeout=5) as connection:
+            connection.sendall(b"POST /items HTTP/1.1\r\nHost: localhost\r\n" + framing + b"\r\n\r\n")
+            response = b""
+            while chunk := connection.recv(4096):
+                response += chunk
+        assert response.startswith(b"HTTP/1.1 400 Bad Request") and b"Connection: close" in response
+        assert given(url=server.url).when("POST", "/items").then().status_code(201)
+
+
+def test_incomplete_profiles_fail_on_construction():
+    class NoSample(profiles.Latency):
+        pass
+
+    class NoBody(profiles.Payload):
+        pass
+
+    for profile in (NoSample, NoBody):
+        with pytest.raises(TypeError):
+            profile()
+
+    with MockServer() as server:
+        server.add_route("HEAD", "/events", payload=profiles.ndjson(3))
+        response = httpx.head(f"{server.url}/events")
+        assert response.status_code == 200 and int(response.headers["Content-Length"]) > 0
@@ -26,4 +26,50 @@ def test_force_json_true_decode_error():
     http_response = httpx.Response(200, content='Invalid JSON', headers={'Content-Type': 'text/plain'})
 
     with pytest.raises(JSONDecodeError):
-        UnifiedResponse(http_response, force_json=True)
\ No newline at end of file
+        UnifiedResponse(http_response, force_json=True)
+
+def test_response_is_compact_and_decoded_lazily():
+    request = httpx.Request("GET", "https://example.com/items")
+    http_response = httpx.Response(200, content=b'{"items": [1, 2]}', request=request,
+                                   headers={'Content-Type': 'application/json', 'Set-Cookie': 'session=abc; Path=/'})
+    response = UnifiedResponse(http_response)
+
+    assert not hasattr(response, "__dict__")
+    assert response.body == {"items": [1, 2]}
+    assert response.headers["content-type"] == "application/json" and response.headers is response.headers
+    assert response.cookies.get("session") == "abc"
+    assert UnifiedResponse(httpx.Response(200, json={})).cookies is None
+
+
+def test_invalid_json_fails_on_access():
+    http_response = httpx.Response(200, content=b'{"broken', headers={'Content-Type': 'application/json'})
+    response = UnifiedResponse(http_response)
+
+    assert response.status_code == 200
+    with pytest.raises(JSONDecodeError):
+        response.body
+    with pytest.raises(ValueError, match="Response body is not valid JSON"):
+        response._find_json("$.id")
+
+
+def test_summary():
+    summary = UnifiedResponse(httpx.Response(201, content=b"created"), response_time=0.5).summary()
+
+    assert (summary.status_code, summary.size, summary.response_time) == (201, 7, 0.5)
+    assert summary.digest == UnifiedResponse(httpx.Response(200, content=b"created")).summary().digest
+    assert summary.to_dict()["digest"] == summary.digest and not summary.truncated
+
+
+def test_text_and_raw_bytes():
+    content = '{"name": "Zoë"}'.encode("utf-8")
+    response = UnifiedResponse(httpx.Response(200, content=content,
+                                              headers={'Content-Type': 'application/json; charset=utf-8'}))
+
+    assert response.text == '{"name": "Zoë"}' and response.text is response.text
+    assert response.body == {"name": "Zoë"}
+    assert isinstance(response.raw_bytes, memoryview) and response.raw_bytes.obj is response.raw_bytes.obj
+    assert response.raw_bytes.tobytes() == content
+
+    latin = UnifiedResponse(httpx.Response(200, content="café".encode("latin-1"),
+                                           headers={'Content-Type': 'text/plain; charset=latin-1'}))
+    assert latin.text == "café" and latin.body is latin.text
@@ -0,0 +1,76 @@
+import gzip
+import time
+
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.exceptions import ResponseTooLargeError
+from reqflow.mock import MockServer, profiles
+from reqflow.utils.logger import GlobalLogger
+
+LIMIT = 64 * 1024
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MockServer() as server:
+        server.add_route("GET", "/huge", payload=profiles.binary(megabytes=200))
+        server.add_route("GET", "/stream", payload=profiles.chunked(50 * 1024 * 1024, interval=0.001))
+        server.add_route("GET", "/items", payload=profiles.json_items(10))
+        yield server
+
+
+def test_oversized_response_is_aborted(server):
+    client = Client(base_url=server.url, logging=True, max_response_bytes=LIMIT)
+    GlobalLogger.clear_logs()
+
+    start = time.perf_counter()
+    with pytest.raises(ResponseTooLargeError) as error:
+        given(client).when("GET", "/huge").then()
+    assert time.perf_counter() - start < 1.0
+    assert error.value.limit == LIMIT and error.value.size == 200 * 1024 * 1024 and error.value.status_code == 200
+
+    with pytest.raises(ResponseTooLargeError) as error:
+        given(client).when("GET", "/stream").then()
+    assert LIMIT < error.value.size < 50 * 1024 * 1024
+    assert GlobalLogger.get_logs()[-1]["response"]["size_limit"] == \
+        {"limit": LIMIT, "size": error.value.size, "status_code": 200, "truncated": False}
+
+    given(client).when("GET", "/items").then().status_code(200).assert_response_time(1.0)
+
+
+def test_truncated_response(server):
+    client = Client(base_url=server.url, logging=True)
+    GlobalLogger.clear_logs()
+
+    then = given(client).when("GET", "/stream").then(max_response_bytes=LIMIT, truncate_response=True)
+    assert then.response.truncated and len(then.response.content) == LIMIT
+    assert GlobalLogger.get_logs()[-1]["response"]["size_limit"]["truncated"]
+    assert not given(client).when("GET", "/items").then().response.truncated
+
+
+@pytest.mark.asyncio
+async def test_async_limits(server):
+    async with Client(base_url=server.url, max_response_bytes=LIMIT) as client:
+        with pytest.raises(ResponseTooLargeError):
+            await given(client).when("GET", "/huge").then_async()
+        then = await given(client).when("GET", "/huge").then_async(truncate_response=True)
+        assert then.response.truncated and len(then.response.content) == LIMIT
+        then = await given(client).when("GET", "/items").then_async()
+        assert len(then.response.content) < LIMIT and not then.response.truncated
+
+
+def test_limited_compressed_response_is_decoded_once():
+    body = b'{"items": "' + b"x" * 5000 + b'"}'
+
+    def handler(request):
+        return httpx.Response(200, content=gzip.compress(body),
+                              headers={"Content-Encoding": "gzip", "Content-Type": "application/json"})
+
+    client = Client(base_url="https://example.com", transport=httpx.MockTransport(handler), max_response_bytes=LIMIT)
+    then = given(client).when("GET", "/items").then()
+    assert then.response.raw_bytes.tobytes() == body and then.response.headers["Content-Encoding"] == "gzip"
+
+    then = given(client).when("GET", "/items").then(max_response_bytes=100, truncate_response=True)
+    assert then.response.truncated and then.response.text == body[:100].decode()
@@ -0,0 +1,98 @@
+import gc
+import weakref
+
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.utils.logger import GlobalLogger
+from reqflow.utils.retention import RetentionPolicy
+
+
+def _handler(request):
+    if request.url.path.startswith("/error"):
+        return httpx.Response(500, text="error")
+    if request.url.path.startswith("/down"):
+        raise httpx.ConnectError("Connection refused", request=request)
+    return httpx.Response(200, json={"id": 1})
+
+
+@pytest.fixture
+def client():
+    client = Client(base_url="https://example.com", logging=True)
+    client.http_client = httpx.Client(transport=httpx.MockTransport(_handler))
+    GlobalLogger.clear_logs()
+    yield client
+    GlobalLogger.set_retention_policy(None)
+    GlobalLogger.clear_logs()
+
+
+def test_failures_are_kept(client):
+    GlobalLogger.set_retention_policy(RetentionPolicy(sample_rate=0))
+
+    for _ in range(5):
+        given(client).when("GET", "/items/1").then().status_code(200)
+    given(client).when("GET", "/error").then().status_code(500)
+    with pytest.raises(httpx.ConnectError):
+        given(client).when("GET", "/down").then()
+
+    logs = GlobalLogger.get_logs()
+    assert [log['response']['status_code'] for log in logs] == [500, None]
+    assert "ConnectError" in logs[1]['response']['error']
+    assert GlobalLogger.retention_policy.stats()["GET /items/{id}"] == {"seen": 5, "kept": 0, "failures": 0}
+
+
+def test_failed_assertion_is_kept(client):
+    GlobalLogger.set_retention_policy(RetentionPolicy(sample_rate=0))
+
+    given(client).when("GET", "/items/1").then().status_code(200)
+    with pytest.raises(AssertionError):
+        given(client).when("GET", "/items/2").then().status_code(201)
+
+    logs = GlobalLogger.get_logs()
+    assert len(logs) == 1
+    assert logs[0]['request']['url'] == "https://example.com/items/2"
+
+
+def test_max_per_endpoint(client):
+    GlobalLogger.set_retention_policy(RetentionPolicy(max_per_endpoint=2))
+
+    for index in range(5):
+        given(client).when("GET", f"/items/{index}").then().status_code(200)
+    given(client).when("GET", "/other").then().status_code(200)
+
+    urls = [log['request']['url'] for log in GlobalLogger.get_logs()]
+    assert urls == ["https://example.com/items/0", "https://example.com/items/1", "https://example.com/other"]
+
+
+def test_slowest_per_endpoint():
+    policy = RetentionPolicy(sample_rate=0, slowest_per_endpoint=2)
+    for index, response_time in enumerate([0.1, 0.5, 0.2, 0.9, 0.3]):
+        if policy.admit("GET", f"/items/{index}", 200, response_time) == "candidate":
+            policy.add_candidate("GET", f"/items/{index}", response_time, {"time": response_time})
+
+    retained = []
+    policy.flush(retained.append)
+    assert retained == [{"time": 0.5}, {"time": 0.9}]
+    assert policy.stats()["GET /items/{id}"]["kept"] == 2
+
+
+def test_dropped_entries_release_the_response(client):
+    GlobalLogger.set_retention_policy(RetentionPolicy(sample_rate=0, keep_failures=False))
+    responses = []
+
+    def handler(request):
+        response = httpx.Response(200, json={"id": 1})
+        responses.append(weakref.ref(response))
+        return response
+
+    client.http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    then = given(client).when("GET", "/items/1").then().status_code(200)
+    gc.collect()
+    assert responses[0]() is None
+
+    with pytest.raises(AssertionError):
+        then.status_code(201)
+    response = GlobalLogger.get_logs()[0]['response']
+    assert response['status_code'] == 200 and response['headers']['content-type'] == "application/json"
+    assert response['content'] == b'{"id":1}'
@@ -0,0 +1,79 @@
+import json
+
+import httpx
+import pytest
+
+from reqflow import Client, given
+from reqflow.assertions import equal_to
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.utils.logger import GlobalLogger
+
+
+def _echo(request):
+    return httpx.Response(200, json={"path": request.url.path, "query": dict(request.url.params),
+                                     "headers": dict(request.headers), "body": json.loads(request.content or b"null")})
+
+
+def _template(client):
+    return given(client).query_param({"page": "{page}", "size": 10}).header("X-Trace", "{trace}") \
+        .body({"user": {"id": "{id}", "name": "Zoë"}, "tags": ["static", "{tag}"]}) \
+        .when("POST", "/users/{id}/items").with_auth("user", "secret").template()
+
+
+def test_template_render_and_send():
+    client = Client(base_url="https://example.com", transport=httpx.MockTransport(_echo))
+    template = _template(client)
+    assert template.placeholders == {"page", "trace", "id", "tag"}
+
+    for index in range(3):
+        then = template.then(id=index, page=index + 1, trace=f"t-{index}", tag={"n": index})
+        then.status_code(200).assert_body("path", equal_to(f"/users/{index}/items")) \
+            .assert_body("query.page", equal_to(str(index + 1))).assert_body("query.size", equal_to("10")) \
+            .assert_body("headers.x-trace", equal_to(f"t-{index}")) \
+            .assert_body("headers.authorization", equal_to("Basic dXNlcjpzZWNyZXQ=")) \
+            .assert_body("headers.content-type", equal_to("application/json")) \
+            .assert_body("body", equal_to({"user": {"id": index, "name": "Zoë"}, "tags": ["static", {"n": index}]}))
+
+
+def test_template_errors():
+    template = _template(Client(base_url="https://example.com", transport=httpx.MockTransport(_echo)))
+    with pytest.raises(InvalidArgumentError):
+        template.render(id=1)
+    with pytest.raises(AttributeError):
+        template.method = "GET"
+
+
+
+def test_template_render_returns_copies():
+    client = Client(base_url="https://example.com", transport=httpx.MockTransport(_echo))
+    template = given(client).query_param({"size": 10}).header("X-Static", "1").cookies({"session": "abc"}) \
+        .when("GET", "/users").template()
+    rendered = template.render()
+    rendered["params"]["size"] = 99
+    rendered["headers"]["X-Static"] = "2"
+    rendered["cookies"]["session"] = "changed"
+
+    rendered = template.render()
+    assert rendered["params"] == {"size": 10} and rendered["headers"]["X-Static"] == "1"
+    assert rendered["cookies"] == {"session": "abc"}
+
+@pytest.mark.asyncio
+async def test_template_async():
+    client = Client(base_url="https://example.com", async_transport=httpx.MockTransport(_echo))
+    template = given(client).when("GET", "/users/{id}").template()
+    (await template.then_async(id=7)).status_code(200).assert_body("path", equal_to("/users/7"))
+
+
+def test_template_logging_and_benchmark():
+    GlobalLogger.clear_logs()
+    try:
+        client = Client(base_url="https://example.com", logging=True, transport=httpx.MockTransport(_echo))
+        template = given(client).body({"id": "{id}"}).when("POST", "/users").template()
+        template.send(id=1)
+        request = GlobalLogger.get_logs()[0]['request']
+        assert request['json'] == {"id": 1} and request['data'] is None
+
+        result = template.benchmark(iterations=10, warmup=1, values={"id": 2})
+        assert result.count == 10 and result.status_codes == {200: 10}
+    finally:
+        GlobalLogger.clear_logs()
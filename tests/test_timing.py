@@ -0,0 +1,68 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from reqflow import Client, given
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.utils.logger import GlobalLogger
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"foo": "bar"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_phase_timings(base_url):
+    client = Client(base_url=base_url)
+    first = given(client).when("GET", "/get").then().status_code(200).assert_ttfb(1.0)
+    second = given(client).when("GET", "/get").then().assert_phase_time("total", 1.0)
+
+    timings = first.get_timings()
+    assert timings.connect is not None and timings.tls is None and timings.dns is None
+    assert 0 < timings.ttfb <= timings.total == first.get_response().response_time
+    assert timings.wait is not None and timings.download is not None
+    assert second.get_timings().connect is None
+
+
+@pytest.mark.asyncio
+async def test_phase_timings_async(base_url):
+    client = Client(base_url=base_url)
+    result = await given(client).when("GET", "/get").then_async()
+    assert result.get_timings().ttfb is not None
+    result.assert_ttfb(1.0)
+
+
+def test_phase_timings_assertions(base_url):
+    then = given(Client(base_url=base_url)).when("GET", "/get").then()
+    with pytest.raises(AssertionError):
+        then.assert_ttfb(0)
+    with pytest.raises(InvalidArgumentError):
+        then.assert_phase_time("unknown", 1.0)
+
+
+def test_phase_timings_logged(base_url):
+    GlobalLogger.clear_logs()
+    given(Client(base_url=base_url, logging=True)).when("GET", "/get").then()
+    timings = GlobalLogger.get_logs()[0]['response']['timings']
+    assert timings['ttfb'] is not None and timings['total'] == GlobalLogger.get_logs()[0]['response']['time']
+    GlobalLogger.clear_logs()
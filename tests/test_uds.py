@@ -0,0 +1,46 @@
+import sys
+
+import pytest
+
+from reqflow import Client, given
+from reqflow.exceptions import InvalidArgumentError
+from reqflow.mock import MockServer
+from reqflow.utils.logger import GlobalLogger
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Unix domain sockets are not available on Windows")
+
+
+@pytest.fixture(scope="module")
+def socket_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("uds") / "service.sock")
+    server = MockServer(uds=path)
+    server.add_route("GET", "/ping", payload="pong")
+    with server:
+        yield path
+
+
+def test_uds(socket_path):
+    GlobalLogger.clear_logs()
+    try:
+        with Client(base_url="http://localhost", uds=socket_path, logging=True) as client:
+            first = given(client).when("GET", "/ping").then().status_code(200).assert_body_text("pong")
+            given(client).when("GET", "/ping").then().status_code(200)
+
+        assert first.get_timings().connect is not None
+        assert [log['response']['status_code'] for log in GlobalLogger.get_logs()] == [200, 200]
+    finally:
+        GlobalLogger.clear_logs()
+
+
+@pytest.mark.asyncio
+async def test_uds_async(socket_path):
+    async with Client(base_url="http://localhost", uds=socket_path) as client:
+        (await given(client).when("GET", "/ping").then_async()).status_code(200).assert_body_text("pong")
+
+
+def test_uds_per_base_url(socket_path):
+    client = Client(uds={"http://sidecar": socket_path})
+    given(client).when("GET", "http://sidecar/ping").then().status_code(200).assert_body_text("pong")
+
+    with pytest.raises(InvalidArgumentError):
+        Client(uds=socket_path, app=lambda environ, start_response: [])